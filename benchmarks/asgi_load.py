@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+ASGI vs WSGI read-path load benchmark
+
+Fires concurrent map-client reads (nearby, search, bucket list, stats) at the
+sync DRF endpoints served by gunicorn's sync workers and at the
+``/api/async/`` endpoints served by uvicorn, then reports throughput, p50/p99
+latency and errors per scenario and concurrency level.
+
+Run with: python -m benchmarks.asgi_load [--concurrency 10 100 300] [--requests 2000]
+By default both servers are started here against the configured database,
+with the response cache disabled so every request reaches the database
+(``--wsgi-workers 3`` matches the Dockerfile). Pass ``--wsgi-url`` and
+``--asgi-url`` to benchmark servers that are already running instead.
+Read-only; seed the database first (e.g. ``python manage.py shell < seed.py``).
+"""
+
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+# Lagos, where the seed data lives
+LAT_RANGE = (6.42, 6.62)
+LNG_RANGE = (3.30, 3.65)
+SEARCH_TERMS = ['lekki', 'ikoyi', 'victoria island', 'yaba', 'surulere', 'ikeja', 'ajah', 'lekki phase 1']
+
+SYNC_PATHS = {
+    'nearby': '/api/properties/nearby/',
+    'search': '/api/properties/',
+    'buckets': '/api/geo-buckets/',
+    'stats': '/api/geo-buckets/stats/',
+}
+ASYNC_PATHS = {
+    'nearby': '/api/async/properties/nearby/',
+    'search': '/api/async/properties/search/',
+    'buckets': '/api/async/geo-buckets/',
+    'stats': '/api/async/geo-buckets/stats/',
+}
+
+
+def query(scenario, rng):
+    if scenario == 'nearby':
+        lat, lng, radius = rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE), rng.choice((1000, 3000, 5000))
+        return f'?lat={lat:.5f}&lng={lng:.5f}&radius={radius}'
+    if scenario == 'search':
+        return f'?search={rng.choice(SEARCH_TERMS).replace(" ", "+")}'
+    if scenario == 'buckets':
+        return f'?page={rng.randint(1, 5)}'
+    return '?limit=20'
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+def run(base_url, paths, scenario, concurrency, total):
+    """Send ``total`` requests from ``concurrency`` client threads"""
+    rng = random.Random(scenario)
+    urls = [base_url + paths[scenario] + query(scenario, rng) for _ in range(total)]
+    per_client = [urls[i::concurrency] for i in range(concurrency)]
+    barrier = threading.Barrier(concurrency + 1)
+    latencies = []
+    errors = []
+
+    def client(tasks):
+        barrier.wait()
+        for url in tasks:
+            started = time.perf_counter()
+            try:
+                with urlopen(url, timeout=60) as response:
+                    response.read()
+            except (HTTPError, OSError) as exc:  # reported in the summary
+                errors.append(exc)
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=client, args=(tasks,)) for tasks in per_client]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'requests': total,
+        'seconds': elapsed,
+        'rps': len(latencies) / elapsed if elapsed else 0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'errors': len(errors),
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urlopen(url, timeout=2):
+                return
+        except HTTPError:
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"Server at {url} did not start within {timeout}s")
+
+
+@contextmanager
+def server(command, port):
+    env = dict(os.environ, RESPONSE_CACHE_ENABLED='False')
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base_url = f'http://127.0.0.1:{port}'
+        wait_for(base_url + SYNC_PATHS['buckets'])
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@contextmanager
+def servers(args):
+    if args.wsgi_url and args.asgi_url:
+        yield args.wsgi_url.rstrip('/'), args.asgi_url.rstrip('/')
+        return
+
+    wsgi_port, asgi_port = free_port(), free_port()
+    wsgi = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{wsgi_port}',
+            '--workers', str(args.wsgi_workers), 'core.wsgi:application']
+    asgi = [sys.executable, '-m', 'uvicorn', '--host', '127.0.0.1', '--port', str(asgi_port),
+            '--workers', str(args.asgi_workers), '--no-access-log', 'core.asgi:application']
+    with server(wsgi, wsgi_port) as wsgi_url, server(asgi, asgi_port) as asgi_url:
+        yield wsgi_url, asgi_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SYNC_PATHS), default=list(SYNC_PATHS))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 100, 300])
+    parser.add_argument('--requests', type=int, default=2000, help='requests per run')
+    parser.add_argument('--wsgi-workers', type=int, default=3)
+    parser.add_argument('--asgi-workers', type=int, default=1)
+    parser.add_argument('--wsgi-url', help='benchmark a running WSGI server instead of starting one')
+    parser.add_argument('--asgi-url', help='benchmark a running ASGI server instead of starting one')
+    args = parser.parse_args()
+
+    print(f"{'scenario':>9} {'server':>6} {'clients':>8} {'requests':>9} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    failed = False
+    with servers(args) as (wsgi_url, asgi_url):
+        for scenario in args.scenarios:
+            for concurrency in args.concurrency:
+                for name, base_url, paths in (('wsgi', wsgi_url, SYNC_PATHS), ('asgi', asgi_url, ASYNC_PATHS)):
+                    result = run(base_url, paths, scenario, concurrency, args.requests)
+                    failed = failed or result['errors']
+                    print(f"{scenario:>9} {name:>6} {concurrency:>8} {result['requests']:>9} {result['rps']:>8.1f} "
+                          f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>7}")
+
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
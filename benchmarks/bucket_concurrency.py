@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Concurrent bucket-creation stress benchmark
+
+Many writer threads assign properties in the same brand-new neighbourhoods at
+once. A race-free assignment path must end with exactly one bucket per
+neighbourhood. Reports throughput for 1, 4 and 16 writers by default.
+
+Run with: python -m benchmarks.bucket_concurrency [--writers 1 4 16] [--ops 400]
+Writes benchmark buckets to the configured database and deletes them afterwards.
+"""
+
+import argparse
+import os
+import random
+import threading
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.db import connection
+from geo.geometry import METERS_PER_DEGREE
+from geo.models import GeoBucket
+from properties.services.bucket_index import bucket_index
+from properties.services.geo_bucket import find_or_create_bucket_improved
+
+BENCH_PREFIX = 'Benchzone'
+# Far from any real listing (Gulf of Guinea), neighbourhoods 5 km apart
+ORIGIN = (0.5, 0.5)
+SPACING_METERS = 5000
+JITTER_METERS = 300
+
+
+def neighbourhoods(count):
+    step = SPACING_METERS / METERS_PER_DEGREE
+    side = int(count ** 0.5) + 1
+    return [
+        (f'{BENCH_PREFIX} {chr(65 + i % 26)}{i}',
+         ORIGIN[0] + (i // side) * step, ORIGIN[1] + (i % side) * step)
+        for i in range(count)
+    ]
+
+
+def cleanup():
+    GeoBucket.objects.filter(name__startswith=BENCH_PREFIX).delete()
+    bucket_index.reset()
+
+
+def run(writers, ops, areas):
+    jitter = JITTER_METERS / METERS_PER_DEGREE
+    rng = random.Random(writers)
+    workload = [rng.choice(areas) for _ in range(ops)]
+    per_writer = [workload[i::writers] for i in range(writers)]
+    barrier = threading.Barrier(writers + 1)
+    errors = []
+
+    def writer(tasks):
+        local_rng = random.Random()
+        barrier.wait()
+        try:
+            for name, lat, lng in tasks:
+                find_or_create_bucket_improved(
+                    name,
+                    lat + local_rng.uniform(-jitter, jitter),
+                    lng + local_rng.uniform(-jitter, jitter),
+                )
+        except Exception as exc:  # reported in the summary
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=writer, args=(tasks,)) for tasks in per_writer]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    touched = {name for name, _, _ in workload}
+    buckets = GeoBucket.objects.filter(name__startswith=BENCH_PREFIX).count()
+    return {
+        'writers': writers,
+        'ops': ops,
+        'seconds': elapsed,
+        'ops_per_sec': ops / elapsed if elapsed else 0,
+        'neighbourhoods': len(touched),
+        'buckets': buckets,
+        'duplicates': buckets - len(touched),
+        'errors': len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--ops', type=int, default=400, help='assignments per run')
+    parser.add_argument('--areas', type=int, default=20, help='new neighbourhoods per run')
+    args = parser.parse_args()
+
+    areas = neighbourhoods(args.areas)
+    print(f"{'writers':>8} {'ops':>6} {'seconds':>8} {'ops/s':>9} {'areas':>6} {'buckets':>8} {'dupes':>6} {'errors':>6}")
+    failed = False
+    for writers in args.writers:
+        cleanup()
+        try:
+            result = run(writers, args.ops, areas)
+        finally:
+            cleanup()
+        failed = failed or result['duplicates'] or result['errors']
+        print(f"{result['writers']:>8} {result['ops']:>6} {result['seconds']:>8.2f} {result['ops_per_sec']:>9.1f} "
+              f"{result['neighbourhoods']:>6} {result['buckets']:>8} {result['duplicates']:>6} {result['errors']:>6}")
+
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+"""
+Synthetic Lagos-like data generator
+
+Generates buckets around real Lagos neighbourhoods and properties scattered
+inside them, with the messy location names real feeds have (estate and phase
+suffixes, street prefixes, ", Lagos", case and spacing noise, the odd typo).
+Output is deterministic for a given ``--seed``. Default scale is
+1,000,000 properties in 50,000 buckets.
+
+Run with: python -m benchmarks.datagen [--properties 1000000] [--buckets 50000] [--clear]
+Default mode bulk-inserts buckets and properties directly and then rebuilds
+bucket aggregates and geometry (about a minute per million rows on PostGIS).
+``--through-ingest`` sends rows through bulk_create_properties instead, so
+buckets emerge from the real assignment rules; that is much slower.
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+from decimal import Decimal
+from typing import Iterator, List, Tuple
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.contrib.gis.geos import Point
+from django.db import transaction
+from geo.aggregates import rebuild_bucket_aggregates
+from geo.geometry import METERS_PER_DEGREE
+from geo.models import BucketEpoch, GeoBucket
+from properties.models import Property
+from properties.services.bucket_index import bucket_index
+from properties.services.bulk_ingest import bulk_create_properties
+from properties.services.location_matcher import normalize_location_name
+
+# name, lat, lng, spread in meters, price tier (1 = premium)
+NEIGHBOURHOODS: List[Tuple[str, float, float, int, int]] = [
+    ('Victoria Island', 6.4289, 3.4210, 2500, 1), ('Ikoyi', 6.4520, 3.4350, 2500, 1),
+    ('Lekki Phase 1', 6.4442, 3.4616, 2500, 1), ('Banana Island', 6.4660, 3.4480, 800, 1),
+    ('Eko Atlantic', 6.4090, 3.4110, 1500, 1), ('Oniru', 6.4350, 3.4500, 1200, 1),
+    ('Lekki', 6.4750, 3.5780, 6000, 2), ('Chevron', 6.4420, 3.5350, 2000, 2),
+    ('Ajah', 6.4800, 3.6400, 4000, 3), ('Sangotedo', 6.4698, 3.6285, 3500, 3),
+    ('Abraham Adesanya', 6.4680, 3.6050, 1500, 3), ('Awoyaya', 6.4650, 3.6900, 3000, 3),
+    ('Ikeja GRA', 6.6018, 3.3515, 2000, 1), ('Ikeja', 6.6030, 3.3490, 4000, 2),
+    ('Maryland', 6.5750, 3.3650, 1500, 2), ('Ogba', 6.6200, 3.3300, 2500, 3),
+    ('Magodo', 6.6190, 3.3850, 2000, 2), ('Gbagada', 6.5550, 3.3900, 2500, 2),
+    ('Yaba', 6.5150, 3.3800, 2500, 2), ('Surulere', 6.5010, 3.3560, 3500, 3),
+    ('Apapa', 6.4480, 3.3600, 3000, 3), ('Festac Town', 6.4670, 3.2830, 3000, 3),
+    ('Ikorodu', 6.6150, 3.5100, 6000, 3), ('Ketu', 6.5960, 3.3900, 2000, 3),
+    ('Ojodu Berger', 6.6390, 3.3700, 2000, 3), ('Isolo', 6.5330, 3.3250, 3000, 3),
+    ('Oshodi', 6.5550, 3.3430, 2500, 3), ('Ilupeju', 6.5560, 3.3570, 1800, 2),
+    ('Anthony Village', 6.5620, 3.3700, 1200, 2), ('Ebute Metta', 6.4890, 3.3800, 2000, 3),
+    ('Lagos Island', 6.4550, 3.3940, 2000, 2), ('Ikota', 6.4460, 3.5520, 1500, 2),
+    ('Osapa London', 6.4430, 3.5050, 1200, 2), ('Agungi', 6.4390, 3.5150, 1200, 2),
+    ('Badore', 6.5100, 3.6000, 2500, 3), ('Epe', 6.5840, 3.9830, 5000, 3),
+    ('Alimosho', 6.6100, 3.2950, 6000, 3), ('Agege', 6.6180, 3.3250, 3000, 3),
+    ('Mushin', 6.5270, 3.3540, 2500, 3), ('Ibeju Lekki', 6.4300, 3.9000, 8000, 3),
+]
+SUFFIXES = ['', '', '', ' Estate', ' Phase 2', ' Gardens', ' Extension', ' Scheme', ' Layout', ' Close']
+STREETS = ['Admiralty Way', 'Adeola Odeku Street', 'Allen Avenue', 'Herbert Macaulay Way',
+           'Awolowo Road', 'Ligali Ayorinde Street', 'Bourdillon Road', 'Obafemi Awolowo Way']
+PROPERTY_TYPES = ['Duplex', 'Terrace', 'Bungalow', 'Apartment', 'Penthouse', 'Mini Flat', 'Mansion', 'Townhouse']
+TIER_PRICE = {1: 250_000_000, 2: 80_000_000, 3: 30_000_000}
+
+GeneratedBucket = Tuple[str, float, float, int]  # name, lat, lng, tier
+
+
+def _jitter(rng: random.Random, lat: float, lng: float, sigma_meters: float) -> Tuple[float, float]:
+    d_lat = rng.gauss(0, sigma_meters) / METERS_PER_DEGREE
+    d_lng = rng.gauss(0, sigma_meters) / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+    return lat + d_lat, lng + d_lng
+
+
+def _typo(rng: random.Random, text: str) -> str:
+    if len(text) < 5:
+        return text
+    index = rng.randrange(1, len(text) - 2)
+    return text[:index] + text[index + 1] + text[index] + text[index + 2:]
+
+
+def listing_name(rng: random.Random, bucket_name: str) -> str:
+    """The name a listing agent might type for a property in this bucket"""
+    roll = rng.random()
+    if roll < 0.55:
+        name = bucket_name
+    elif roll < 0.70:
+        name = f'{bucket_name}, Lagos'
+    elif roll < 0.80:
+        name = f'{rng.choice(STREETS)}, {bucket_name}'
+    elif roll < 0.90:
+        name = bucket_name.lower()
+    elif roll < 0.95:
+        name = f'  {bucket_name.upper()} '
+    else:
+        name = _typo(rng, bucket_name)
+    return name
+
+
+def generate_buckets(rng: random.Random, count: int) -> List[GeneratedBucket]:
+    """Bucket centers spread over each neighbourhood, weighted by its area"""
+    weights = [spread ** 2 for _, _, _, spread, _ in NEIGHBOURHOODS]
+    buckets = []
+    for _ in range(count):
+        name, lat, lng, spread, tier = rng.choices(NEIGHBOURHOODS, weights)[0]
+        suffix = rng.choice(SUFFIXES)
+        center_lat, center_lng = _jitter(rng, lat, lng, spread / 2)
+        buckets.append((f'{name}{suffix}' if suffix else name, center_lat, center_lng, tier))
+    return buckets
+
+
+def generate_rows(rng: random.Random, buckets: List[GeneratedBucket], count: int) -> Iterator[Tuple[int, dict]]:
+    """``(bucket_index, row)`` pairs in ``bulk_create_properties`` row format"""
+    # Popular buckets hold far more listings than the long tail
+    weights = [1 / (rank + 10) for rank in range(len(buckets))]
+    for bucket_number in rng.choices(range(len(buckets)), weights, k=count):
+        name, lat, lng, tier = buckets[bucket_number]
+        point_lat, point_lng = _jitter(rng, lat, lng, 250)
+        bedrooms = rng.randint(1, 6)
+        price = TIER_PRICE[tier] * rng.lognormvariate(0, 0.5) * (0.5 + bedrooms / 4)
+        yield bucket_number, {
+            'title': f'{bedrooms} Bedroom {rng.choice(PROPERTY_TYPES)} in {name}',
+            'location_name': listing_name(rng, name),
+            'lat': point_lat,
+            'lng': point_lng,
+            'price': Decimal(min(price, 9_999_999_999)).quantize(Decimal('1')),
+            'bedrooms': bedrooms,
+            'bathrooms': max(1, bedrooms - rng.randint(0, 1)),
+        }
+
+
+def clear() -> None:
+    with transaction.atomic():
+        Property.objects.all().delete()
+        GeoBucket.objects.all().delete()
+        BucketEpoch.bump()
+    bucket_index.reset()
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_direct(rng: random.Random, properties: int, bucket_count: int, batch_size: int, progress) -> None:
+    buckets = generate_buckets(rng, bucket_count)
+    saved = []
+    for batch in _batches(buckets, batch_size):
+        saved.extend(GeoBucket.objects.bulk_create([
+            GeoBucket(
+                name=name,
+                normalized_name=normalize_location_name(name),
+                center=Point(lng, lat, srid=4326),
+                radius_meters=1000,
+                extent_meters=0,
+            )
+            for name, lat, lng, _ in batch
+        ]))
+    progress(0, properties)
+
+    done = 0
+    for batch in _batches(generate_rows(rng, buckets, properties), batch_size):
+        with transaction.atomic():
+            Property.objects.bulk_create([
+                Property(
+                    **{key: value for key, value in row.items() if key not in ('lat', 'lng')},
+                    location=Point(row['lng'], row['lat'], srid=4326),
+                    geo_bucket=saved[bucket_number],
+                )
+                for bucket_number, row in batch
+            ])
+        done += len(batch)
+        progress(done, properties)
+
+    # Aggregates, centroids, radii and extents for everything loaded above
+    rebuild_bucket_aggregates(batch_size=batch_size)
+    bucket_index.reset()
+
+
+def load_through_ingest(rng: random.Random, properties: int, bucket_count: int, batch_size: int, progress) -> None:
+    buckets = generate_buckets(rng, bucket_count)
+    done = 0
+    for batch in _batches(generate_rows(rng, buckets, properties), batch_size):
+        with transaction.atomic():
+            bulk_create_properties([row for _, row in batch], batch_size=min(batch_size, 2000))
+        done += len(batch)
+        progress(done, properties)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--properties', type=int, default=1_000_000)
+    parser.add_argument('--buckets', type=int, default=50_000, help='bucket count (direct mode)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--clear', action='store_true', help='delete all properties and buckets first')
+    parser.add_argument('--through-ingest', action='store_true', help='assign buckets with bulk_create_properties')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+
+    def progress(done, total):
+        elapsed = time.perf_counter() - started
+        print(f"\r{done:>10,}/{total:,} properties  {elapsed:7.1f}s", end='', flush=True)
+
+    if args.clear:
+        clear()
+    rng = random.Random(args.seed)
+    load = load_through_ingest if args.through_ingest else load_direct
+    load(rng, args.properties, args.buckets, args.batch_size, progress)
+    print(f"\n{Property.objects.count():,} properties in {GeoBucket.objects.count():,} buckets "
+          f"after {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Endpoint load scenarios: create, nearby, search, stats and listing
+
+Drives the real URL routing, middleware, views and serializers in-process
+with Django's test client, so latency and SQL query counts per request are
+measured without network noise. The response cache is off unless
+``--cache`` is given, so every request does its full work.
+
+Run with: python -m benchmarks.endpoints [--requests 500] [--scenarios nearby stats] [--save-baseline | --compare]
+Needs a seeded database (``python -m benchmarks.datagen``). Create requests
+run inside a transaction that is rolled back, so the database is left
+unchanged.
+"""
+
+import argparse
+import os
+import random
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.conf import settings
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from benchmarks.datagen import NEIGHBOURHOODS, generate_buckets, generate_rows
+from benchmarks.harness import add_baseline_arguments, finish, measure
+from properties.services.bucket_index import bucket_index
+
+SUITE = 'endpoints'
+WARMUP = 10
+
+
+class EndpointFailed(RuntimeError):
+    pass
+
+
+def _check(response, expected=200):
+    if response.status_code != expected:
+        raise EndpointFailed(f"{response.status_code} from {response.request['PATH_INFO']}: "
+                             f"{response.content[:200]!r}")
+
+
+def _points(rng, count):
+    return [(rng.uniform(6.42, 6.62), rng.uniform(3.30, 3.65)) for _ in range(count)]
+
+
+def scenarios(client, requests):
+    """``{name: operation}``; each operation sends request number ``i``"""
+    rng = random.Random(7)
+    count = requests + WARMUP
+    points = _points(rng, count)
+    names = [rng.choice(NEIGHBOURHOODS)[0].lower() for _ in range(count)]
+    rows = [row for _, row in generate_rows(rng, generate_buckets(rng, 200), count)]
+    for row in rows:
+        row['price'] = str(row['price'])
+
+    def get(path, **params):
+        _check(client.get(path, params))
+
+    return {
+        'create': lambda i: _check(client.post('/api/properties/', rows[i], content_type='application/json'), 201),
+        'nearby': lambda i: get('/api/properties/nearby/', lat=points[i][0], lng=points[i][1], radius=2000),
+        'nearby/buckets': lambda i: get('/api/properties/nearby/', lat=points[i][0], lng=points[i][1],
+                                        radius=2000, strategy='buckets'),
+        'nearby/k20': lambda i: get('/api/properties/nearby/', lat=points[i][0], lng=points[i][1], k=20),
+        'search': lambda i: get('/api/properties/', search=names[i]),
+        'stats': lambda i: get('/api/geo-buckets/stats/'),
+        'list/buckets': lambda i: get('/api/geo-buckets/', page=i % 5 + 1),
+        'list/properties': lambda i: get('/api/properties/', page=i % 5 + 1),
+        'list/properties/cursor': lambda i: get('/api/properties/', pagination='cursor'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500, help='requests per scenario')
+    parser.add_argument('--scenarios', nargs='+', help='names to run (default: all)')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache enabled')
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    suite = SUITE + ('-cached' if args.cache else '')
+    client = Client()
+    cases = scenarios(client, args.requests)
+    selected = args.scenarios or list(cases)
+    unknown = set(selected) - set(cases)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}; choose from {', '.join(cases)}")
+
+    results = []
+    with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            RESPONSE_CACHE_ENABLED=args.cache,
+    ):
+        for name in selected:
+            if name == 'create':
+                with transaction.atomic():
+                    results.append(measure(name, cases[name], args.requests))
+                    transaction.set_rollback(True)
+                # The index may have picked up rolled-back buckets on refresh
+                bucket_index.reset()
+            else:
+                results.append(measure(name, cases[name], args.requests, warmup=WARMUP))
+    finish(suite, results, args)
+
+
+if __name__ == '__main__':
+    main()
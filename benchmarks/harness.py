@@ -0,0 +1,142 @@
+"""
+Shared timing, reporting and baseline helpers for the benchmark suite
+
+Every benchmark reports, per case: operations, p50/p99 latency, throughput
+and SQL queries per operation. ``--save-baseline`` writes the results to
+``benchmarks/baselines/<suite>.json``; ``--compare`` checks a run against
+that file and exits non-zero on a regression, so the suite can gate CI.
+"""
+
+import json
+import os
+import platform
+import time
+from typing import Callable, Dict, List, Optional
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+# p50 may drift this much above the baseline before it counts as a regression;
+# p99 is reported but too noisy to gate on
+DEFAULT_TOLERANCE = 0.25
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+def measure(
+        name: str,
+        operation: Callable[[int], None],
+        iterations: int,
+        warmup: int = 0,
+        count_queries: bool = True,
+) -> dict:
+    """
+    Run ``operation(i)`` ``iterations`` times and summarize it
+
+    ``warmup`` untimed calls come first. Queries are counted on every alias
+    with ``CaptureQueriesContext``, which forces debug cursors but does not
+    otherwise change what runs.
+    """
+    for index in range(warmup):
+        operation(index)
+
+    latencies = []
+    queries = 0
+    started = time.perf_counter()
+    for index in range(iterations):
+        contexts = [CaptureQueriesContext(connections[alias]) for alias in connections] if count_queries else []
+        for context in contexts:
+            context.__enter__()
+        call_started = time.perf_counter()
+        try:
+            operation(warmup + index)
+        finally:
+            latencies.append(time.perf_counter() - call_started)
+            for context in contexts:
+                context.__exit__(None, None, None)
+                queries += len(context.captured_queries)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'name': name,
+        'ops': iterations,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'ops_per_sec': iterations / elapsed if elapsed else 0.0,
+        'queries_per_op': queries / iterations if iterations else 0.0,
+    }
+
+
+def print_results(results: List[dict]) -> None:
+    print(f"{'case':<36} {'ops':>7} {'p50 ms':>9} {'p99 ms':>9} {'ops/s':>10} {'queries':>8}")
+    for result in results:
+        print(f"{result['name']:<36} {result['ops']:>7} {result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f} "
+              f"{result['ops_per_sec']:>10.1f} {result['queries_per_op']:>8.2f}")
+
+
+def baseline_path(suite: str) -> str:
+    return os.path.join(BASELINE_DIR, f'{suite}.json')
+
+
+def save_baseline(suite: str, results: List[dict]) -> str:
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = baseline_path(suite)
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump({
+            'suite': suite,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'results': {result['name']: result for result in results},
+        }, handle, indent=2, sort_keys=True)
+        handle.write('\n')
+    return path
+
+
+def load_baseline(suite: str) -> Optional[Dict[str, dict]]:
+    try:
+        with open(baseline_path(suite), encoding='utf-8') as handle:
+            return json.load(handle)['results']
+    except FileNotFoundError:
+        return None
+
+
+def regressions(results: List[dict], baseline: Dict[str, dict], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Cases slower than the baseline p50 by more than ``tolerance`` or running more queries"""
+    found = []
+    for result in results:
+        previous = baseline.get(result['name'])
+        if previous is None:
+            continue
+        if result['p50_ms'] > previous['p50_ms'] * (1 + tolerance):
+            found.append(f"{result['name']}: p50 {result['p50_ms']:.3f} ms vs {previous['p50_ms']:.3f} ms baseline")
+        if result['queries_per_op'] > previous['queries_per_op'] + 1e-9:
+            found.append(f"{result['name']}: {result['queries_per_op']:.2f} queries/op vs "
+                         f"{previous['queries_per_op']:.2f} baseline")
+    return found
+
+
+def add_baseline_arguments(parser) -> None:
+    parser.add_argument('--save-baseline', action='store_true', help='record this run as the baseline')
+    parser.add_argument('--compare', action='store_true', help='fail on regressions against the baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed p50 slowdown as a fraction (default 0.25)')
+
+
+def finish(suite: str, results: List[dict], args) -> None:
+    """Print, then save or compare baselines as requested; exits 1 on regressions"""
+    print_results(results)
+    if args.save_baseline:
+        print(f"Baseline saved to {save_baseline(suite, results)}")
+    if args.compare:
+        baseline = load_baseline(suite)
+        if baseline is None:
+            raise SystemExit(f"No baseline at {baseline_path(suite)}; run with --save-baseline first")
+        found = regressions(results, baseline, args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        raise SystemExit(1 if found else 0)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks for the location matching and bucket assignment hot paths
+
+Cases: normalize_location_name (cold and memoized), similarity,
+SimilarityScorer.first_match, and find_or_create_bucket_improved for existing
+and new neighbourhoods, with and without the in-process bucket index.
+
+Run with: python -m benchmarks.micro [--iterations 2000] [--save-baseline | --compare]
+The find_or_create cases sample points from the configured database (seed it
+with ``python -m benchmarks.datagen``) and run inside a transaction that is
+rolled back, so the database is left unchanged.
+"""
+
+import argparse
+import os
+import random
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.db import transaction
+from django.test.utils import override_settings
+from benchmarks.datagen import NEIGHBOURHOODS, listing_name
+from benchmarks.harness import add_baseline_arguments, finish, measure
+from geo.geometry import METERS_PER_DEGREE
+from properties.models import Property
+from properties.services.bucket_index import bucket_index
+from properties.services.geo_bucket import SIMILARITY_THRESHOLD, find_or_create_bucket_improved
+from properties.services.location_matcher import (
+    LocationNormalizer, SimilarityScorer, normalize_location_name, similarity
+)
+
+SUITE = 'micro'
+# New neighbourhoods are created far from any listing (Gulf of Guinea)
+MISS_ORIGIN = (0.5, 0.5)
+MISS_SPACING_METERS = 5000
+
+
+def _names(rng, count):
+    return [listing_name(rng, rng.choice(NEIGHBOURHOODS)[0]) + f' {index}' for index in range(count)]
+
+
+def string_cases(iterations):
+    rng = random.Random(1)
+    unique = _names(rng, iterations * 2)
+    repeated = [listing_name(rng, name) for name, *_ in NEIGHBOURHOODS]
+    candidates = [name.lower() for name, *_ in NEIGHBOURHOODS]
+
+    cold = LocationNormalizer()
+    yield measure('normalize_location_name/cold', lambda i: cold.normalize(unique[i]), iterations, count_queries=False)
+    yield measure('normalize_location_name/memoized',
+                  lambda i: normalize_location_name(repeated[i % len(repeated)]),
+                  iterations, warmup=len(repeated), count_queries=False)
+    yield measure('similarity',
+                  lambda i: similarity(unique[i], candidates[i % len(candidates)]),
+                  iterations, count_queries=False)
+
+    def scorer(i):
+        SimilarityScorer(unique[i].lower()).first_match(candidates, SIMILARITY_THRESHOLD)
+
+    yield measure(f'similarity_scorer/{len(candidates)}_candidates', scorer, iterations, count_queries=False)
+
+
+@transaction.atomic
+def assignment_cases(iterations):
+    sample = list(
+        Property.objects.order_by('?').values_list('location_name', 'location')[:iterations]
+    )
+    if not sample:
+        print("No properties in the database; skipping find_or_create cases (run benchmarks.datagen)")
+        transaction.set_rollback(True)
+        return []
+
+    step = MISS_SPACING_METERS / METERS_PER_DEGREE
+    misses = [
+        (f'Benchzone {index}', MISS_ORIGIN[0] + (index // 100) * step, MISS_ORIGIN[1] + (index % 100) * step)
+        for index in range(iterations)
+    ]
+
+    def hit(i):
+        name, location = sample[i % len(sample)]
+        find_or_create_bucket_improved(name, location.y, location.x)
+
+    def miss(lat_offset):
+        # Each run gets its own area so it never matches the previous run's buckets
+        def run(i):
+            name, lat, lng = misses[i]
+            find_or_create_bucket_improved(name, lat + lat_offset, lng)
+        return run
+
+    results = []
+    for run_number, enabled in enumerate((True, False)):
+        label = 'index' if enabled else 'database'
+        with override_settings(BUCKET_INDEX_ENABLED=enabled):
+            bucket_index.reset()
+            results.append(measure(f'find_or_create/hit/{label}', hit, iterations, warmup=1))
+            results.append(measure(f'find_or_create/miss/{label}', miss(run_number), iterations))
+    transaction.set_rollback(True)
+    bucket_index.reset()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    results = list(string_cases(args.iterations))
+    results.extend(assignment_cases(args.iterations))
+    finish(SUITE, results, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""Fixtures shared by every test module (tests/, geo/tests.py, properties/tests.py)"""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def reset_bucket_index():
+    """Keep the per-process bucket, property and tile indexes from leaking rows between tests"""
+    from properties.services.bucket_index import bucket_index
+    from properties.services.geohash_tiles import tile_cache
+    from properties.services.knn import property_point_index
+    bucket_index.reset()
+    property_point_index.reset()
+    tile_cache.reset()
+    yield
+    bucket_index.reset()
+    property_point_index.reset()
+    tile_cache.reset()
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Fixtures write through the ORM, which does not bump response cache versions"""
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
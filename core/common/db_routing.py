@@ -0,0 +1,130 @@
+import functools
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Replica serving the current request's reads. None (the default) means the
+# primary, so management commands, feed loads and write paths never read stale
+# rows. One replica per request keeps e.g. a COUNT and its page consistent.
+_replica: ContextVar[Optional[str]] = ContextVar('replica', default=None)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_COOKIE = 'primary_until'
+
+
+def replica_aliases() -> List[str]:
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+def reading_from_replica() -> bool:
+    """Whether reads in the current request context are served by a replica"""
+    return _replica.get() is not None
+
+
+@contextmanager
+def use_primary():
+    """Send every read inside the block to the primary"""
+    token = _replica.set(None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def primary(function):
+    """Decorator form of ``use_primary`` for read-then-write code paths"""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with use_primary():
+            return function(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Route reads to the request's ``replica*`` alias when allowed, everything else to the primary
+
+    ReplicaRoutingMiddleware picks one random replica per safe request; all
+    writes, and all reads outside such requests, use ``default``. Every alias holds the same data, so relations are allowed
+    between any of them.
+    """
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        return _replica.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints) -> Optional[str]:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        aliases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Enable replica reads for safe requests, with read-your-writes stickiness
+
+    A client whose unsafe request (POST, ...) just succeeded gets a short-lived
+    ``primary_until`` cookie; its reads stay on the primary for
+    ``DATABASE_REPLICA_STICKINESS`` seconds, longer than the expected
+    replication lag, so it always sees what it wrote.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = _replica.set(self._choose_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica.reset(token)
+        return self._stick(request, response)
+
+    async def __acall__(self, request):
+        token = _replica.set(self._choose_replica(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _replica.reset(token)
+        return self._stick(request, response)
+
+    @staticmethod
+    def _may_use_replica(request) -> bool:
+        if request.method not in SAFE_METHODS:
+            return False
+        try:
+            return float(request.COOKIES.get(STICKY_COOKIE, 0)) < time.time()
+        except ValueError:
+            return True
+
+    @classmethod
+    def _choose_replica(cls, request) -> Optional[str]:
+        """The replica serving every read of this request, or None for the primary"""
+        aliases = replica_aliases()
+        if aliases and cls._may_use_replica(request):
+            return random.choice(aliases)
+        return None
+
+    @staticmethod
+    def _stick(request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_aliases():
+            window = getattr(settings, 'DATABASE_REPLICA_STICKINESS', 5)
+            response.set_cookie(
+                STICKY_COOKIE, f'{time.time() + window:.3f}', max_age=window, httponly=True, samesite='Lax'
+            )
+        return response
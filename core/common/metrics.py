@@ -0,0 +1,157 @@
+import logging
+import threading
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger('geo_bucket.metrics')
+
+
+class MetricsSink:
+    """
+    Destination for instrumentation events
+
+    Subclass and point ``settings.METRICS_SINK`` at the dotted path to enable
+    metrics. Tags are small ``{str: str}`` dicts.
+    """
+
+    def timing(self, name: str, seconds: float, tags: Optional[dict] = None) -> None:
+        pass
+
+    def observe(self, name: str, value: float, tags: Optional[dict] = None) -> None:
+        pass
+
+    def increment(self, name: str, value: int = 1, tags: Optional[dict] = None) -> None:
+        pass
+
+
+class LoggingSink(MetricsSink):
+    """Write every event to the ``geo_bucket.metrics`` logger at DEBUG level"""
+
+    def timing(self, name, seconds, tags=None):
+        logger.debug("%s %.6fs %s", name, seconds, tags or {})
+
+    def observe(self, name, value, tags=None):
+        logger.debug("%s %s %s", name, value, tags or {})
+
+    def increment(self, name, value=1, tags=None):
+        logger.debug("%s +%s %s", name, value, tags or {})
+
+
+class InMemorySink(MetricsSink):
+    """Collect events in memory, for tests and benchmarks"""
+
+    def __init__(self):
+        self.events: List[Tuple[str, str, float, dict]] = []
+        self._lock = threading.Lock()
+
+    def _record(self, kind, name, value, tags):
+        with self._lock:
+            self.events.append((kind, name, value, tags or {}))
+
+    def timing(self, name, seconds, tags=None):
+        self._record('timing', name, seconds, tags)
+
+    def observe(self, name, value, tags=None):
+        self._record('observe', name, value, tags)
+
+    def increment(self, name, value=1, tags=None):
+        self._record('increment', name, value, tags)
+
+    def values(self, name: str) -> List[float]:
+        return [value for _, event_name, value, _ in self.events if event_name == name]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.events = []
+
+
+_UNSET = object()
+_sink = _UNSET
+
+
+def get_sink() -> Optional[MetricsSink]:
+    """The configured sink, or None when metrics are disabled"""
+    global _sink
+    if _sink is _UNSET:
+        path = getattr(settings, 'METRICS_SINK', None)
+        _sink = import_string(path)() if path else None
+    return _sink
+
+
+def set_sink(sink: Optional[MetricsSink]) -> None:
+    """Install a sink at runtime (None disables metrics)"""
+    global _sink
+    _sink = sink
+
+
+class StageTimer:
+    """
+    Time consecutive stages of one operation
+
+    ``start(stage)`` closes the running stage and opens the next one;
+    ``finish(outcome)`` closes the last stage and emits
+    ``<prefix>.<stage>`` timings, ``<prefix>.total`` and a
+    ``<prefix>.<outcome>`` counter to the sink.
+    """
+    __slots__ = ('sink', 'prefix', 'stages', 'observations', '_stage', '_started', '_created')
+
+    def __init__(self, sink: MetricsSink, prefix: str):
+        self.sink = sink
+        self.prefix = prefix
+        self.stages: Dict[str, float] = {}
+        self.observations: Dict[str, float] = {}
+        self._stage = None
+        self._created = self._started = perf_counter()
+
+    def _close(self, now: float) -> None:
+        if self._stage is not None:
+            self.stages[self._stage] = self.stages.get(self._stage, 0.0) + now - self._started
+        self._stage = None
+
+    def start(self, stage: str) -> None:
+        now = perf_counter()
+        self._close(now)
+        self._stage = stage
+        self._started = now
+
+    def observe(self, name: str, value: float) -> None:
+        self.observations[name] = value
+
+    def finish(self, outcome: str) -> None:
+        now = perf_counter()
+        self._close(now)
+        tags = {'outcome': outcome}
+        for stage, seconds in self.stages.items():
+            self.sink.timing(f'{self.prefix}.{stage}', seconds, tags)
+        self.sink.timing(f'{self.prefix}.total', now - self._created, tags)
+        for name, value in self.observations.items():
+            self.sink.observe(f'{self.prefix}.{name}', value, tags)
+        self.sink.increment(f'{self.prefix}.{outcome}', 1, tags)
+
+
+class NullStageTimer:
+    """StageTimer stand-in used when metrics are disabled"""
+    __slots__ = ()
+
+    def start(self, stage: str) -> None:
+        pass
+
+    def observe(self, name: str, value: float) -> None:
+        pass
+
+    def finish(self, outcome: str) -> None:
+        pass
+
+
+NULL_STAGE_TIMER = NullStageTimer()
+
+
+def stage_timer(prefix: str):
+    """A StageTimer bound to the configured sink, or a shared no-op timer"""
+    sink = get_sink()
+    if sink is None:
+        return NULL_STAGE_TIMER
+    return StageTimer(sink, prefix)
@@ -1,8 +1,280 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from django.contrib.gis.measure import Distance
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on a unique composite ordering
+
+    Each page is ``WHERE (a, b) > (last_a, last_b) ORDER BY a, b LIMIT n``,
+    so deep pages cost the same as the first one and no COUNT(*) is run.
+    The view may define ``get_keyset_ordering()`` returning field names with
+    an optional ``-`` prefix (last field must be unique); the default is
+    ``('-created_at', '-id')``. An ordering the view or a filter already put
+    on the queryset (search ranking, ``?ordering=``) takes precedence and is
+    made unique with ``id``. Only forward (``next``) links are produced.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    default_ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+    unsupported_ordering_message = 'Cursor pagination is not supported for this ordering'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, view):
+        if view is not None and hasattr(view, 'get_keyset_ordering'):
+            return tuple(view.get_keyset_ordering())
+        return self.default_ordering
+
+    def get_queryset_ordering(self, queryset, view):
+        """
+        Keyset ordering for ``queryset``
+
+        The view's ordering, unless the queryset is explicitly ordered some
+        other way; then that ordering plus an ``id`` tiebreaker, so ranked
+        results keep their rank. Orderings that cannot be keyed (expressions,
+        related fields, random) are rejected.
+        """
+        ordering = self.get_ordering(view)
+        applied = tuple(queryset.query.order_by)
+        if not applied or ordering[:len(applied)] == applied:
+            return ordering
+        if not all(isinstance(field, str) and field != '?' and '__' not in field for field in applied):
+            raise ParseError(self.unsupported_ordering_message)
+        if applied[-1].lstrip('-') == 'id':
+            return applied
+        return applied + ('-id' if applied[-1].startswith('-') else 'id',)
+
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, datetime):
+            return ['dt', value.isoformat()]
+        if isinstance(value, Distance):
+            return ['f', value.m]
+        if isinstance(value, Decimal):
+            return ['dec', str(value)]
+        return ['raw', value]
+
+    @staticmethod
+    def _decode_value(pair):
+        if not isinstance(pair, list) or len(pair) != 2:
+            raise ValueError('cursor values are [kind, value] pairs')
+        kind, value = pair
+        if kind == 'dt':
+            return datetime.fromisoformat(value)
+        if kind == 'f':
+            return float(value)
+        if kind == 'dec':
+            value = Decimal(value)
+            if not value.is_finite():
+                raise ValueError('non-finite decimal in cursor')
+            return value
+        if kind == 'raw' and isinstance(value, (str, int, float)):
+            return value
+        raise ValueError(f'invalid cursor value {pair!r}')
+
+    @staticmethod
+    def _ordering_fields(queryset, ordering):
+        """Model field or annotation output field behind each ordering column"""
+        fields = []
+        for name in ordering:
+            name = name.lstrip('-')
+            annotation = queryset.query.annotations.get(name)
+            fields.append(annotation.output_field if annotation is not None else queryset.model._meta.get_field(name))
+        return fields
+
+    def encode_cursor(self, values):
+        payload = json.dumps([self._encode_value(value) for value in values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor, fields):
+        """
+        Cursor values converted by ``fields``, one per ordering column
+
+        Anything a client can tamper with (encoding, arity, value kinds and
+        types) is checked here, so a bad cursor is a 404, never a query error.
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded))
+            if not isinstance(payload, list) or len(payload) != len(fields):
+                raise ValueError('cursor does not match the ordering')
+            values = [field.to_python(self._decode_value(pair)) for field, pair in zip(fields, payload)]
+        except (TypeError, ValueError, KeyError, ArithmeticError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in values):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    @staticmethod
+    def _after(ordering, values):
+        """Q selecting rows strictly after ``values`` in ``ordering``"""
+        condition = Q()
+        for index in reversed(range(len(ordering))):
+            field = ordering[index].lstrip('-')
+            lookup = 'lt' if ordering[index].startswith('-') else 'gt'
+            step = Q(**{f'{field}__{lookup}': values[index]})
+            if index < len(ordering) - 1:
+                step |= Q(**{field: values[index]}) & condition
+            condition = step
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_queryset_ordering(queryset, view)
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            values = self.decode_cursor(cursor, self._ordering_fields(queryset, self.ordering))
+            queryset = queryset.filter(self._after(self.ordering, values))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        # Pages are model instances, or dicts from a values() queryset
+        fields = [field.lstrip('-') for field in self.ordering]
+        if isinstance(last, dict):
+            values = [last[field] for field in fields]
+        else:
+            values = [getattr(last, field) for field in fields]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
 
 
 class CustomBucketPagination(PageNumberPagination):
+    """
+    Page-number pagination, or keyset pagination when the request asks for it
+
+    Pass ``?pagination=cursor`` (or a ``cursor`` from a previous keyset page)
+    to switch to KeysetPagination for that request.
+    """
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
     page_query_param = 'page'
+    mode_query_param = 'pagination'
+
+    keyset = None
+
+    def wants_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.wants_keyset(request):
+            self.keyset = KeysetPagination()
+            self.keyset.page_size = self.page_size
+            self.keyset.max_page_size = self.max_page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class AsyncPagePagination:
+    """
+    Page-number pagination for async views
+
+    Same query params, limits and response shape as the page-number mode of
+    CustomBucketPagination; the COUNT and the page fetch use the async ORM.
+    """
+    page_size = CustomBucketPagination.page_size
+    page_size_query_param = CustomBucketPagination.page_size_query_param
+    max_page_size = CustomBucketPagination.max_page_size
+    page_query_param = CustomBucketPagination.page_query_param
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.GET.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    async def paginate_queryset(self, queryset, request):
+        """Rows of the requested page, or None when the page does not exist"""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count = await queryset.acount()
+        last_page = max(1, -(-self.count // self.page_size))
+        try:
+            self.page_number = int(request.GET.get(self.page_query_param, 1))
+        except (TypeError, ValueError):
+            return None
+        if not 1 <= self.page_number <= last_page:
+            return None
+        self.has_next = self.page_number < last_page
+
+        start = (self.page_number - 1) * self.page_size
+        return [row async for row in queryset[start:start + self.page_size]]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_data(self, data):
+        return {
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
@@ -0,0 +1,171 @@
+import logging
+import random
+import re
+from collections import Counter as ShapeCounter
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+from core.common.prometheus import COUNT_BUCKETS, registry
+
+logger = logging.getLogger('geo_bucket.profiling')
+
+_current: ContextVar[Optional['RequestProfile']] = ContextVar('request_profile', default=None)
+
+_IN_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+
+
+def sql_shape(sql: str) -> str:
+    """SQL with literals and IN-list lengths erased, so repeats of one query compare equal"""
+    sql = _STRING.sub("'?'", sql)
+    sql = _NUMBER.sub('?', sql)
+    return _IN_LIST.sub('(...)', sql)
+
+
+class RequestProfile:
+    """SQL and render timings of one sampled request"""
+    __slots__ = ('queries', 'db_seconds', 'shapes', 'render_started', 'render_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.shapes = ShapeCounter()
+        self.render_started = None
+        self.render_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook"""
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += perf_counter() - started
+            self.queries += 1
+            self.shapes[sql_shape(sql)] += 1
+
+    def repeated_shapes(self, threshold: int):
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+def add_render_time(seconds: float) -> None:
+    """Count a body rendered inside the view (``json_response``) for the current profile"""
+    profile = _current.get()
+    if profile is not None:
+        profile.render_seconds += seconds
+
+
+def _profile_queries(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile(execute, sql, params, many, context)
+
+
+def _install_wrapper(sender, connection, **kwargs):
+    if _profile_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_profile_queries)
+
+
+# Every connection carries the wrapper; it only records while a sampled
+# request's profile is set in the current context (threads and coroutines alike)
+connection_created.connect(_install_wrapper, dispatch_uid='core.common.profiling')
+
+
+REQUESTS = registry.counter('http_requests_total', 'Requests by view, method and status')
+DURATION = registry.histogram('http_request_duration_seconds', 'Total request time')
+SAMPLED = registry.counter('http_requests_profiled_total', 'Requests with SQL and render profiling')
+QUERIES = registry.histogram('http_request_db_queries', 'SQL queries per profiled request', buckets=COUNT_BUCKETS)
+DB_TIME = registry.histogram('http_request_db_seconds', 'Time in SQL per profiled request')
+RENDER_TIME = registry.histogram('http_request_render_seconds', 'Response body rendering time per profiled request')
+N_PLUS_ONE = registry.counter('http_request_n_plus_one_total', 'Profiled requests repeating one SQL shape')
+
+
+def _view_name(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None and match.view_name else 'unmatched'
+
+
+class ProfilingMiddleware:
+    """
+    Record request count and latency for every request, plus SQL and render
+    profiling for a ``PROFILING_SAMPLE_RATE`` sample
+
+    Sampled requests record query count, time in SQL, time rendering the
+    response body (DRF ``Response.render`` or ``json_response``) and flag
+    N+1 patterns: any SQL shape run at least
+    ``PROFILING_N_PLUS_ONE_THRESHOLD`` times in the request is counted and
+    logged with the ``geo_bucket.profiling`` logger. Results are served by
+    ``/metrics``. Place it first so its timings cover the other middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.01)
+        self.n_plus_one_threshold = getattr(settings, 'PROFILING_N_PLUS_ONE_THRESHOLD', 5)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        started = perf_counter()
+        profile = RequestProfile() if random.random() < self.sample_rate else None
+        token = _current.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._record(request, response, profile, perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = perf_counter()
+        profile = RequestProfile() if random.random() < self.sample_rate else None
+        token = _current.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._record(request, response, profile, perf_counter() - started)
+        return response
+
+    def process_template_response(self, request, response):
+        profile = _current.get()
+        if profile is not None:
+            profile.render_started = perf_counter()
+
+            def rendered(_):
+                profile.render_seconds += perf_counter() - profile.render_started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def _record(self, request, response, profile: Optional[RequestProfile], seconds: float) -> None:
+        view = _view_name(request)
+        REQUESTS.inc({'view': view, 'method': request.method, 'status': response.status_code})
+        DURATION.observe(seconds, {'view': view})
+        if profile is None:
+            return
+
+        labels = {'view': view}
+        SAMPLED.inc(labels)
+        QUERIES.observe(profile.queries, labels)
+        DB_TIME.observe(profile.db_seconds, labels)
+        RENDER_TIME.observe(profile.render_seconds, labels)
+
+        repeated = profile.repeated_shapes(self.n_plus_one_threshold)
+        if repeated:
+            N_PLUS_ONE.inc(labels)
+            shape, count = repeated[0]
+            logger.warning(
+                "Possible N+1 in %s %s: %d queries in %.1f ms, %dx %s",
+                request.method, request.path, profile.queries, profile.db_seconds * 1000, count, shape[:300]
+            )
@@ -0,0 +1,166 @@
+import hmac
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+import prometheus_client
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import CollectorRegistry, generate_latest, multiprocess
+
+from core.common.metrics import MetricsSink
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_INVALID_NAME = re.compile(r'[^a-zA-Z0-9_:]')
+
+
+def metric_name(name: str) -> str:
+    return _INVALID_NAME.sub('_', name)
+
+
+def multiprocess_enabled() -> bool:
+    """Whether values are shared between worker processes (see ``Registry``)"""
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+class _Metric:
+    """
+    prometheus_client metric created on first use
+
+    Label names are taken from the first observation's labels; later calls
+    fill labels they lack with ``''`` and drop labels the metric does not
+    have, so a metric never fails on inconsistent tags.
+    """
+    metric_class = None
+
+    def __init__(self, registry: CollectorRegistry, name: str, documentation: str, **kwargs):
+        self.name = name
+        self.documentation = documentation
+        self._registry = registry
+        self._kwargs = kwargs
+        self._metric = None
+        self._labelnames: Tuple[str, ...] = ()
+        self._lock = threading.Lock()
+
+    def _child(self, labels: Optional[dict]):
+        labels = {metric_name(key): str(value) for key, value in (labels or {}).items()}
+        if self._metric is None:
+            with self._lock:
+                if self._metric is None:
+                    self._labelnames = tuple(sorted(labels))
+                    self._metric = self.metric_class(
+                        self.name, self.documentation, labelnames=self._labelnames,
+                        registry=self._registry, **self._kwargs
+                    )
+        if not self._labelnames:
+            return self._metric
+        return self._metric.labels(*(labels.get(name, '') for name in self._labelnames))
+
+
+class Counter(_Metric):
+    metric_class = prometheus_client.Counter
+
+    def inc(self, labels: Optional[dict] = None, value: float = 1) -> None:
+        self._child(labels).inc(value)
+
+
+class Histogram(_Metric):
+    metric_class = prometheus_client.Histogram
+
+    def __init__(self, registry: CollectorRegistry, name: str, documentation: str,
+                 buckets: Tuple[float, ...] = SECONDS_BUCKETS):
+        super().__init__(registry, name, documentation, buckets=buckets)
+
+    def observe(self, value: float, labels: Optional[dict] = None) -> None:
+        self._child(labels).observe(value)
+
+
+class Registry:
+    """
+    Metric store rendered in the Prometheus text format
+
+    Backed by prometheus_client. With ``PROMETHEUS_MULTIPROC_DIR`` set (it
+    must be set before the workers start), every worker process writes its
+    values to files there and ``render`` sums them, so any worker serves the
+    totals of all of them; otherwise values are per process. Gunicorn must
+    then call ``prometheus_client.multiprocess.mark_process_dead`` for exited
+    workers (docker/gunicorn.conf.py does).
+    """
+
+    def __init__(self):
+        self._registry = CollectorRegistry(auto_describe=True)
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, documentation: str, **kwargs):
+        name = metric_name(name)
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(self._registry, name, documentation, **kwargs)
+        return metric
+
+    def counter(self, name: str, documentation: str = '') -> Counter:
+        return self._get(Counter, name, documentation)
+
+    def histogram(self, name: str, documentation: str = '', buckets: Tuple[float, ...] = SECONDS_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, documentation, buckets=buckets)
+
+    def render(self) -> bytes:
+        if multiprocess_enabled():
+            collected = CollectorRegistry()
+            multiprocess.MultiProcessCollector(collected)
+            return generate_latest(collected)
+        return generate_latest(self._registry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._registry = CollectorRegistry(auto_describe=True)
+            self._metrics = {}
+
+
+registry = Registry()
+
+
+class PrometheusSink(MetricsSink):
+    """
+    Publish StageTimer events on ``/metrics``
+
+    Timings become ``<name>_seconds`` histograms, observations ``<name>``
+    histograms and increments ``<name>_total`` counters; tags become labels.
+    Set ``METRICS_SINK = 'core.common.prometheus.PrometheusSink'``.
+    """
+
+    def timing(self, name, seconds, tags=None):
+        registry.histogram(f'{name}_seconds').observe(seconds, tags)
+
+    def observe(self, name, value, tags=None):
+        registry.histogram(name, buckets=COUNT_BUCKETS).observe(value, tags)
+
+    def increment(self, name, value=1, tags=None):
+        registry.counter(f'{name}_total').inc(tags, value)
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint
+    GET /metrics
+
+    Requires ``Authorization: Bearer <METRICS_TOKEN>``. Without a token the
+    endpoint only exists with DEBUG on.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse(status=404)
+    elif not hmac.compare_digest(
+        request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
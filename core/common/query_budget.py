@@ -0,0 +1,38 @@
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def get_query_budget(viewset, action: str) -> int:
+    """Look up the query budget a viewset declares for an action"""
+    try:
+        return viewset.query_budgets[action]
+    except (AttributeError, KeyError):
+        raise KeyError(f"{viewset.__name__} declares no query budget for '{action}'")
+
+
+@contextmanager
+def assert_query_budget(budget: int, using: str = 'default'):
+    """
+    Fail when the wrapped block runs more than ``budget`` SQL queries
+
+    Usage:
+        with assert_query_budget(get_query_budget(GeoBucketViewSet, 'list')):
+            api_client.get('/api/geo-buckets/')
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+
+    executed = len(context.captured_queries)
+    if executed > budget:
+        repeated = Counter(query['sql'] for query in context.captured_queries).most_common(3)
+        details = '\n'.join(f"  {count}x {sql}" for sql, count in repeated)
+        raise QueryBudgetExceeded(
+            f"{executed} queries executed, budget is {budget}. Most frequent:\n{details}"
+        )
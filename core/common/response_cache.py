@@ -0,0 +1,210 @@
+import functools
+import hashlib
+import time
+from typing import Iterable, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.common.db_routing import reading_from_replica
+from core.common.profiling import add_render_time
+from core.common.renderers import ORJSONRenderer
+
+VERSION_PREFIX = 'rc:v:'
+ENTRY_PREFIX = 'rc:e:'
+EPOCH = 'epoch'        # bumped by invalidate_all(); part of every key
+GLOBAL = 'global'      # bumped by any write; part of cross-bucket keys
+
+
+def get_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def response_cache_enabled() -> bool:
+    return getattr(settings, 'RESPONSE_CACHE_ENABLED', False)
+
+
+def _version_names(bucket_id=None) -> List[str]:
+    if bucket_id is None:
+        return [EPOCH, GLOBAL]
+    return [EPOCH, f'bucket:{bucket_id}']
+
+
+def _versions(names: List[str]) -> List[int]:
+    """
+    Current value of each version counter
+
+    Missing counters (never set, or evicted) start at the current time in
+    nanoseconds rather than 0, so a counter that is evicted and recreated can
+    never repeat a value an older cache entry was stored under.
+    """
+    cache = get_cache()
+    keys = [VERSION_PREFIX + name for name in names]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def _bump(names: Iterable[str]) -> None:
+    cache = get_cache()
+    for name in names:
+        key = VERSION_PREFIX + name
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def normalized_params(request) -> str:
+    """Query string with keys sorted, values in order and empty values dropped"""
+    params = getattr(request, 'query_params', request.GET)
+    return '&'.join(
+        f'{key}={value}'
+        for key in sorted(params)
+        for value in params.getlist(key)
+        if value != ''
+    )
+
+
+def data_version() -> tuple:
+    """Changes whenever any property write is committed; for in-process caches"""
+    return tuple(_versions(_version_names()))
+
+
+def invalidate_buckets(bucket_ids: Iterable[int]) -> None:
+    """
+    Expire cached responses affected by writes to these buckets
+
+    Bumps each bucket's version (bucket detail and bucket properties) and the
+    global version (stats, lists, nearby and search). Runs after the current
+    transaction commits so readers never cache pre-commit data under the new
+    version.
+    """
+    names = [GLOBAL] + [f'bucket:{bucket_id}' for bucket_id in set(bucket_ids)]
+    transaction.on_commit(lambda: _bump(names))
+
+
+def invalidate_all() -> None:
+    """Expire every cached response, e.g. after rebuilding aggregates"""
+    transaction.on_commit(lambda: _bump([EPOCH]))
+
+
+def entry_timeout(timeout: Optional[int] = None) -> int:
+    """
+    Cache timeout for an entry built in the current request
+
+    A replica can lag the commit that bumped the version counters, so entries
+    built from replica reads are kept at most REPLICA_CACHE_TIMEOUT seconds.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+    if reading_from_replica():
+        timeout = min(timeout, getattr(settings, 'REPLICA_CACHE_TIMEOUT', 30))
+    return timeout
+
+
+def _entry_key(request, media_type: str, versions: List[int]) -> str:
+    # Scheme and host are part of the key: paginated data holds absolute next/previous links
+    raw_key = f'{request.build_absolute_uri(request.path)}?{normalized_params(request)}|{media_type}|{versions}'
+    return hashlib.sha1(raw_key.encode()).hexdigest()
+
+
+def cached_response(scope: str = GLOBAL, timeout: Optional[int] = None):
+    """
+    Cache a viewset action's 200 response data and serve ETag / 304s
+
+    ``scope`` is ``'global'`` for responses that can change with any write,
+    or ``'bucket'`` for detail routes whose content depends only on the
+    bucket named by the ``pk`` URL kwarg. The cache key (and the ETag) is
+    derived from the scheme, host and path, the normalized query params and
+    the current version counters, so a matching ``If-None-Match`` is answered without
+    touching the database or the cache entry.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not response_cache_enabled() or request.method not in ('GET', 'HEAD'):
+                return method(self, request, *args, **kwargs)
+
+            bucket_id = kwargs.get('pk') if scope == 'bucket' else None
+            versions = _versions(_version_names(bucket_id))
+            digest = _entry_key(request, request.accepted_media_type, versions)
+            etag = f'"{digest}"'
+
+            if etag in request.headers.get('If-None-Match', ''):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                response['ETag'] = etag
+                return response
+
+            cache = get_cache()
+            entry_key = ENTRY_PREFIX + digest
+            data = cache.get(entry_key)
+            if data is None:
+                response = method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(entry_key, response.data, entry_timeout(timeout))
+            else:
+                response = Response(data)
+
+            response['ETag'] = etag
+            return response
+        return wrapper
+    return decorator
+
+
+def json_response(data, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+    """Plain Django response with the same JSON body DRF renders for ``data``"""
+    started = time.perf_counter()
+    body = ORJSONRenderer().render(data)
+    add_render_time(time.perf_counter() - started)
+    return HttpResponse(body, content_type='application/json', status=status_code)
+
+
+def async_cached_response(scope: str = GLOBAL, timeout: Optional[int] = None):
+    """
+    ``cached_response`` for async Django views returning ``json_response``
+
+    The view returns ``(data, status_code)``; 200 data is cached under the
+    same versioned keys and ETags as the sync views, with cache I/O awaited
+    so a remote cache backend never blocks the event loop.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if not response_cache_enabled() or request.method not in ('GET', 'HEAD'):
+                data, status_code = await view(request, *args, **kwargs)
+                return json_response(data, status_code)
+
+            bucket_id = kwargs.get('pk') if scope == 'bucket' else None
+            versions = await sync_to_async(_versions)(_version_names(bucket_id))
+            digest = _entry_key(request, 'application/json', versions)
+            etag = f'"{digest}"'
+
+            if etag in request.headers.get('If-None-Match', ''):
+                response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+                response['ETag'] = etag
+                return response
+
+            cache = get_cache()
+            entry_key = ENTRY_PREFIX + digest
+            data = await cache.aget(entry_key)
+            if data is None:
+                data, status_code = await view(request, *args, **kwargs)
+                if status_code != status.HTTP_200_OK:
+                    return json_response(data, status_code)
+                await cache.aset(entry_key, data, entry_timeout(timeout))
+
+            response = json_response(data)
+            response['ETag'] = etag
+            return response
+        return wrapper
+    return decorator
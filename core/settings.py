@@ -27,6 +27,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.gis',  # Required for GeoDjango
+    'django.contrib.postgres',  # pg_trgm lookups for fuzzy search
     'rest_framework',
     'geo',
     'properties',
@@ -34,7 +35,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.common.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.common.db_routing.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -97,6 +100,47 @@ if DATABASE_URL:
         engine='django.contrib.gis.db.backends.postgis'
     )
 
+# Read replicas: comma-separated URLs, exposed as aliases replica1, replica2...
+# core.common.db_routing sends reads of safe requests there and everything
+# else to default. A client keeps reading from default for
+# DATABASE_REPLICA_STICKINESS seconds after a successful write.
+# PostgreSQL URLs get the PostGIS engine, like DATABASE_URL.
+for _index, _url in enumerate(filter(None, os.getenv('DATABASE_REPLICA_URLS', '').split(',')), start=1):
+    _url = _url.strip()
+    _postgis = _url.split(':', 1)[0] in ('postgres', 'postgresql', 'postgis', 'pgsql')
+    DATABASES[f'replica{_index}'] = dj_database_url.parse(
+        _url,
+        conn_max_age=600,
+        conn_health_checks=True,
+        engine='django.contrib.gis.db.backends.postgis' if _postgis else None,
+        test_options={'MIRROR': 'default'},
+    )
+DATABASE_ROUTERS = ['core.common.db_routing.ReplicaRouter']
+DATABASE_REPLICA_STICKINESS = int(os.getenv('DATABASE_REPLICA_STICKINESS', 5))
+# Longest a cached response built from replica reads is kept
+REPLICA_CACHE_TIMEOUT = int(os.getenv('REPLICA_CACHE_TIMEOUT', 30))
+
+# Server-side connection pool (psycopg 3) shared by the sync and async views
+# of a process, one per PostgreSQL alias. When set, it replaces persistent
+# per-thread connections. Behind PgBouncer in transaction mode set
+# DATABASE_PGBOUNCER=True instead: connections are then closed after each
+# request and server-side cursors (used by .iterator()) are disabled.
+DATABASE_POOL_MAX_SIZE = int(os.getenv('DATABASE_POOL_MAX_SIZE', 0))
+DATABASE_PGBOUNCER = os.getenv('DATABASE_PGBOUNCER', 'False') == 'True'
+for _database in DATABASES.values():
+    if 'postgis' not in _database['ENGINE'] and 'postgresql' not in _database['ENGINE']:
+        continue
+    if DATABASE_PGBOUNCER:
+        _database['CONN_MAX_AGE'] = 0
+        _database['DISABLE_SERVER_SIDE_CURSORS'] = True
+    elif DATABASE_POOL_MAX_SIZE:
+        _database['CONN_MAX_AGE'] = 0
+        _database.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', 2)),
+            'max_size': DATABASE_POOL_MAX_SIZE,
+            'timeout': float(os.getenv('DATABASE_POOL_TIMEOUT', 10)),
+        }
+
 # GDAL Configuration (auto-detected in Docker)
 if os.name == 'nt':
     # Windows settings
@@ -106,6 +150,50 @@ else:
     GDAL_LIBRARY_PATH = os.getenv('GDAL_LIBRARY_PATH', '')
     GEOS_LIBRARY_PATH = os.getenv('GEOS_LIBRARY_PATH', '')
 
+# Geo-bucket assignment: match against the per-process bucket index instead of
+# querying GeoBucket on every write
+BUCKET_INDEX_ENABLED = os.getenv('BUCKET_INDEX_ENABLED', 'True') == 'True'
+
+# Instrumentation: dotted path to a core.common.metrics.MetricsSink subclass
+# (e.g. core.common.metrics.LoggingSink). Empty disables metrics.
+METRICS_SINK = os.getenv('METRICS_SINK', '')
+
+# Request profiling (core.common.profiling): every request is counted and timed;
+# this fraction also records SQL queries, DB and response render time and N+1
+# patterns (one SQL shape repeated PROFILING_N_PLUS_ONE_THRESHOLD times).
+# Served at /metrics in Prometheus format to "Authorization: Bearer <METRICS_TOKEN>";
+# without a token /metrics is only served with DEBUG on. Set
+# PROMETHEUS_MULTIPROC_DIR (as docker/Dockerfile does) to sum all worker processes.
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0.01))
+PROFILING_N_PLUS_ONE_THRESHOLD = int(os.getenv('PROFILING_N_PLUS_ONE_THRESHOLD', 5))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Response cache for read endpoints (core.common.response_cache). Set
+# CACHE_BACKEND and CACHE_LOCATION for a shared backend, e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# CACHE_LOCATION=redis://redis:6379/1
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', 'geo-bucket-system'),
+    }
+}
+# Invalidation bumps version counters in the cache, so a per-process backend
+# would leave every other worker serving stale bodies and ETags. The cache is
+# therefore only on by default with a shared backend; enabling it on local
+# memory is only safe with a single worker process.
+RESPONSE_CACHE_ENABLED = os.getenv(
+    'RESPONSE_CACHE_ENABLED', str('locmem' not in CACHE_BACKEND and 'dummy' not in CACHE_BACKEND)
+) == 'True'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300))
+# Property rows (across all geohash tiles) kept per process for
+# /api/properties/nearby/?strategy=tiles
+NEARBY_TILE_CACHE_ROWS = int(os.getenv('NEARBY_TILE_CACHE_ROWS', 200_000))
+# Seconds a rendered /api/tiles/{z}/{x}/{y}/ tile stays in the response cache
+# (only used when RESPONSE_CACHE_ENABLED; keys are versioned like other entries)
+TILE_CACHE_TIMEOUT = int(os.getenv('TILE_CACHE_TIMEOUT', 3600))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -144,6 +232,11 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # orjson encoding; same bytes as rest_framework.renderers.JSONRenderer
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.common.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
@@ -0,0 +1,259 @@
+import math
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+from django.contrib.gis.geos import Point
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Min, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least, Now, NullIf
+from django.utils import timezone
+
+from core.common.response_cache import invalidate_all, invalidate_buckets
+from geo.geometry import METERS_PER_DEGREE, haversine_meters
+from geo.models import BucketAggregate, BucketEpoch, GeoBucket
+from properties.models import Property
+from properties.services.bucket_index import bucket_index
+
+# Bucket radius is the RADIUS_PERCENTILE distance of its properties from the
+# centroid, clamped; buckets only ever tighten below the assignment radius
+RADIUS_PERCENTILE = 0.9
+MIN_RADIUS_METERS = 250
+MAX_RADIUS_METERS = 1000
+MIN_GEOMETRY_SAMPLES = 5
+# Radius holding fraction p of an isotropic 2-d normal with total variance s2
+# is sqrt(-s2 * ln(1 - p))
+_PERCENTILE_SCALE = math.sqrt(-math.log(1 - RADIUS_PERCENTILE))
+
+Geometry = Tuple[int, float, float, int, float]  # bucket id, lat, lng, radius, extent
+
+
+def annotate_bucket_aggregates(queryset):
+    """
+    Annotate GeoBuckets with property statistics read from BucketAggregate
+
+    Exposes the same names as the old ``Count/Avg/Sum`` over ``properties``
+    annotations, but as a LEFT JOIN on one row per bucket instead of a
+    GROUP BY over the Property table.
+    """
+    return queryset.annotate(
+        property_count=Coalesce(F('aggregate__property_count'), 0),
+        avg_price=ExpressionWrapper(
+            F('aggregate__price_sum') / NullIf(F('aggregate__property_count'), 0),
+            output_field=DecimalField(max_digits=20, decimal_places=2)
+        ),
+        min_price=F('aggregate__price_min'),
+        max_price=F('aggregate__price_max'),
+        total_value=F('aggregate__price_sum'),
+        total_bedrooms=F('aggregate__bedrooms_sum'),
+        total_bathrooms=F('aggregate__bathrooms_sum'),
+    )
+
+
+def bucket_geometry(
+        count: int,
+        lat_sum: float,
+        lng_sum: float,
+        lat_sq_sum: float,
+        lng_sq_sum: float
+) -> Tuple[float, float, int]:
+    """
+    Centroid and percentile radius from a bucket's coordinate moments
+
+    Returns:
+        tuple: ``(lat, lng, radius_meters)``; the radius stays at
+        MAX_RADIUS_METERS until the bucket has MIN_GEOMETRY_SAMPLES properties
+    """
+    lat = lat_sum / count
+    lng = lng_sum / count
+    if count < MIN_GEOMETRY_SAMPLES:
+        return lat, lng, MAX_RADIUS_METERS
+
+    lng_scale = METERS_PER_DEGREE * math.cos(math.radians(lat))
+    variance = (
+        max(lat_sq_sum / count - lat * lat, 0.0) * METERS_PER_DEGREE ** 2
+        + max(lng_sq_sum / count - lng * lng, 0.0) * lng_scale ** 2
+    )
+    radius = math.ceil(math.sqrt(variance) * _PERCENTILE_SCALE)
+    return lat, lng, min(max(radius, MIN_RADIUS_METERS), MAX_RADIUS_METERS)
+
+
+def _update_geometry(new_points: Dict[int, List[Tuple[float, float]]]) -> None:
+    """
+    Move touched buckets to their running centroid and adapt their radius
+
+    ``extent_meters`` stays an upper bound on member distances: it grows by
+    how far the center moved and covers the new points. Runs after the
+    aggregate UPDATEs, whose row locks serialize writers of the same bucket.
+    """
+    moments = BucketAggregate.objects.filter(bucket_id__in=list(new_points)).values_list(
+        'bucket_id', 'property_count', 'lat_sum', 'lng_sum', 'lat_sq_sum', 'lng_sq_sum'
+    )
+    buckets = GeoBucket.objects.only('id', 'center', 'extent_meters').in_bulk(list(new_points))
+    now = timezone.now()
+    updates: List[Geometry] = []
+    for bucket_id, count, lat_sum, lng_sum, lat_sq_sum, lng_sq_sum in moments:
+        bucket = buckets.get(bucket_id)
+        if bucket is None or not count:
+            continue
+        lat, lng, radius = bucket_geometry(count, lat_sum, lng_sum, lat_sq_sum, lng_sq_sum)
+        shift = haversine_meters(bucket.center.y, bucket.center.x, lat, lng)
+        extent = max(
+            [bucket.extent_meters + shift]
+            + [haversine_meters(lat, lng, point_lat, point_lng) for point_lat, point_lng in new_points[bucket_id]]
+        )
+        GeoBucket.objects.filter(pk=bucket_id).update(
+            center=Point(lng, lat, srid=4326), radius_meters=radius, extent_meters=extent, updated_at=now
+        )
+        updates.append((bucket_id, lat, lng, radius, extent))
+
+    if updates:
+        transaction.on_commit(lambda: bucket_index.update_geometry(updates))
+
+
+def record_properties(properties: Iterable[Property]) -> None:
+    """
+    Fold newly created properties into their buckets' aggregates
+
+    Issues one INSERT for missing aggregate rows and one atomic
+    ``UPDATE ... SET col = col + delta`` per touched bucket, so concurrent
+    writers never lose increments, then moves each touched bucket to its
+    running centroid and percentile radius. Call inside the transaction that
+    created the properties; cached responses for the touched buckets are
+    invalidated when it commits.
+    """
+    deltas = {}
+    new_points = defaultdict(list)
+    for property_obj in properties:
+        price = Decimal(property_obj.price or 0)
+        lat, lng = property_obj.location.y, property_obj.location.x
+        delta = deltas.get(property_obj.geo_bucket_id)
+        if delta is None:
+            delta = deltas[property_obj.geo_bucket_id] = {
+                'count': 0, 'price_sum': Decimal(0), 'price_min': price, 'price_max': price,
+                'bedrooms': 0, 'bathrooms': 0, 'lat': 0.0, 'lng': 0.0, 'lat_sq': 0.0, 'lng_sq': 0.0,
+            }
+        new_points[property_obj.geo_bucket_id].append((lat, lng))
+        delta['lat'] += lat
+        delta['lng'] += lng
+        delta['lat_sq'] += lat * lat
+        delta['lng_sq'] += lng * lng
+        delta['count'] += 1
+        delta['price_sum'] += price
+        delta['price_min'] = min(delta['price_min'], price)
+        delta['price_max'] = max(delta['price_max'], price)
+        delta['bedrooms'] += property_obj.bedrooms or 0
+        delta['bathrooms'] += property_obj.bathrooms or 0
+
+    if not deltas:
+        return
+
+    BucketAggregate.objects.bulk_create(
+        [BucketAggregate(bucket_id=bucket_id) for bucket_id in deltas],
+        ignore_conflicts=True
+    )
+    for bucket_id, delta in deltas.items():
+        price_min = Value(delta['price_min'], output_field=DecimalField(max_digits=12, decimal_places=2))
+        price_max = Value(delta['price_max'], output_field=DecimalField(max_digits=12, decimal_places=2))
+        BucketAggregate.objects.filter(bucket_id=bucket_id).update(
+            property_count=F('property_count') + delta['count'],
+            price_sum=F('price_sum') + delta['price_sum'],
+            # LEAST/GREATEST skip NULLs on PostgreSQL but return NULL on SQLite
+            price_min=Coalesce(Least('price_min', price_min), price_min),
+            price_max=Coalesce(Greatest('price_max', price_max), price_max),
+            bedrooms_sum=F('bedrooms_sum') + delta['bedrooms'],
+            bathrooms_sum=F('bathrooms_sum') + delta['bathrooms'],
+            lat_sum=F('lat_sum') + delta['lat'],
+            lng_sum=F('lng_sum') + delta['lng'],
+            lat_sq_sum=F('lat_sq_sum') + delta['lat_sq'],
+            lng_sq_sum=F('lng_sq_sum') + delta['lng_sq'],
+            updated_at=Now(),
+        )
+    _update_geometry(new_points)
+    invalidate_buckets(deltas)
+
+
+def _coordinate_moments(batch_size: int) -> Dict[int, List[float]]:
+    """``{bucket_id: [lat_sum, lng_sum, lat_sq_sum, lng_sq_sum]}`` over all properties"""
+    moments: Dict[int, List[float]] = defaultdict(lambda: [0.0, 0.0, 0.0, 0.0])
+    rows = Property.objects.order_by().values_list('geo_bucket_id', 'location')
+    for bucket_id, location in rows.iterator(chunk_size=batch_size):
+        lat, lng = location.y, location.x
+        sums = moments[bucket_id]
+        sums[0] += lat
+        sums[1] += lng
+        sums[2] += lat * lat
+        sums[3] += lng * lng
+    return moments
+
+
+def _rebuild_geometry(totals: dict, moments: Dict[int, List[float]], batch_size: int) -> List[Geometry]:
+    """Exact centroid, radius and extent of every non-empty bucket"""
+    centers = {}
+    for bucket_id, sums in moments.items():
+        centers[bucket_id] = bucket_geometry(totals[bucket_id]['property_count'], *sums)
+
+    extents: Dict[int, float] = defaultdict(float)
+    rows = Property.objects.order_by().values_list('geo_bucket_id', 'location')
+    for bucket_id, location in rows.iterator(chunk_size=batch_size):
+        lat, lng, _ = centers[bucket_id]
+        extents[bucket_id] = max(extents[bucket_id], haversine_meters(lat, lng, location.y, location.x))
+
+    return [(bucket_id, lat, lng, radius, extents[bucket_id]) for bucket_id, (lat, lng, radius) in centers.items()]
+
+
+def rebuild_bucket_aggregates(batch_size: int = 1000) -> int:
+    """
+    Recompute every bucket's aggregates and geometry from the Property table
+
+    Non-empty buckets are moved to their exact centroid with a fresh
+    percentile radius and an exact extent.
+
+    Returns:
+        int: Number of aggregate rows written
+    """
+    totals = {
+        row['geo_bucket_id']: row
+        for row in Property.objects.order_by().values('geo_bucket_id').annotate(
+            property_count=Count('id'),
+            price_sum=Sum('price'),
+            price_min=Min('price'),
+            price_max=Max('price'),
+            bedrooms_sum=Sum('bedrooms'),
+            bathrooms_sum=Sum('bathrooms'),
+        ).iterator(chunk_size=batch_size)
+    }
+    moments = _coordinate_moments(batch_size)
+
+    aggregates = []
+    for bucket_id in GeoBucket.objects.order_by().values_list('id', flat=True).iterator(chunk_size=batch_size):
+        row = totals.get(bucket_id, {})
+        lat_sum, lng_sum, lat_sq_sum, lng_sq_sum = moments.get(bucket_id, (0.0, 0.0, 0.0, 0.0))
+        aggregates.append(BucketAggregate(
+            bucket_id=bucket_id,
+            property_count=row.get('property_count', 0),
+            price_sum=row.get('price_sum') or 0,
+            price_min=row.get('price_min'),
+            price_max=row.get('price_max'),
+            bedrooms_sum=row.get('bedrooms_sum') or 0,
+            bathrooms_sum=row.get('bathrooms_sum') or 0,
+            lat_sum=lat_sum,
+            lng_sum=lng_sum,
+            lat_sq_sum=lat_sq_sum,
+            lng_sq_sum=lng_sq_sum,
+        ))
+    geometry = _rebuild_geometry(totals, moments, batch_size)
+
+    with transaction.atomic():
+        BucketAggregate.objects.all().delete()
+        BucketAggregate.objects.bulk_create(aggregates, batch_size=batch_size)
+        now = timezone.now()
+        for bucket_id, lat, lng, radius, extent in geometry:
+            GeoBucket.objects.filter(pk=bucket_id).update(
+                center=Point(lng, lat, srid=4326), radius_meters=radius, extent_meters=extent, updated_at=now
+            )
+        # Every process's bucket index reloads on the new epoch
+        BucketEpoch.bump()
+        invalidate_all()
+
+    return len(aggregates)
@@ -0,0 +1,58 @@
+"""
+Async bucket list and statistics for map clients
+
+Counterparts of ``/api/geo-buckets/`` and ``/api/geo-buckets/stats/`` served
+under ``/api/async/`` by the ASGI application; see ``properties.async_views``.
+"""
+
+from asgiref.sync import sync_to_async
+from django.views.decorators.http import require_safe
+from rest_framework import status
+
+from core.common.pagination import AsyncPagePagination
+from core.common.response_cache import async_cached_response
+from .aggregates import annotate_bucket_aggregates
+from .models import GeoBucket
+from .serializers import GeoBucketSerializer, BucketStatsSerializer
+from .utils import calculate_bucket_statistics
+
+
+@require_safe
+@async_cached_response()
+async def bucket_list(request):
+    """
+    Buckets with their property counts, newest first
+    GET /api/async/geo-buckets/
+    """
+    queryset = annotate_bucket_aggregates(GeoBucket.objects.all()).order_by('-created_at')
+    paginator = AsyncPagePagination()
+    page = await paginator.paginate_queryset(queryset, request)
+    if page is None:
+        return {"detail": "Invalid page."}, status.HTTP_404_NOT_FOUND
+    return paginator.get_paginated_data(GeoBucketSerializer(page, many=True).data), status.HTTP_200_OK
+
+
+def _statistics(time_period, include_buckets, limit):
+    stats_data = calculate_bucket_statistics(time_period, include_buckets=include_buckets, limit=limit)
+    serializer = BucketStatsSerializer(data=stats_data)
+    serializer.is_valid(raise_exception=True)
+    return serializer.data
+
+
+@require_safe
+@async_cached_response()
+async def bucket_statistics(request):
+    """
+    Statistics about geo-buckets, as ``/api/geo-buckets/stats/``
+    GET /api/async/geo-buckets/stats/?time_period=30d
+    """
+    time_period = request.GET.get('time_period')
+    include_buckets = request.GET.get('include_buckets', 'true').lower() == 'true'
+    limit = int(request.GET.get('limit', 50))
+
+    try:
+        # A handful of aggregate queries; run them together on one ORM thread
+        # rather than awaiting each one
+        return await sync_to_async(_statistics)(time_period, include_buckets, limit), status.HTTP_200_OK
+    except Exception as e:
+        return {"error": f"Failed to calculate statistics: {str(e)}"}, status.HTTP_500_INTERNAL_SERVER_ERROR
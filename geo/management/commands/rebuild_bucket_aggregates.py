@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from geo.aggregates import rebuild_bucket_aggregates
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized per-bucket property aggregates"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = rebuild_bucket_aggregates(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt aggregates for {count} buckets"))
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.10 on 2026-10-17 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+
+def populate_bucket_aggregates(apps, schema_editor):
+    GeoBucket = apps.get_model('geo', 'GeoBucket')
+    BucketAggregate = apps.get_model('geo', 'BucketAggregate')
+    Property = apps.get_model('properties', 'Property')
+
+    totals = {
+        row['geo_bucket_id']: row
+        for row in Property.objects.order_by().values('geo_bucket_id').annotate(
+            property_count=Count('id'),
+            price_sum=Sum('price'),
+            price_min=Min('price'),
+            price_max=Max('price'),
+            bedrooms_sum=Sum('bedrooms'),
+            bathrooms_sum=Sum('bathrooms'),
+        )
+    }
+    BucketAggregate.objects.bulk_create([
+        BucketAggregate(
+            bucket_id=bucket_id,
+            property_count=totals.get(bucket_id, {}).get('property_count', 0),
+            price_sum=totals.get(bucket_id, {}).get('price_sum') or 0,
+            price_min=totals.get(bucket_id, {}).get('price_min'),
+            price_max=totals.get(bucket_id, {}).get('price_max'),
+            bedrooms_sum=totals.get(bucket_id, {}).get('bedrooms_sum') or 0,
+            bathrooms_sum=totals.get(bucket_id, {}).get('bathrooms_sum') or 0,
+        )
+        for bucket_id in GeoBucket.objects.values_list('id', flat=True)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geo', '0001_initial'),
+        ('properties', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BucketAggregate',
+            fields=[
+                ('bucket', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='aggregate', serialize=False, to='geo.geobucket')),
+                ('property_count', models.IntegerField(default=0)),
+                ('price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('price_min', models.DecimalField(decimal_places=2, max_digits=12, null=True)),
+                ('price_max', models.DecimalField(decimal_places=2, max_digits=12, null=True)),
+                ('bedrooms_sum', models.IntegerField(default=0)),
+                ('bathrooms_sum', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['property_count'], name='geo_bucketa_propert_7606fb_idx')],
+            },
+        ),
+        migrations.RunPython(populate_bucket_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.10 on 2026-10-17 09:30
+
+from django.db import migrations
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm GIN indexes only exist on PostgreSQL; other backends use the
+    # in-process trigram index in properties.services.bucket_index
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS geo_geobucket_normalized_name_trgm '
+        'ON geo_geobucket USING gin (normalized_name gin_trgm_ops)'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS geo_geobucket_name_trgm '
+        'ON geo_geobucket USING gin (name gin_trgm_ops)'
+    )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS geo_geobucket_normalized_name_trgm')
+    schema_editor.execute('DROP INDEX IF EXISTS geo_geobucket_name_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geo', '0002_bucketaggregate'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
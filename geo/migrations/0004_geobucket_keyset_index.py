@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geo', '0003_bucket_name_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='geobucket',
+            index=models.Index(fields=['created_at', 'id'], name='geo_geobuck_created_f0c281_idx'),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.10 on 2026-10-17 13:00
+
+from collections import defaultdict
+
+import django.utils.timezone
+from django.db import migrations, models
+
+from geo.geometry import haversine_meters
+
+
+def populate_bucket_geometry(apps, schema_editor):
+    """Coordinate moments and exact extents; centers and radii are left as they are"""
+    GeoBucket = apps.get_model('geo', 'GeoBucket')
+    BucketAggregate = apps.get_model('geo', 'BucketAggregate')
+    Property = apps.get_model('properties', 'Property')
+
+    centers = {
+        bucket_id: (center.y, center.x)
+        for bucket_id, center in GeoBucket.objects.values_list('id', 'center').iterator(chunk_size=2000)
+    }
+    moments = defaultdict(lambda: [0.0, 0.0, 0.0, 0.0])
+    extents = defaultdict(float)
+    rows = Property.objects.order_by().values_list('geo_bucket_id', 'location')
+    for bucket_id, location in rows.iterator(chunk_size=2000):
+        lat, lng = location.y, location.x
+        sums = moments[bucket_id]
+        sums[0] += lat
+        sums[1] += lng
+        sums[2] += lat * lat
+        sums[3] += lng * lng
+        extents[bucket_id] = max(extents[bucket_id], haversine_meters(*centers[bucket_id], lat, lng))
+
+    for bucket_id, (lat_sum, lng_sum, lat_sq_sum, lng_sq_sum) in moments.items():
+        BucketAggregate.objects.filter(bucket_id=bucket_id).update(
+            lat_sum=lat_sum, lng_sum=lng_sum, lat_sq_sum=lat_sq_sum, lng_sq_sum=lng_sq_sum
+        )
+    GeoBucket.objects.update(extent_meters=0)
+    for bucket_id, extent in extents.items():
+        GeoBucket.objects.filter(pk=bucket_id).update(extent_meters=extent)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geo', '0004_geobucket_keyset_index'),
+        ('properties', '0004_feedload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geobucket',
+            name='extent_meters',
+            field=models.FloatField(default=1500),
+        ),
+        migrations.AddField(
+            model_name='geobucket',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='geobucket',
+            index=models.Index(fields=['updated_at'], name='geo_geobuck_updated_f9c0e8_idx'),
+        ),
+        migrations.AddField(
+            model_name='bucketaggregate',
+            name='lat_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bucketaggregate',
+            name='lng_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bucketaggregate',
+            name='lat_sq_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bucketaggregate',
+            name='lng_sq_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(populate_bucket_geometry, migrations.RunPython.noop),
+    ]
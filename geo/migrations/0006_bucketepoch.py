@@ -0,0 +1,26 @@
+# Generated by Django 5.2.10 on 2026-10-17 16:00
+
+from django.db import migrations, models
+
+
+def create_epoch(apps, schema_editor):
+    BucketEpoch = apps.get_model('geo', 'BucketEpoch')
+    BucketEpoch.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geo', '0005_bucket_geometry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BucketEpoch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_epoch, migrations.RunPython.noop),
+    ]
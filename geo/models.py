@@ -10,15 +10,85 @@ class GeoBucket(models.Model):
 
     center = gis_models.PointField(geography=True)
     radius_meters = models.IntegerField(default=1000)
+    # Upper bound on the distance from center to any property in the bucket
+    extent_meters = models.FloatField(default=1500)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         indexes = [
             gis_models.Index(fields=["center"]),
             models.Index(fields=["normalized_name"]),
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["updated_at"]),
         ]
         ordering = ['-created_at']
 
     def __str__(self):
         return self.name
+
+
+class BucketAggregate(models.Model):
+    """
+    Denormalized property aggregates for a bucket
+
+    Maintained incrementally as properties are created; rebuild with
+    ``manage.py rebuild_bucket_aggregates``.
+    """
+    bucket = models.OneToOneField(
+        GeoBucket,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="aggregate"
+    )
+
+    property_count = models.IntegerField(default=0)
+    price_sum = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    price_min = models.DecimalField(max_digits=12, decimal_places=2, null=True)
+    price_max = models.DecimalField(max_digits=12, decimal_places=2, null=True)
+    bedrooms_sum = models.IntegerField(default=0)
+    bathrooms_sum = models.IntegerField(default=0)
+    # Coordinate moments (degrees) for the running centroid and spread
+    lat_sum = models.FloatField(default=0)
+    lng_sum = models.FloatField(default=0)
+    lat_sq_sum = models.FloatField(default=0)
+    lng_sq_sum = models.FloatField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["property_count"]),
+        ]
+
+    def __str__(self):
+        return f"{self.bucket_id}: {self.property_count} properties"
+
+
+class BucketEpoch(models.Model):
+    """
+    Generation of the bucket table as a whole (single row)
+
+    Bumped in the transaction that replaces or rebuilds buckets wholesale
+    (re-clustering, ``rebuild_bucket_aggregates``). Every process compares
+    it with the generation its in-memory bucket index was loaded from, so
+    a change committed by any process, including a management command,
+    makes the others reload instead of handing out deleted buckets.
+    """
+    SINGLETON_ID = 1
+
+    value = models.BigIntegerField(default=0)
+
+    @classmethod
+    def current(cls) -> int:
+        return cls.objects.filter(pk=cls.SINGLETON_ID).values_list('value', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls) -> None:
+        """Call inside the transaction that replaces the buckets"""
+        if not cls.objects.filter(pk=cls.SINGLETON_ID).update(value=models.F('value') + 1):
+            cls.objects.get_or_create(pk=cls.SINGLETON_ID, defaults={'value': 1})
+
+    def __str__(self):
+        return f"bucket epoch {self.value}"
@@ -120,3 +120,31 @@ GEO_PARAMETERS=extend_schema(
 
 
 
+
+
+TILE_PARAMETERS = extend_schema(
+    parameters=[
+        OpenApiParameter(name="z", description="Zoom level (0-22)", type=OpenApiTypes.INT,
+                         location=OpenApiParameter.PATH),
+        OpenApiParameter(name="x", description="Tile column", type=OpenApiTypes.INT,
+                         location=OpenApiParameter.PATH),
+        OpenApiParameter(name="y", description="Tile row (XYZ scheme, origin top-left)", type=OpenApiTypes.INT,
+                         location=OpenApiParameter.PATH),
+    ],
+    responses={(200, 'application/vnd.geo-bucket.tile'): OpenApiTypes.BINARY},
+    description="""
+    Packed map tile for the given XYZ coordinates
+
+    Below zoom 15 the tile holds bucket clusters built from the materialized
+    bucket aggregates; from zoom 15 it holds individual property points.
+
+    Layout (little-endian): a 12-byte header ``4s magic 'GBT1', u8 zoom,
+    u8 kind (0 clusters, 1 points), u8 flags (1 = truncated), pad, u32 count``
+    followed by ``count`` records:
+    - clusters: ``u16 x, u16 y, u32 property_count, u16 bucket_count`` (10 bytes)
+    - points: ``u16 x, u16 y, u64 property_id, f64 price`` (20 bytes)
+
+    x/y are tile-local in 0..4095 with the origin at the top-left corner.
+    Responses carry an ETag; send it in If-None-Match to get a 304.
+    """
+)
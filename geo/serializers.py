@@ -1,3 +1,4 @@
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from properties.serializers import PropertySerializer
@@ -15,7 +16,11 @@ class GeoBucketSerializer(serializers.ModelSerializer):
         ]
 
     def get_property_count(self, obj):
-        return obj.properties.count()
+        # GeoBucketViewSet annotates the count; only bare instances hit the database
+        property_count = getattr(obj, 'property_count', None)
+        if property_count is None:
+            return obj.properties.count()
+        return property_count
 
 
 
@@ -56,11 +61,26 @@ class BucketStatsSerializer(serializers.Serializer):
             'extreme_buckets', 'buckets', 'time_period', 'timestamp'
         ]
 
+EMBEDDED_PROPERTIES_LIMIT = 20
+MAX_EMBEDDED_PROPERTIES_LIMIT = 100
+
+
 class BucketDetailSerializer(GeoBucketSerializer):
-    """Detailed serializer for single bucket view"""
-    properties = PropertySerializer(many=True, read_only=True, source='properties.all')
+    """
+    Detailed serializer for single bucket view
+
+    Embeds at most ``embedded_properties_limit`` (context) of the newest
+    properties; the full list is paginated under /geo-buckets/{id}/properties/.
+    Uses a prefetched ``properties`` cache when the queryset provides one.
+    """
+    properties = serializers.SerializerMethodField(method_name='get_properties')
 
     class Meta(GeoBucketSerializer.Meta):
         fields = GeoBucketSerializer.Meta.fields + ['properties']
 
+    @extend_schema_field(PropertySerializer(many=True))
+    def get_properties(self, obj):
+        limit = self.context.get('embedded_properties_limit', EMBEDDED_PROPERTIES_LIMIT)
+        return PropertySerializer(obj.properties.all()[:limit], many=True).data
+
 
@@ -1,3 +1,99 @@
-from django.test import TestCase
+from django.contrib.gis.geos import Point
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from core.common.query_budget import assert_query_budget, get_query_budget
+from geo.aggregates import rebuild_bucket_aggregates
+from geo.models import GeoBucket
+from geo.tiles import build_tile
+from geo.views import GeoBucketViewSet
+from properties.models import Property
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class GeoBucketQueryBudgetTests(TestCase):
+    """
+    Each budgeted GeoBucketViewSet action stays within ``query_budgets``
+
+    The root conftest resets the per-process indexes and the response cache
+    before every test, so budgets are measured from a cold process.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.buckets = []
+        for index, (name, lat, lng) in enumerate([
+            ('Sangotedo', 6.4698, 3.6285), ('Ikeja GRA', 6.6018, 3.3515), ('Yaba', 6.5150, 3.3800),
+        ]):
+            bucket = GeoBucket.objects.create(
+                name=name, normalized_name=name.lower(), center=Point(lng, lat, srid=4326), radius_meters=1000
+            )
+            cls.buckets.append(bucket)
+            # Enough rows that per-row queries would blow the budget
+            Property.objects.bulk_create([
+                Property(
+                    title=f'{name} listing {number}', location_name=name,
+                    location=Point(lng + number * 0.0001, lat, srid=4326),
+                    price=1_000_000 * (number + 1), bedrooms=number % 5 + 1, bathrooms=1, geo_bucket=bucket,
+                )
+                for number in range(5 + index * 5)
+            ])
+        rebuild_bucket_aggregates()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def assert_within_budget(self, action, path, params=None):
+        with assert_query_budget(get_query_budget(GeoBucketViewSet, action)):
+            response = self.client.get(path, params or {})
+        self.assertEqual(response.status_code, 200, response.content[:200])
+        return response
+
+    def test_list(self):
+        response = self.assert_within_budget('list', '/api/geo-buckets/')
+        self.assertEqual(response.json()['count'], len(self.buckets))
+
+    def test_list_cursor(self):
+        self.assert_within_budget('list', '/api/geo-buckets/', {'pagination': 'cursor'})
+
+    def test_retrieve(self):
+        bucket = self.buckets[-1]
+        response = self.assert_within_budget('retrieve', f'/api/geo-buckets/{bucket.id}/')
+        self.assertEqual(response.json()['property_count'], 15)
+
+    def test_bucket_statistics(self):
+        response = self.assert_within_budget('bucket_statistics', '/api/geo-buckets/stats/')
+        self.assertEqual(response.json()['summary']['total_properties'], 30)
+
+    def test_bucket_statistics_without_details(self):
+        self.assert_within_budget('bucket_statistics', '/api/geo-buckets/stats/', {'include_buckets': 'false'})
+
+    def test_bucket_properties(self):
+        bucket = self.buckets[-1]
+        response = self.assert_within_budget('bucket_properties', f'/api/geo-buckets/{bucket.id}/properties/')
+        self.assertEqual(len(response.json()['results']['results']), 15)
+
+
+class TileViewCacheTests(TestCase):
+    """Tiles follow RESPONSE_CACHE_ENABLED like every other cached response"""
+
+    def setUp(self):
+        GeoBucket.objects.create(
+            name='Sangotedo', normalized_name='sangotedo', center=Point(3.6285, 6.4698, srid=4326), radius_meters=1000
+        )
+        rebuild_bucket_aggregates()
+        self.client = APIClient()
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_uncached_when_disabled(self):
+        response = self.client.get('/api/tiles/0/0/0/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertEqual(response.content, build_tile(0, 0, 0))
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_etag_when_enabled(self):
+        response = self.client.get('/api/tiles/0/0/0/')
+        self.assertIn('ETag', response)
+        response = self.client.get('/api/tiles/0/0/0/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,157 @@
+import math
+import struct
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from django.contrib.gis.geos import Polygon
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+from geo.models import GeoBucket
+from properties.models import Property
+
+MAX_ZOOM = 22
+POINT_MIN_ZOOM = 15        # below this, tiles hold bucket clusters
+TILE_EXTENT = 4096         # tile-local coordinates are 0..4095, as in MVT
+CLUSTER_CELL = 256         # clusters snap to a 16 x 16 grid per tile
+MAX_TILE_POINTS = 5000
+
+MAGIC = b'GBT1'
+KIND_CLUSTERS = 0
+KIND_POINTS = 1
+FLAG_TRUNCATED = 1
+
+# magic, zoom, kind, flags, record count
+HEADER = struct.Struct('<4sBBBxI')
+# x, y, property count, bucket count
+CLUSTER = struct.Struct('<HHIH')
+# x, y, property id, price
+POINT = struct.Struct('<HHQd')
+
+CONTENT_TYPE = 'application/vnd.geo-bucket.tile'
+
+
+def valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """``(min_lng, min_lat, max_lng, max_lat)`` of a Web Mercator (XYZ) tile"""
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360 - 180, lat(y + 1), (x + 1) / n * 360 - 180, lat(y)
+
+
+def tile_envelope(z: int, x: int, y: int) -> Polygon:
+    envelope = Polygon.from_bbox(tile_bounds(z, x, y))
+    envelope.srid = 4326
+    return envelope
+
+
+def _within_tile(queryset, field: str, z: int, x: int, y: int):
+    """
+    Restrict a queryset to rows whose ``field`` lies in the tile
+
+    Geography polygons are bounded by great circles, so envelopes spanning a
+    large part of the globe (z < 3) are ambiguous; those tiles skip the
+    spatial filter and rely on the bounds check in the caller.
+    """
+    if z < 3:
+        return queryset
+    return queryset.filter(**{f'{field}__intersects': tile_envelope(z, x, y)})
+
+
+def _contains(bounds: Tuple[float, float, float, float], point) -> bool:
+    min_lng, min_lat, max_lng, max_lat = bounds
+    return min_lng <= point.x <= max_lng and min_lat <= point.y <= max_lat
+
+
+def project(lat: float, lng: float, z: int, x: int, y: int) -> Tuple[int, int]:
+    """Tile-local integer coordinates of a point, origin top-left"""
+    n = 2 ** z
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    world_x = (lng + 180) / 360 * n
+    world_y = (1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n
+    clamp = TILE_EXTENT - 1
+    return (
+        min(max(int((world_x - x) * TILE_EXTENT), 0), clamp),
+        min(max(int((world_y - y) * TILE_EXTENT), 0), clamp),
+    )
+
+
+def _cluster_tile(z: int, x: int, y: int) -> bytes:
+    """
+    Bucket clusters for low zoom levels
+
+    Reads one row per bucket (center plus the materialized property count)
+    and merges buckets on a coarse grid; each cluster sits at the
+    property-weighted centroid of its buckets.
+    """
+    buckets = _within_tile(GeoBucket.objects.order_by(), 'center', z, x, y).annotate(
+        property_count=Coalesce(F('aggregate__property_count'), 0)
+    ).values_list('center', 'property_count')
+
+    bounds = tile_bounds(z, x, y)
+    cells: Dict[Tuple[int, int], List[int]] = defaultdict(lambda: [0, 0, 0, 0, 0])
+    for center, count in buckets.iterator(chunk_size=2000):
+        if not _contains(bounds, center):
+            continue
+        px, py = project(center.y, center.x, z, x, y)
+        weight = max(count, 1)
+        cell = cells[px // CLUSTER_CELL, py // CLUSTER_CELL]
+        cell[0] += px * weight
+        cell[1] += py * weight
+        cell[2] += weight
+        cell[3] += count
+        cell[4] += 1
+
+    body = bytearray(HEADER.pack(MAGIC, z, KIND_CLUSTERS, 0, len(cells)))
+    for sum_x, sum_y, weight, count, bucket_count in cells.values():
+        body += CLUSTER.pack(sum_x // weight, sum_y // weight, min(count, 0xFFFFFFFF), min(bucket_count, 0xFFFF))
+    return bytes(body)
+
+
+def _point_tile(z: int, x: int, y: int) -> bytes:
+    """Raw property points for high zoom levels, newest first up to MAX_TILE_POINTS"""
+    rows = list(
+        _within_tile(Property.objects.all(), 'location', z, x, y)
+        .order_by('-created_at', '-id')
+        .values_list('id', 'location', 'price')[:MAX_TILE_POINTS + 1]
+    )
+    flags = FLAG_TRUNCATED if len(rows) > MAX_TILE_POINTS else 0
+    rows = rows[:MAX_TILE_POINTS]
+
+    body = bytearray(HEADER.pack(MAGIC, z, KIND_POINTS, flags, len(rows)))
+    for property_id, location, price in rows:
+        px, py = project(location.y, location.x, z, x, y)
+        body += POINT.pack(px, py, property_id, float(price or 0))
+    return bytes(body)
+
+
+def build_tile(z: int, x: int, y: int) -> bytes:
+    if z < POINT_MIN_ZOOM:
+        return _cluster_tile(z, x, y)
+    return _point_tile(z, x, y)
+
+
+def decode_tile(data: bytes) -> dict:
+    """Inverse of ``build_tile``, for clients written in Python and for tests"""
+    magic, z, kind, flags, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a geo-bucket tile")
+
+    record = CLUSTER if kind == KIND_CLUSTERS else POINT
+    records = [record.unpack_from(data, HEADER.size + index * record.size) for index in range(count)]
+    if kind == KIND_CLUSTERS:
+        features = [{'x': px, 'y': py, 'properties': n, 'buckets': b} for px, py, n, b in records]
+    else:
+        features = [{'x': px, 'y': py, 'id': pid, 'price': price} for px, py, pid, price in records]
+    return {
+        'zoom': z,
+        'kind': 'clusters' if kind == KIND_CLUSTERS else 'points',
+        'truncated': bool(flags & FLAG_TRUNCATED),
+        'features': features,
+    }
@@ -1,10 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import GeoBucketViewSet
+from . import async_views
+from .views import GeoBucketViewSet, TileView
 
 router = DefaultRouter()
 router.register(r'geo-buckets', GeoBucketViewSet, basename='geo-bucket')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('tiles/<int:z>/<int:x>/<int:y>/', TileView.as_view(), name='tile'),
+    path('async/geo-buckets/', async_views.bucket_list, name='async-geo-bucket-list'),
+    path('async/geo-buckets/stats/', async_views.bucket_statistics, name='async-geo-bucket-stats'),
 ]
\ No newline at end of file
@@ -1,15 +1,81 @@
-from django.db.models import Count, Avg, Min, Max, Sum
-from django.db.models.functions import Round
+from django.db.models import Count, Avg, Sum, F, Q
 from datetime import datetime, timedelta
+from geo.aggregates import annotate_bucket_aggregates
 from geo.models import GeoBucket
 
+MAX_BUCKET_DETAILS = 50
 
-def calculate_bucket_statistics(time_period=None):
+EFFICIENCY_THRESHOLDS = [
+    {'threshold': 1, 'label': 'Used Buckets'},
+    {'threshold': 5, 'label': 'Well-Used Buckets'},
+    {'threshold': 10, 'label': 'Highly Active Buckets'}
+]
+
+
+def _bucket_summary(buckets) -> dict:
+    """
+    Summarize annotated buckets with a single conditional-aggregation query
+
+    Every count, sum and filtered aggregate below is evaluated in one pass
+    over the buckets joined to their BucketAggregate rows.
+    """
+    used = Q(property_count__gt=0)
+    aggregates = {
+        'total_buckets': Count('id'),
+        'total_properties': Sum('property_count'),
+        'total_value': Sum('total_value'),
+        'empty_buckets': Count('id', filter=Q(property_count=0)),
+        'single_property': Count('id', filter=Q(property_count=1)),
+        'few_properties': Count('id', filter=Q(property_count__range=(2, 5))),
+        'many_properties': Count('id', filter=Q(property_count__gte=6)),
+        'buckets_with_properties': Count('id', filter=used),
+        'avg_radius': Avg('radius_meters', filter=used),
+        'radius_squared_sum': Sum(F('radius_meters') * F('radius_meters'), filter=used),
+    }
+    for config in EFFICIENCY_THRESHOLDS:
+        aggregates[f"threshold_{config['threshold']}"] = Count(
+            'id', filter=Q(property_count__gte=config['threshold'])
+        )
+    return buckets.aggregate(**aggregates)
+
+
+def _bucket_detail(bucket) -> dict:
+    return {
+        'id': bucket.id,
+        'name': bucket.name,
+        'normalized_name': bucket.normalized_name,
+        'property_count': bucket.property_count,
+        'property_stats': {
+            'avg_price': float(bucket.avg_price) if bucket.avg_price else 0,
+            'min_price': float(bucket.min_price) if bucket.min_price else 0,
+            'max_price': float(bucket.max_price) if bucket.max_price else 0,
+            'total_value': float(bucket.total_value) if bucket.total_value else 0,
+            'total_bedrooms': bucket.total_bedrooms or 0,
+            'total_bathrooms': bucket.total_bathrooms or 0,
+        },
+        'center': {
+            'lat': bucket.center.y if bucket.center else None,
+            'lng': bucket.center.x if bucket.center else None
+        },
+        'radius_meters': bucket.radius_meters,
+        'created_at': bucket.created_at.isoformat() if bucket.created_at else None,
+        'density': bucket.property_count / (
+                    3.14 * (bucket.radius_meters / 1000) ** 2) if bucket.radius_meters > 0 else 0
+    }
+
+
+def calculate_bucket_statistics(time_period=None, include_buckets=True, limit=50):
     """
     Calculate comprehensive statistics for geo-buckets
 
+    The summary, distribution, efficiency and coverage figures come from one
+    aggregate query; bucket details and the extreme buckets are ``LIMIT``
+    queries, so the query count does not grow with the number of buckets.
+
     Args:
         time_period: Optional time period filter (e.g., '7d', '30d', '90d')
+        include_buckets: Whether to load per-bucket details
+        limit: Maximum number of bucket details to return (capped at MAX_BUCKET_DETAILS)
 
     Returns:
         dict: Complete statistics data
@@ -22,101 +88,50 @@ def calculate_bucket_statistics(time_period=None):
         cutoff_date = datetime.now() - timedelta(days=days)
         queryset = queryset.filter(created_at__gte=cutoff_date)
 
-    # Annotate buckets with statistics
-    buckets = queryset.annotate(
-        property_count=Count('properties'),
-        avg_price=Avg('properties__price'),
-        min_price=Min('properties__price'),
-        max_price=Max('properties__price'),
-        total_value=Sum('properties__price'),
-        total_bedrooms=Sum('properties__bedrooms'),
-        total_bathrooms=Sum('properties__bathrooms')
-    ).order_by('-property_count')
-
-    # Calculate overall statistics
-    total_buckets = buckets.count()
-    total_properties = sum(bucket.property_count for bucket in buckets)
-    avg_properties = total_properties / total_buckets if total_buckets > 0 else 0
+    # Annotate buckets with their materialized statistics
+    buckets = annotate_bucket_aggregates(queryset).order_by('-property_count', 'id')
 
-    # Calculate coverage efficiency with multiple thresholds
-    efficiency_thresholds = [
-        {'threshold': 1, 'label': 'Used Buckets'},
-        {'threshold': 5, 'label': 'Well-Used Buckets'},
-        {'threshold': 10, 'label': 'Highly Active Buckets'}
-    ]
+    summary = _bucket_summary(buckets)
+    total_buckets = summary['total_buckets']
+    total_properties = summary['total_properties'] or 0
+    total_value = summary['total_value'] or 0
+    avg_properties = total_properties / total_buckets if total_buckets > 0 else 0
+    avg_value_per_bucket = total_value / total_buckets if total_buckets > 0 else 0
 
     efficiency_metrics = []
-    for threshold_config in efficiency_thresholds:
+    for threshold_config in EFFICIENCY_THRESHOLDS:
         threshold = threshold_config['threshold']
-        label = threshold_config['label']
-
-        efficient_count = buckets.filter(property_count__gte=threshold).count()
+        efficient_count = summary[f'threshold_{threshold}']
         efficiency_rate = (efficient_count / total_buckets * 100) if total_buckets > 0 else 0
 
         efficiency_metrics.append({
-            'label': label,
+            'label': threshold_config['label'],
             'threshold': threshold,
             'count': efficient_count,
             'percentage': round(efficiency_rate, 1)
         })
 
-    # Find extreme buckets
-    most_populated = buckets.first()
-    least_populated = buckets.filter(property_count__gt=0).last() if buckets.filter(
-        property_count__gt=0).exists() else None
-
-    # Calculate property distribution
     property_distribution = {
-        'empty_buckets': buckets.filter(property_count=0).count(),
-        'single_property': buckets.filter(property_count=1).count(),
-        'few_properties': buckets.filter(property_count__range=(2, 5)).count(),
-        'many_properties': buckets.filter(property_count__gte=6).count(),
+        'empty_buckets': summary['empty_buckets'],
+        'single_property': summary['single_property'],
+        'few_properties': summary['few_properties'],
+        'many_properties': summary['many_properties'],
     }
 
-    # Calculate value statistics
-    total_value = sum(bucket.total_value or 0 for bucket in buckets)
-    avg_value_per_bucket = total_value / total_buckets if total_buckets > 0 else 0
-
-    # Prepare bucket details (limit to top buckets for performance)
-    bucket_details = []
-    for bucket in buckets[:50]:  # Limit to top 50 buckets
-        bucket_details.append({
-            'id': bucket.id,
-            'name': bucket.name,
-            'normalized_name': bucket.normalized_name,
-            'property_count': bucket.property_count,
-            'property_stats': {
-                'avg_price': float(bucket.avg_price) if bucket.avg_price else 0,
-                'min_price': float(bucket.min_price) if bucket.min_price else 0,
-                'max_price': float(bucket.max_price) if bucket.max_price else 0,
-                'total_value': float(bucket.total_value) if bucket.total_value else 0,
-                'total_bedrooms': bucket.total_bedrooms or 0,
-                'total_bathrooms': bucket.total_bathrooms or 0,
-            },
-            'center': {
-                'lat': bucket.center.y if bucket.center else None,
-                'lng': bucket.center.x if bucket.center else None
-            },
-            'radius_meters': bucket.radius_meters,
-            'created_at': bucket.created_at.isoformat() if bucket.created_at else None,
-            'density': bucket.property_count / (
-                        3.14 * (bucket.radius_meters / 1000) ** 2) if bucket.radius_meters > 0 else 0
-        })
-
-    # Calculate coverage metrics
-    if buckets.filter(property_count__gt=0).exists():
-        avg_radius = buckets.filter(property_count__gt=0).aggregate(
-            avg_radius=Avg('radius_meters')
-        )['avg_radius'] or 0
-
-        # Estimate coverage area (simplified)
-        coverage_area = sum(
-            3.14 * (bucket.radius_meters / 1000) ** 2
-            for bucket in buckets.filter(property_count__gt=0)
-        )
-    else:
-        avg_radius = 0
-        coverage_area = 0
+    # Coverage area is the sum of bucket circles (simplified)
+    avg_radius = summary['avg_radius'] or 0
+    coverage_area = 3.14 * (summary['radius_squared_sum'] or 0) / 1_000_000
+
+    # Extreme buckets: indexed LIMIT 1 lookups instead of Python scans
+    limit = max(0, min(limit, MAX_BUCKET_DETAILS))
+    bucket_details = [_bucket_detail(bucket) for bucket in buckets[:limit]] if include_buckets else []
+    most_populated = buckets.first() if total_buckets else None
+    least_populated = buckets.filter(property_count__gt=0).order_by(
+        'property_count', '-id'
+    ).first() if summary['buckets_with_properties'] else None
+    highest_value = buckets.order_by(
+        F('total_value').desc(nulls_last=True), '-property_count', 'id'
+    ).first() if total_buckets else None
 
     return {
         'summary': {
@@ -131,28 +146,26 @@ def calculate_bucket_statistics(time_period=None):
         'coverage_metrics': {
             'avg_bucket_radius_meters': round(avg_radius, 2),
             'estimated_coverage_area_sq_km': round(coverage_area, 2),
-            'buckets_with_properties': buckets.filter(property_count__gt=0).count(),
+            'buckets_with_properties': summary['buckets_with_properties'],
         },
         'extreme_buckets': {
             'most_populated': {
-                'id': most_populated.id if most_populated else None,
-                'name': most_populated.name if most_populated else None,
-                'property_count': most_populated.property_count if most_populated else 0,
-                'total_value': float(
-                    most_populated.total_value) if most_populated and most_populated.total_value else 0,
+                'id': most_populated.id,
+                'name': most_populated.name,
+                'property_count': most_populated.property_count,
+                'total_value': float(most_populated.total_value) if most_populated.total_value else 0,
             } if most_populated else None,
             'least_populated': {
-                'id': least_populated.id if least_populated else None,
-                'name': least_populated.name if least_populated else None,
-                'property_count': least_populated.property_count if least_populated else 0,
+                'id': least_populated.id,
+                'name': least_populated.name,
+                'property_count': least_populated.property_count,
             } if least_populated else None,
             'highest_value': {
-                'id': max(buckets, key=lambda x: x.total_value or 0).id if buckets.exists() else None,
-                'total_value': float(
-                    max(buckets, key=lambda x: x.total_value or 0).total_value) if buckets.exists() else 0,
-            } if buckets.exists() else None,
+                'id': highest_value.id,
+                'total_value': float(highest_value.total_value) if highest_value.total_value else 0,
+            } if highest_value else None,
         },
         'buckets': bucket_details,
         'time_period': time_period,
         'timestamp': datetime.now().isoformat()
-    }
\ No newline at end of file
+    }
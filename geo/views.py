@@ -1,38 +1,80 @@
-from django.db.models import Count, Avg, Min, Max
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse
 from drf_spectacular.utils import extend_schema_view
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.views import APIView
 
 from core.common.pagination import CustomBucketPagination
+from core.common.response_cache import (
+    cached_response, data_version, entry_timeout, get_cache, response_cache_enabled
+)
+from properties.schemas import EXPORT_PARAMETERS
+from properties.services.export import EXPORT_FORMATS, export_response
+from properties.services.property_rows import property_rows, property_values
+from .aggregates import annotate_bucket_aggregates
 from .models import GeoBucket
-from .schemas import GEO_PARAMETERS
-from .serializers import GeoBucketSerializer, BucketStatsSerializer, BucketDetailSerializer
+from .schemas import GEO_PARAMETERS, TILE_PARAMETERS
+from .serializers import (
+    GeoBucketSerializer, BucketStatsSerializer, BucketDetailSerializer,
+    EMBEDDED_PROPERTIES_LIMIT, MAX_EMBEDDED_PROPERTIES_LIMIT
+)
+from .tiles import CONTENT_TYPE, build_tile, valid_tile
 from .utils import calculate_bucket_statistics
 
 
 @extend_schema_view(
-  bucket_statistics=GEO_PARAMETERS
+  bucket_statistics=GEO_PARAMETERS,
+  export=EXPORT_PARAMETERS
 )
 class GeoBucketViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing geo-buckets
     """
-    queryset = GeoBucket.objects.all().annotate(
-        property_count=Count('properties')
-    ).order_by('-created_at')
+    queryset = annotate_bucket_aggregates(GeoBucket.objects.all()).order_by('-created_at')
     serializer_class = GeoBucketSerializer
     pagination_class = CustomBucketPagination
     http_method_names = ['get', 'head', 'options']
 
+    # Maximum SQL queries per action; enforced by geo/tests.py
+    query_budgets = {
+        'list': 2,
+        'retrieve': 2,
+        # summary aggregate, bucket details, most/least populated, highest value
+        'bucket_statistics': 5,
+        'bucket_properties': 3,
+    }
+
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return BucketDetailSerializer
         return super().get_serializer_class()
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'retrieve':
+            try:
+                limit = int(self.request.query_params.get('properties_limit', EMBEDDED_PROPERTIES_LIMIT))
+            except ValueError:
+                limit = EMBEDDED_PROPERTIES_LIMIT
+            context['embedded_properties_limit'] = max(0, min(limit, MAX_EMBEDDED_PROPERTIES_LIMIT))
+        return context
+
+    @cached_response()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cached_response('bucket')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
 
     @action(detail=False, methods=['get'], url_path='stats')
+    @cached_response()
     def bucket_statistics(self, request):
         """
         Get comprehensive statistics about geo-buckets
@@ -44,13 +86,9 @@ class GeoBucketViewSet(viewsets.ModelViewSet):
         limit = int(request.query_params.get('limit', 50))
 
         try:
-            stats_data = calculate_bucket_statistics(time_period)
-
-            if not include_buckets:
-                stats_data['buckets'] = []
-            else:
-                # Limit bucket details
-                stats_data['buckets'] = stats_data['buckets'][:limit]
+            stats_data = calculate_bucket_statistics(
+                time_period, include_buckets=include_buckets, limit=limit
+            )
 
             # Serialize response
             serializer = BucketStatsSerializer(data=stats_data)
@@ -64,7 +102,22 @@ class GeoBucketViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Stream every bucket as NDJSON, CSV or GeoJSON
+        GET /api/geo-buckets/export/?output=csv
+        """
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"output must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return export_response('buckets', output)
+
     @action(detail=True, methods=['get'], url_path='properties')
+    @cached_response('bucket')
     def bucket_properties(self, request, pk=None):
         """
         Get all properties in a specific geo-bucket
@@ -73,24 +126,51 @@ class GeoBucketViewSet(viewsets.ModelViewSet):
         bucket = self.get_object()
 
         # Get properties in this bucket with pagination
-        properties = bucket.properties.all()
+        properties = property_values(bucket.properties.all())
 
         # Apply pagination
         page = self.paginate_queryset(properties)
         if page is not None:
-            from properties.serializers import PropertySerializer
-            serializer = PropertySerializer(page, many=True)
             return self.get_paginated_response({
                 'bucket_id': bucket.id,
                 'bucket_name': bucket.name,
-                'results': serializer.data
+                'results': property_rows(page)
             })
 
-        from properties.serializers import PropertySerializer
-        serializer = PropertySerializer(properties, many=True)
         return Response({
             'bucket_id': bucket.id,
             'bucket_name': bucket.name,
-            'results': serializer.data
+            'results': property_rows(properties)
         })
 
+
+
+class TileView(APIView):
+    """
+    Map tiles of clustered buckets (low zoom) or property points (high zoom)
+    GET /api/tiles/{z}/{x}/{y}/
+    """
+
+    @TILE_PARAMETERS
+    def get(self, request, z, x, y):
+        if not valid_tile(z, x, y):
+            return Response({"error": "Tile out of range"}, status=status.HTTP_404_NOT_FOUND)
+        if not response_cache_enabled():
+            return HttpResponse(build_tile(z, x, y), content_type=CONTENT_TYPE)
+
+        key = f'tile:{z}/{x}/{y}:{data_version()}'
+        etag = f'"{hashlib.sha1(key.encode()).hexdigest()}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+        cache = get_cache()
+        body = cache.get(key)
+        if body is None:
+            body = build_tile(z, x, y)
+            cache.set(key, body, entry_timeout(getattr(settings, 'TILE_CACHE_TIMEOUT', 3600)))
+
+        response = HttpResponse(body, content_type=CONTENT_TYPE)
+        response['ETag'] = etag
+        return response
@@ -0,0 +1,89 @@
+"""
+Async read endpoints for map clients
+
+Served under ``/api/async/`` by the ASGI application. Each view awaits its
+queries with Django's async ORM, so one worker process keeps hundreds of
+slow map queries in flight instead of one per sync worker. Responses have the
+same bodies, cache keys and ETags as their DRF counterparts.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.geos import Point
+from django.views.decorators.http import require_safe
+from rest_framework import status
+
+from core.common.pagination import AsyncPagePagination
+from core.common.response_cache import async_cached_response
+from .filters import PropertiesFilter
+from .models import Property
+from .services.property_rows import property_rows, property_values
+from .services.radius_search import bucket_first_radius_search, validate_circle
+
+INVALID_PAGE = {"detail": "Invalid page."}
+
+
+def _properties():
+    return Property.objects.all().select_related('geo_bucket')
+
+
+async def _paginated(queryset, request, wrap=None):
+    paginator = AsyncPagePagination()
+    page = await paginator.paginate_queryset(queryset, request)
+    if page is None:
+        return INVALID_PAGE, status.HTTP_404_NOT_FOUND
+
+    results = property_rows(page)
+    return paginator.get_paginated_data(wrap(results) if wrap else results), status.HTTP_200_OK
+
+
+@require_safe
+@async_cached_response()
+async def nearby_properties(request):
+    """
+    Radius search, as ``/api/properties/nearby/``
+    GET /api/async/properties/nearby/?lat=6.4698&lng=3.6285&radius=5000
+    GET /api/async/properties/nearby/?lat=6.4698&lng=3.6285&strategy=buckets
+    """
+    try:
+        lat = float(request.GET.get('lat'))
+        lng = float(request.GET.get('lng'))
+        radius = float(request.GET.get('radius', 5000))
+        validate_circle(lat, lng, radius)
+    except (TypeError, ValueError):
+        return {"error": "Invalid lat, lng or radius parameters"}, status.HTTP_400_BAD_REQUEST
+
+    point = Point(lng, lat, srid=4326)
+    strategy = request.GET.get('strategy')
+    if strategy == 'buckets':
+        # Bucket classification reads the in-process index (or one small query)
+        queryset = await sync_to_async(bucket_first_radius_search)(_properties(), lat, lng, radius)
+    elif strategy:
+        return {"error": "strategy must be 'buckets' or omitted"}, status.HTTP_400_BAD_REQUEST
+    else:
+        queryset = _properties().filter(
+            location__distance_lte=(point, radius)
+        ).annotate(
+            distance=Distance('location', point)
+        ).order_by('distance')
+
+    return await _paginated(property_values(queryset, point), request, lambda results: {
+        'center': {'lat': lat, 'lng': lng},
+        'radius_meters': radius,
+        'results': results,
+    })
+
+
+@require_safe
+@async_cached_response()
+async def search_properties(request):
+    """
+    Fuzzy location search, as ``/api/properties/?search=``
+    GET /api/async/properties/search/?search=lekki
+    """
+    queryset = _properties()
+    value = request.GET.get('search')
+    if value:
+        # Bucket ranking may read the bucket index or run one trigram query
+        queryset = await sync_to_async(PropertiesFilter.filter_search)(queryset, 'search', value)
+    return await _paginated(property_values(queryset), request)
@@ -1,12 +1,13 @@
 
 import django_filters as filters
+from django.contrib.postgres.search import TrigramWordSimilarity
 from django.db.models import QuerySet, F, Q
 from django_filters import FilterSet
 from django_filters.fields import DateRangeField as DjangoFilterDateRangeField
 from django_filters.widgets import DateRangeWidget
 
-from geo.models import GeoBucket
 from properties.models import Property
+from properties.services.fuzzy_search import order_by_bucket_rank, search_buckets, uses_pg_trgm
 
 
 class DateRangeField(DjangoFilterDateRangeField):
@@ -26,28 +27,29 @@ class PropertiesFilter(FilterSet):
 
     @staticmethod
     def filter_search(queryset,_, value):
-        """Optimized location search using geo-buckets AND text search"""
+        """Fuzzy location search: rank matching geo-buckets, then fetch their properties"""
         if not value:
             return queryset
 
         value = value.lower().strip()
 
-        # 1. FIRST: Find matching buckets (Efficient - uses database)
-
-        matching_buckets = GeoBucket.objects.filter(
-            Q(normalized_name__icontains=value) |
-            Q(name__icontains=value)
-        ).values_list('id', flat=True)[:50]  # Limit results
+        # 1. FIRST: Rank matching buckets by trigram similarity (index-backed)
+        matching_buckets = [bucket_id for bucket_id, _ in search_buckets(value)]
 
         if matching_buckets:
-            # 2. Use bucket IDs for efficient property lookup
-            return queryset.filter(geo_bucket_id__in=list(matching_buckets))
-        else:
-            # 3. Fallback: Direct property search
-            return queryset.filter(
-                Q(location_name__icontains=value) |
-                Q(geo_bucket__normalized_name__icontains=value)
-            )
+            # 2. Use bucket IDs for efficient property lookup, best bucket first
+            return order_by_bucket_rank(queryset, matching_buckets)
+
+        # 3. Fallback: Direct property search
+        if uses_pg_trgm(Property):
+            return queryset.filter(location_name__trigram_word_similar=value).annotate(
+                search_score=TrigramWordSimilarity(value, 'location_name')
+            ).order_by('-search_score', '-created_at')
+
+        return queryset.filter(
+            Q(location_name__icontains=value) |
+            Q(geo_bucket__normalized_name__icontains=value)
+        )
 
 
     class Meta:
@@ -0,0 +1,27 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from properties.services.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, SOURCES, stream_export
+
+
+class Command(BaseCommand):
+    help = "Stream all properties or buckets to a file (or stdout) as NDJSON, CSV or GeoJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(SOURCES))
+        parser.add_argument('--format', dest='output', choices=EXPORT_FORMATS, default='ndjson')
+        parser.add_argument('--output', dest='path', help="File to write; defaults to stdout")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        chunks = stream_export(options['model'], options['output'], chunk_size=options['chunk_size'])
+        if not options['path']:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            return
+
+        with open(options['path'], 'w', encoding='utf-8', newline='') as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Exported {options['model']} to {options['path']}"))
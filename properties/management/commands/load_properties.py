@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.services.feed_loader import FEED_BATCH_SIZE, FEED_FORMATS, load_feed
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV, NDJSON or GeoJSON property feed into the database with batched bucket assignment"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', dest='fmt', choices=FEED_FORMATS,
+                            help="Feed format; inferred from the file extension by default")
+        parser.add_argument('--batch-size', type=int, default=FEED_BATCH_SIZE)
+        parser.add_argument('--resume', action='store_true',
+                            help="Skip the records committed by a previous run of this file")
+
+    def handle(self, *args, **options):
+        def progress(report):
+            self.stdout.write(
+                f"{report.skipped + report.rows} rows read, {report.created} created, "
+                f"{report.rate:,.0f} rows/s"
+            )
+
+        try:
+            report = load_feed(
+                options['path'],
+                fmt=options['fmt'],
+                batch_size=options['batch_size'],
+                resume=options['resume'],
+                progress=progress,
+            )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for record_number, reason in report.rejected:
+            self.stderr.write(f"record {record_number}: {reason}")
+        if report.rejected_count > len(report.rejected):
+            self.stderr.write(f"... and {report.rejected_count - len(report.rejected)} more rejected records")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {report.created} properties from {report.rows} records "
+            f"({report.rejected_count} rejected, {report.skipped} skipped on resume) "
+            f"in {report.elapsed:.1f}s, {report.rate:,.0f} rows/s"
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from properties.services.geo_bucket import BUCKET_RADIUS_METERS, SIMILARITY_THRESHOLD
+from properties.services.reclustering import apply_plan, plan_clusters
+
+
+class Command(BaseCommand):
+    help = "Re-cluster every property into fresh geo-buckets, independent of insertion order"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--radius', type=float, default=BUCKET_RADIUS_METERS,
+                            help="Cluster radius in meters")
+        parser.add_argument('--name-similarity', type=float, default=SIMILARITY_THRESHOLD,
+                            help="Minimum normalized-name similarity for points to share a bucket")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Compute and report the new layout without writing it")
+
+    def handle(self, *args, **options):
+        plan = plan_clusters(radius_meters=options['radius'], name_similarity=options['name_similarity'])
+        self.stdout.write(
+            f"{len(plan.property_ids)} properties: {plan.old_bucket_count} buckets in use -> "
+            f"{len(plan)} clusters (planned in {plan.elapsed:.1f}s)"
+        )
+        if options['dry_run']:
+            return
+
+        deleted = apply_plan(plan)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(plan)} buckets, reassigned {len(plan.property_ids)} properties, "
+            f"deleted {deleted} empty buckets"
+        ))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.10 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0002_location_name_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['created_at', 'id'], name='properties__created_25bd25_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['geo_bucket', 'created_at', 'id'], name='properties__geo_buc_a5a52c_idx'),
+        ),
+    ]
@@ -24,9 +24,29 @@ class Property(models.Model):
         indexes = [
             gis_models.Index(fields=["location"]),
             models.Index(fields=["geo_bucket"]),
+            # Keyset pagination on (created_at, id), overall and per bucket
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["geo_bucket", "created_at", "id"]),
         ]
         ordering = ['-created_at']
 
     def __str__(self):
         return self.title
 
+
+
+class FeedLoad(models.Model):
+    """
+    Progress of a ``manage.py load_properties`` run
+
+    Updated in the same transaction as each loaded batch, so ``rows_done``
+    never disagrees with what was committed and a resumed load neither skips
+    nor duplicates rows.
+    """
+    source = models.CharField(max_length=1024, unique=True)
+    rows_done = models.BigIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} ({self.rows_done} rows)"
@@ -1,6 +1,8 @@
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 
+from .serializers import PropertyBulkSerializer
+
 PARAMETERS = extend_schema(
 
     parameters=[
@@ -66,5 +68,83 @@ PARAMETERS = extend_schema(
                 ),
             ]
         ),
+        OpenApiParameter(
+            name="k",
+            description="Return the k nearest properties (max 100) instead of everything within the radius; "
+                        "the radius is then only applied if given explicitly",
+            required=False,
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+        ),
+        OpenApiParameter(
+            name="strategy",
+            description="'exact' (default) orders every match by distance; 'buckets' filters through "
+                        "geo-buckets first and orders by nearest bucket, then newest; 'tiles' composes "
+                        "cached geohash tiles and orders by distance (page-number pagination only)",
+            required=False,
+            type=OpenApiTypes.STR,
+            enum=['exact', 'buckets', 'tiles'],
+            location=OpenApiParameter.QUERY,
+        ),
     ]
-)
\ No newline at end of file
+)
+
+BULK_PARAMETERS = extend_schema(
+    request=PropertyBulkSerializer,
+    responses={201: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+    description="""
+    Create many properties in one call with batched geo-bucket resolution
+
+    Rows are validated individually; invalid rows are reported in `results`
+    without aborting the rest of the batch. Buckets for the whole batch are
+    resolved with a single spatial query and rows are written with bulk inserts.
+    """,
+    examples=[
+        OpenApiExample(
+            'Bulk request',
+            value={
+                'properties': [
+                    {'title': 'Sangotedo Duplex', 'location_name': 'Sangotedo',
+                     'lat': 6.4698, 'lng': 3.6285, 'price': 75000000, 'bedrooms': 5, 'bathrooms': 4},
+                    {'title': 'Ikeja Flat', 'location_name': 'Ikeja GRA',
+                     'lat': 6.6018, 'lng': 3.3515, 'price': 45000000, 'bedrooms': 3, 'bathrooms': 2},
+                ]
+            },
+            request_only=True
+        ),
+        OpenApiExample(
+            'Bulk response',
+            value={
+                'total': 2,
+                'created': 2,
+                'failed': 0,
+                'buckets_created': 1,
+                'results': [
+                    {'index': 0, 'status': 'created', 'id': 101, 'geo_bucket': 1, 'bucket_created': False},
+                    {'index': 1, 'status': 'created', 'id': 102, 'geo_bucket': 26, 'bucket_created': True},
+                ]
+            },
+            response_only=True
+        ),
+    ]
+)
+
+
+EXPORT_PARAMETERS = extend_schema(
+    parameters=[
+        OpenApiParameter(
+            name="output",
+            description="Export format: ndjson (default), csv or geojson",
+            required=False,
+            type=OpenApiTypes.STR,
+            enum=['ndjson', 'csv', 'geojson'],
+            location=OpenApiParameter.QUERY,
+        ),
+    ],
+    responses={
+        (200, 'application/x-ndjson'): OpenApiTypes.STR,
+        (200, 'text/csv'): OpenApiTypes.STR,
+        (200, 'application/geo+json'): OpenApiTypes.OBJECT,
+    },
+    description="Stream the full table with constant memory; unpaginated"
+)
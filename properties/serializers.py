@@ -1,5 +1,9 @@
+from django.db import transaction
 from rest_framework import serializers
+
+from geo.aggregates import record_properties
 from .models import Property
+from .services.bulk_ingest import BULK_MAX_ROWS, bulk_create_properties
 from .services.geo_bucket import find_or_create_bucket_improved
 
 
@@ -38,11 +42,13 @@ class PropertySerializer(serializers.ModelSerializer):
             lng=lng
         )
 
-        property_obj = Property.objects.create(
-            **validated_data,
-            location=f"POINT({lng} {lat})",
-            geo_bucket=geo_bucket
-        )
+        with transaction.atomic():
+            property_obj = Property.objects.create(
+                **validated_data,
+                location=f"POINT({lng} {lat})",
+                geo_bucket=geo_bucket
+            )
+            record_properties([property_obj])
 
         return property_obj
 
@@ -55,4 +61,55 @@ class PropertySearchSerializer(serializers.Serializer):
     matching_buckets_count = serializers.IntegerField(required=False)
     center = serializers.DictField(required=False)
     radius_meters = serializers.FloatField(required=False)
-    results = PropertySerializer(many=True)
\ No newline at end of file
+    results = PropertySerializer(many=True)
+
+class PropertyBulkSerializer(serializers.Serializer):
+    """Serializer for bulk property ingestion"""
+    properties = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=BULK_MAX_ROWS
+    )
+
+    def validate(self, attrs):
+        # Validate rows one by one so a bad row is reported instead of failing the batch
+        valid_rows = []
+        row_errors = {}
+        for index, row in enumerate(attrs['properties']):
+            row_serializer = PropertySerializer(data=row)
+            if row_serializer.is_valid():
+                valid_rows.append((index, row_serializer.validated_data))
+            else:
+                row_errors[index] = row_serializer.errors
+
+        attrs['valid_rows'] = valid_rows
+        attrs['row_errors'] = row_errors
+        return attrs
+
+    def create(self, validated_data):
+        valid_rows = validated_data['valid_rows']
+        created = bulk_create_properties([row for _, row in valid_rows])
+
+        results = [
+            {'index': index, 'status': 'error', 'errors': errors}
+            for index, errors in validated_data['row_errors'].items()
+        ]
+        for (index, _), (property_obj, bucket_created) in zip(valid_rows, created):
+            results.append({
+                'index': index,
+                'status': 'created',
+                'id': property_obj.id,
+                'geo_bucket': property_obj.geo_bucket_id,
+                'bucket_created': bucket_created,
+            })
+        results.sort(key=lambda result: result['index'])
+
+        return {
+            'total': len(validated_data['properties']),
+            'created': len(created),
+            'failed': len(validated_data['row_errors']),
+            'buckets_created': len({
+                property_obj.geo_bucket_id for property_obj, bucket_created in created if bucket_created
+            }),
+            'results': results,
+        }
@@ -0,0 +1,96 @@
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.contrib.gis.geos import Point
+
+from geo.geometry import METERS_PER_DEGREE, haversine_meters
+from geo.models import GeoBucket
+
+
+class BucketGrid:
+    """
+    In-memory grid of GeoBucket centers for radius lookups
+
+    Cells are ``cell_meters`` tall; each latitude band gets its own cell width in
+    degrees of longitude so cells stay roughly square away from the equator.
+    Buckets added later are treated as newer, mirroring the ``-created_at``
+    ordering of ``GeoBucket`` querysets.
+    """
+
+    def __init__(self, cell_meters: float = 1500):
+        self.cell_deg = cell_meters / METERS_PER_DEGREE
+        self._cells: Dict[Tuple[int, int], List[Tuple[int, GeoBucket]]] = defaultdict(list)
+        self._names: Dict[str, List[Tuple[int, GeoBucket]]] = defaultdict(list)
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return self._seq
+
+    def _band_width(self, band: int) -> float:
+        edge = max(abs(band * self.cell_deg), abs((band + 1) * self.cell_deg))
+        return self.cell_deg / max(math.cos(math.radians(min(edge, 89.0))), 1e-6)
+
+    def cell_of(self, lat: float, lng: float) -> Tuple[int, int]:
+        band = math.floor(lat / self.cell_deg)
+        return band, math.floor(lng / self._band_width(band))
+
+    def add(self, bucket: GeoBucket) -> None:
+        """Add a bucket (saved or pending) to the grid as the newest entry"""
+        self._seq += 1
+        self._cells[self.cell_of(bucket.center.y, bucket.center.x)].append((self._seq, bucket))
+        self._names[bucket.normalized_name].append((self._seq, bucket))
+
+    def extend(self, buckets: Iterable[GeoBucket]) -> None:
+        """Add buckets in oldest-first order"""
+        for bucket in buckets:
+            self.add(bucket)
+
+    def move(self, bucket: GeoBucket, lat: float, lng: float) -> None:
+        """Re-file an added bucket under a new center, keeping its age"""
+        entries = self._cells.get(self.cell_of(bucket.center.y, bucket.center.x), [])
+        for index, (seq, other) in enumerate(entries):
+            if other is bucket:
+                del entries[index]
+                break
+        else:
+            return
+        bucket.center = Point(lng, lat, srid=4326)
+        self._cells[self.cell_of(lat, lng)].append((seq, bucket))
+
+    def exact(self, normalized: str, lat: float, lng: float, radius_meters: float) -> Optional[GeoBucket]:
+        """
+        Return the newest bucket with this normalized name within the radius
+
+        Buckets whose own ``radius_meters`` is smaller only match within it.
+        """
+        for _, bucket in reversed(self._names.get(normalized, ())):
+            limit = min(radius_meters, bucket.radius_meters)
+            if haversine_meters(lat, lng, bucket.center.y, bucket.center.x) <= limit:
+                return bucket
+        return None
+
+    def cells_within(self, lat: float, lng: float, radius_meters: float) -> Iterator[Tuple[int, int]]:
+        """Yield every cell that may hold a point within the radius"""
+        d_lat = radius_meters / METERS_PER_DEGREE
+        d_lng = d_lat / max(math.cos(math.radians(min(abs(lat) + d_lat, 89.0))), 1e-6)
+
+        for band in range(math.floor((lat - d_lat) / self.cell_deg),
+                          math.floor((lat + d_lat) / self.cell_deg) + 1):
+            width = self._band_width(band)
+            for col in range(math.floor((lng - d_lng) / width), math.floor((lng + d_lng) / width) + 1):
+                yield band, col
+
+    def nearby(self, lat: float, lng: float, radius_meters: float) -> List[Tuple[float, GeoBucket]]:
+        """
+        Return ``(distance_meters, bucket)`` pairs within the radius, newest first
+        """
+        found = []
+        for cell in self.cells_within(lat, lng, radius_meters):
+            for seq, bucket in self._cells.get(cell, ()):
+                distance = haversine_meters(lat, lng, bucket.center.y, bucket.center.x)
+                if distance <= radius_meters:
+                    found.append((seq, distance, bucket))
+
+        found.sort(key=lambda item: item[0], reverse=True)
+        return [(distance, bucket) for _, distance, bucket in found]
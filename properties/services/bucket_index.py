@@ -0,0 +1,193 @@
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.common.db_routing import use_primary
+from geo.models import BucketEpoch, GeoBucket
+from properties.services.bucket_grid import BucketGrid
+from properties.services.ngram_index import NgramIndex
+
+INDEX_FIELDS = ('id', 'name', 'normalized_name', 'center', 'radius_meters', 'extent_meters', 'created_at')
+# Buckets updated this long before the last refresh are pulled again, to
+# cover commits that landed after an ``updated_at`` stamp was taken
+REFRESH_OVERLAP = timedelta(seconds=5)
+# Longest a lookup trusts the loaded index without re-reading BucketEpoch
+EPOCH_CHECK_INTERVAL = 1.0
+
+
+class BucketIndex:
+    """
+    Per-process spatial and name index of every GeoBucket
+
+    Bucket centers live in a BucketGrid and bucket names in a trigram
+    NgramIndex. The index is loaded lazily on first use and then kept current by
+    ``register`` and ``update_geometry`` for buckets this process creates or
+    moves, and by ``refresh`` for buckets other workers have created or
+    moved since the last sync (indexed ``id > high-water mark`` and
+    ``updated_at`` queries). Lookups are pure in-memory. ``check_epoch``
+    re-reads the durable BucketEpoch row at most every
+    ``epoch_check_interval`` seconds (``refresh`` always reads it); it
+    changes when buckets are replaced wholesale (re-clustering, aggregate
+    rebuilds) and makes every process reload. Every index query reads the
+    primary: the index outlives the request, and the ``updated_at`` sync
+    would permanently miss updates a lagging replica had not applied yet.
+    """
+
+    def __init__(self, cell_meters: float = 1500, epoch_check_interval: float = EPOCH_CHECK_INTERVAL):
+        self.cell_meters = cell_meters
+        self.epoch_check_interval = epoch_check_interval
+        self._epoch_checked = 0.0
+        self._grid: Optional[BucketGrid] = None
+        self._names = NgramIndex()
+        self._buckets: Dict[int, GeoBucket] = {}
+        self._synced_id = 0
+        self._synced_at = None
+        self._max_extent = 0.0
+        self._epoch = None
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._grid is not None
+
+    def _add(self, bucket: GeoBucket) -> bool:
+        if bucket.pk in self._buckets:
+            return False
+        self._grid.add(bucket)
+        self._names.add(bucket.pk, bucket.normalized_name, bucket.name)
+        self._buckets[bucket.pk] = bucket
+        self._max_extent = max(self._max_extent, bucket.extent_meters)
+        return True
+
+    def _update(self, bucket_id: int, lat: float, lng: float, radius: int, extent: float) -> None:
+        bucket = self._buckets.get(bucket_id)
+        if bucket is None:
+            return
+        if (lat, lng) != (bucket.center.y, bucket.center.x):
+            self._grid.move(bucket, lat, lng)
+        bucket.radius_meters = radius
+        bucket.extent_meters = extent
+        self._max_extent = max(self._max_extent, extent)
+
+    def _ensure_loaded(self) -> BucketGrid:
+        if self._grid is None:
+            with self._lock, use_primary():
+                if self._grid is None:
+                    # Read before the buckets, so a bump during the load forces another one
+                    epoch = BucketEpoch.current()
+                    grid = BucketGrid(cell_meters=self.cell_meters)
+                    names = NgramIndex()
+                    buckets = {}
+                    max_extent = 0.0
+                    synced_at = timezone.now()
+                    for bucket in GeoBucket.objects.only(*INDEX_FIELDS).order_by('created_at', 'id'):
+                        grid.add(bucket)
+                        names.add(bucket.pk, bucket.normalized_name, bucket.name)
+                        buckets[bucket.pk] = bucket
+                        max_extent = max(max_extent, bucket.extent_meters)
+                    self._names, self._buckets, self._synced_id = names, buckets, max(buckets, default=0)
+                    self._synced_at = synced_at
+                    self._max_extent = max_extent
+                    self._epoch = epoch
+                    self._epoch_checked = time.monotonic()
+                    # Publish the grid last; readers only check it outside the lock
+                    self._grid = grid
+        return self._grid
+
+    def check_epoch(self, force: bool = False) -> None:
+        """
+        Drop the index if buckets were replaced wholesale since it was loaded
+
+        Without ``force`` the epoch is read at most once per
+        ``epoch_check_interval``, so matching stays free of per-write queries.
+        """
+        if self._grid is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._epoch_checked < self.epoch_check_interval:
+            return
+        self._epoch_checked = now
+        with use_primary():
+            epoch = BucketEpoch.current()
+        if self._epoch != epoch:
+            self.reset()
+
+    def refresh(self) -> int:
+        """
+        Pull buckets other processes created or moved; returns how many were added
+        """
+        self.check_epoch(force=True)
+        if self._grid is None:
+            self._ensure_loaded()
+            return 0
+
+        with self._lock, use_primary():
+            added = 0
+            synced_at = timezone.now()
+            changed = Q(id__gt=self._synced_id) | Q(updated_at__gte=self._synced_at - REFRESH_OVERLAP)
+            for bucket in GeoBucket.objects.only(*INDEX_FIELDS).filter(changed).order_by('id'):
+                if bucket.pk in self._buckets:
+                    self._update(bucket.pk, bucket.center.y, bucket.center.x,
+                                 bucket.radius_meters, bucket.extent_meters)
+                else:
+                    added += self._add(bucket)
+                self._synced_id = max(self._synced_id, bucket.pk)
+            self._synced_at = synced_at
+            return added
+
+    def register(self, bucket: GeoBucket) -> None:
+        """Add a bucket created by this process once its transaction commits"""
+        def _register():
+            if self._grid is not None:
+                with self._lock:
+                    self._add(bucket)
+
+        transaction.on_commit(_register)
+
+    def update_geometry(self, updates: Iterable[Tuple[int, float, float, int, float]]) -> None:
+        """Apply committed ``(bucket_id, lat, lng, radius, extent)`` changes"""
+        if self._grid is None:
+            return
+        with self._lock:
+            for update in updates:
+                self._update(*update)
+
+    def exact(self, normalized: str, lat: float, lng: float, radius_meters: float) -> Optional[GeoBucket]:
+        return self._ensure_loaded().exact(normalized, lat, lng, radius_meters)
+
+    def nearby(self, lat: float, lng: float, radius_meters: float) -> List[Tuple[float, GeoBucket]]:
+        return self._ensure_loaded().nearby(lat, lng, radius_meters)
+
+    def max_extent_meters(self) -> float:
+        """Upper bound on the ``extent_meters`` of every indexed bucket"""
+        self._ensure_loaded()
+        return self._max_extent
+
+    def search_names(self, query: str, threshold: float, limit: int) -> List[Tuple[int, float]]:
+        """Rank bucket ids by trigram similarity of their names to the query"""
+        self._ensure_loaded()
+        return self._names.search(query, threshold, limit)
+
+    def reset(self) -> None:
+        """Drop the index; it is reloaded on next use"""
+        with self._lock:
+            self._grid = None
+            self._names = NgramIndex()
+            self._buckets = {}
+            self._synced_id = 0
+            self._synced_at = None
+            self._max_extent = 0.0
+            self._epoch = None
+
+
+def bucket_index_enabled() -> bool:
+    return getattr(settings, 'BUCKET_INDEX_ENABLED', True)
+
+
+bucket_index = BucketIndex()
@@ -0,0 +1,129 @@
+from typing import List, Tuple
+
+from django.contrib.gis.geos import Point, Polygon
+
+from core.common.db_routing import primary
+from core.common.metrics import stage_timer
+from geo.aggregates import record_properties
+from geo.geometry import METERS_PER_DEGREE
+from geo.models import GeoBucket
+from properties.models import Property
+from properties.services.bucket_grid import BucketGrid
+from properties.services.bucket_index import bucket_index
+from properties.services.bucket_locks import bucket_creation_lock
+from properties.services.geo_bucket import (
+    BUCKET_RADIUS_METERS, FUZZY_RADIUS_METERS, match_bucket
+)
+from properties.services.location_matcher import normalize_location_name
+
+BULK_MAX_ROWS = 10000
+BULK_BATCH_SIZE = 1000
+
+
+def _candidate_envelope(rows: List[dict]) -> Polygon:
+    """Bounding box of the batch, padded by the fuzzy match radius"""
+    pad = FUZZY_RADIUS_METERS / METERS_PER_DEGREE * 2
+    lats = [row['lat'] for row in rows]
+    lngs = [row['lng'] for row in rows]
+    envelope = Polygon.from_bbox((
+        min(lngs) - pad, min(lats) - pad,
+        max(lngs) + pad, max(lats) + pad,
+    ))
+    envelope.srid = 4326
+    return envelope
+
+
+@primary
+def bulk_create_properties(
+        rows: List[dict],
+        batch_size: int = BULK_BATCH_SIZE
+) -> List[Tuple[Property, bool]]:
+    """
+    Create many properties with a single bucket-resolution pass
+
+    Candidate buckets for the whole batch are fetched with one spatial query and
+    indexed in a BucketGrid; rows are then matched in input order with the same
+    rules as ``find_or_create_bucket_improved``, so a bucket created for an early
+    row is visible to later rows. New buckets and properties are written with
+    ``bulk_create``.
+
+    Args:
+        rows: Validated property data (``PropertySerializer.validated_data``)
+        batch_size: Rows per INSERT statement
+
+    Returns:
+        list: ``(property, bucket_created)`` tuples in input order
+    """
+    if not rows:
+        return []
+
+    timer = stage_timer('bulk_ingest')
+    timer.observe('rows', len(rows))
+
+    # Hold the creation locks for the whole batch area so concurrent writers
+    # cannot create a bucket between our candidate fetch and our inserts
+    timer.start('lock')
+    with bucket_creation_lock(((row['lat'], row['lng']) for row in rows), FUZZY_RADIUS_METERS):
+        created = _resolve_and_write(rows, batch_size, timer)
+
+    timer.finish('created')
+    return created
+
+
+def _resolve_and_write(rows: List[dict], batch_size: int, timer) -> List[Tuple[Property, bool]]:
+    timer.start('candidate_fetch')
+    grid = BucketGrid(cell_meters=FUZZY_RADIUS_METERS)
+    grid.extend(
+        GeoBucket.objects.filter(center__intersects=_candidate_envelope(rows))
+        .only('id', 'name', 'normalized_name', 'center', 'radius_meters', 'extent_meters', 'created_at')
+        .order_by('created_at', 'id')
+    )
+
+    new_buckets: List[GeoBucket] = []
+    new_bucket_ids = set()
+    assignments: List[Tuple[dict, GeoBucket]] = []
+
+    timer.start('match')
+    for row in rows:
+        location_name = row['location_name']
+        normalized = normalize_location_name(location_name)
+
+        bucket = match_bucket(normalized, grid.nearby(row['lat'], row['lng'], FUZZY_RADIUS_METERS))
+        if bucket is None:
+            bucket = GeoBucket(
+                name=location_name,
+                normalized_name=normalized,
+                center=Point(row['lng'], row['lat'], srid=4326),
+                radius_meters=BUCKET_RADIUS_METERS,
+                extent_meters=0,
+            )
+            grid.add(bucket)
+            new_buckets.append(bucket)
+            new_bucket_ids.add(id(bucket))
+
+        assignments.append((row, bucket))
+
+    timer.start('write')
+    properties = []
+    for row, bucket in assignments:
+        data = {key: value for key, value in row.items() if key not in ('lat', 'lng')}
+        properties.append(Property(
+            **data,
+            location=Point(row['lng'], row['lat'], srid=4326),
+            geo_bucket=bucket,
+        ))
+
+    # Pending buckets get their primary keys here; bulk_create on the
+    # properties then picks up the FK values from the bucket instances.
+    GeoBucket.objects.bulk_create(new_buckets, batch_size=batch_size)
+    Property.objects.bulk_create(properties, batch_size=batch_size)
+    # Register first so the geometry update queued by record_properties finds them
+    for bucket in new_buckets:
+        bucket_index.register(bucket)
+    record_properties(properties)
+
+    timer.observe('buckets_created', len(new_buckets))
+    return [
+        (property_obj, id(bucket) in new_bucket_ids)
+        for property_obj, (_, bucket) in zip(properties, assignments)
+    ]
@@ -0,0 +1,160 @@
+import csv
+import json
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from geo.models import GeoBucket
+from properties.models import Property
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ('ndjson', 'csv', 'geojson')
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'geojson': 'application/geo+json',
+}
+
+_json = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
+
+def _datetime(value: datetime) -> str:
+    # Always UTC with an explicit offset, whatever the connection's time zone
+    return timezone.localtime(value, dt_timezone.utc).isoformat()
+
+
+def _decimal(value: Decimal) -> str:
+    return str(value) if value is not None else None
+
+
+class ExportSource:
+    """
+    Columns of one exportable model
+
+    ``values`` lists the ``values_list`` lookups to read; ``row`` turns one
+    tuple into ``(columns, lat, lng)`` where ``columns`` are the
+    JSON-ready values in ``columns`` order.
+    """
+
+    def __init__(self, queryset: Callable, values: Tuple[str, ...], columns: Tuple[str, ...],
+                 row: Callable[[tuple], Tuple[list, float, float]]):
+        self.queryset = queryset
+        self.values = values
+        self.columns = columns
+        self.row = row
+
+    def rows(self, chunk_size: int) -> Iterator[Tuple[list, float, float]]:
+        queryset = self.queryset().order_by('id').values_list(*self.values)
+        row = self.row
+        for values in queryset.iterator(chunk_size=chunk_size):
+            yield row(values)
+
+
+def _property_row(values):
+    property_id, title, location_name, location, price, bedrooms, bathrooms, bucket_id, created_at = values
+    lat, lng = location.y, location.x
+    return [
+        property_id, title, location_name, lat, lng, _decimal(price),
+        bedrooms, bathrooms, bucket_id, _datetime(created_at),
+    ], lat, lng
+
+
+def _bucket_row(values):
+    bucket_id, name, normalized_name, center, radius, count, created_at = values
+    lat, lng = center.y, center.x
+    return [bucket_id, name, normalized_name, lat, lng, radius, count, _datetime(created_at)], lat, lng
+
+
+SOURCES: Dict[str, ExportSource] = {
+    'properties': ExportSource(
+        lambda: Property.objects.all(),
+        ('id', 'title', 'location_name', 'location', 'price', 'bedrooms', 'bathrooms',
+         'geo_bucket_id', 'created_at'),
+        ('id', 'title', 'location_name', 'lat', 'lng', 'price', 'bedrooms', 'bathrooms',
+         'geo_bucket', 'created_at'),
+        _property_row,
+    ),
+    'buckets': ExportSource(
+        lambda: GeoBucket.objects.annotate(property_count=Coalesce(F('aggregate__property_count'), 0)),
+        ('id', 'name', 'normalized_name', 'center', 'radius_meters', 'property_count', 'created_at'),
+        ('id', 'name', 'normalized_name', 'lat', 'lng', 'radius_meters', 'property_count', 'created_at'),
+        _bucket_row,
+    ),
+}
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the text, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def _batched(lines: Iterable[str], size: int) -> Iterator[str]:
+    batch: List[str] = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def _ndjson(source: ExportSource, chunk_size: int) -> Iterator[str]:
+    columns = source.columns
+    for values, _, _ in source.rows(chunk_size):
+        yield _json(dict(zip(columns, values))) + '\n'
+
+
+def _csv(source: ExportSource, chunk_size: int) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(source.columns)
+    for values, _, _ in source.rows(chunk_size):
+        yield writer.writerow(values)
+
+
+def _geojson(source: ExportSource, chunk_size: int) -> Iterator[str]:
+    columns = source.columns
+    yield '{"type":"FeatureCollection","features":['
+    separator = ''
+    for values, lat, lng in source.rows(chunk_size):
+        feature = {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [lng, lat]},
+            'properties': {column: value for column, value in zip(columns, values) if column not in ('lat', 'lng')},
+        }
+        yield separator + _json(feature)
+        separator = ','
+    yield ']}\n'
+
+
+_ENCODERS = {'ndjson': _ndjson, 'csv': _csv, 'geojson': _geojson}
+
+
+def stream_export(model: str, output: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Stream every row of ``model`` (``properties`` or ``buckets``) as text
+
+    Rows are read with a server-side cursor in ``chunk_size`` batches and
+    encoded straight from ``values_list`` tuples, so memory use does not
+    grow with the table. Output is yielded in chunks of about
+    ``chunk_size`` rows.
+    """
+    if model not in SOURCES:
+        raise ValueError(f"Unknown export model '{model}'; choose from {', '.join(SOURCES)}")
+    if output not in _ENCODERS:
+        raise ValueError(f"Unknown export format '{output}'; choose from {', '.join(EXPORT_FORMATS)}")
+    return _batched(_ENCODERS[output](SOURCES[model], chunk_size), chunk_size)
+
+
+def export_response(model: str, output: str) -> StreamingHttpResponse:
+    """Attachment response streaming ``stream_export(model, output)``"""
+    response = StreamingHttpResponse(stream_export(model, output), content_type=CONTENT_TYPES[output])
+    response['Content-Disposition'] = f'attachment; filename="{model}.{output}"'
+    return response
@@ -0,0 +1,218 @@
+import csv
+import json
+import os
+import re
+from functools import lru_cache
+from itertools import islice
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from properties.models import FeedLoad
+from properties.serializers import PropertySerializer
+from properties.services.bulk_ingest import bulk_create_properties
+
+FEED_FORMATS = ('csv', 'ndjson', 'geojson')
+FEED_BATCH_SIZE = 5000
+_READ_CHUNK = 1 << 16
+_SEPARATORS = re.compile(r'[\s,]*')
+MAX_REPORTED_REJECTS = 1000
+
+
+def feed_format(path: str) -> Optional[str]:
+    """Format implied by the file extension"""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension in ('json', 'jsonl'):
+        return 'ndjson' if extension == 'jsonl' else 'geojson'
+    return extension if extension in FEED_FORMATS else None
+
+
+def _csv_records(handle: TextIO) -> Iterator[dict]:
+    return csv.DictReader(handle)
+
+
+def _ndjson_records(handle: TextIO) -> Iterator[dict]:
+    for line in handle:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+def _geojson_records(handle: TextIO) -> Iterator[dict]:
+    """
+    Features of a GeoJSON FeatureCollection, decoded one at a time
+
+    Reads the file in 64 KB chunks and ``raw_decode``s each feature from the
+    ``features`` array, so the whole document is never held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    while True:
+        key = buffer.find('"features"')
+        bracket = buffer.find('[', key) if key >= 0 else -1
+        if bracket >= 0:
+            position = bracket + 1
+            break
+        chunk = handle.read(_READ_CHUNK)
+        if not chunk:
+            raise ValueError("GeoJSON input has no 'features' array")
+        buffer += chunk
+
+    while True:
+        position = _SEPARATORS.match(buffer, position).end()
+        if buffer.startswith(']', position):
+            return
+        try:
+            feature, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = handle.read(_READ_CHUNK)
+            if not chunk:
+                raise
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        position = end
+
+        if not isinstance(feature, dict):
+            yield None  # rejected by clean_record like any other bad row
+            continue
+        geometry, properties = feature.get('geometry'), feature.get('properties')
+        coordinates = geometry.get('coordinates') if isinstance(geometry, dict) else None
+        if not isinstance(coordinates, list) or len(coordinates) < 2:
+            coordinates = (None, None)
+        record = dict(properties) if isinstance(properties, dict) else {}
+        record['lng'], record['lat'] = coordinates[0], coordinates[1]
+        yield record
+
+
+_READERS: Dict[str, Callable[[TextIO], Iterator[dict]]] = {
+    'csv': _csv_records,
+    'ndjson': _ndjson_records,
+    'geojson': _geojson_records,
+}
+
+
+_CLEANED_FIELDS = ('title', 'location_name', 'lat', 'lng', 'price', 'bedrooms', 'bathrooms')
+
+
+@lru_cache(maxsize=None)
+def _serializer_fields() -> Dict[str, serializers.Field]:
+    fields = PropertySerializer().fields
+    return {name: fields[name] for name in _CLEANED_FIELDS}
+
+
+def clean_record(record: dict) -> dict:
+    """
+    Coerce one feed record to ``bulk_create_properties`` row data
+
+    Runs each value through the matching ``PropertySerializer`` field, so
+    feeds follow the API's rules without a serializer per row. Raises
+    ValueError describing the first problem found.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("record is not a JSON object")
+    row = {}
+    for name, field in _serializer_fields().items():
+        value = record.get(name)
+        if value in (None, '') and not field.required:
+            continue  # left to the model default
+        try:
+            row[name] = field.run_validation(value)
+        except serializers.ValidationError as exc:
+            raise ValueError(f"{name}: {' '.join(str(error) for error in exc.detail)}")
+    if not -90 <= row['lat'] <= 90:
+        raise ValueError("Latitude must be between -90 and 90")
+    if not -180 <= row['lng'] <= 180:
+        raise ValueError("Longitude must be between -180 and 180")
+    return row
+
+
+class LoadReport:
+    """
+    Counters for one load
+
+    ``rows`` counts every source record consumed in this run; ``rejected``
+    keeps the first MAX_REPORTED_REJECTS ``(record_number, reason)`` pairs.
+    """
+
+    def __init__(self, skipped: int = 0):
+        self.skipped = skipped
+        self.rows = 0
+        self.created = 0
+        self.rejected_count = 0
+        self.rejected: List[Tuple[int, str]] = []
+        self.started = perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def load_feed(
+        path: str,
+        fmt: Optional[str] = None,
+        batch_size: int = FEED_BATCH_SIZE,
+        resume: bool = False,
+        progress: Optional[Callable[[LoadReport], None]] = None,
+) -> LoadReport:
+    """
+    Stream a CSV, NDJSON or GeoJSON property feed into the database
+
+    Records are cleaned, grouped into ``batch_size`` batches and written
+    with ``bulk_create_properties`` (batched bucket matching with the usual
+    ``normalize_location_name`` rules, bulk inserts, aggregate updates).
+    Each batch commits together with the FeedLoad checkpoint for ``path``;
+    with ``resume=True`` the records already committed are skipped.
+    Invalid records are counted and sampled in the LoadReport with their
+    1-based record number and do not stop the load.
+    """
+    fmt = fmt or feed_format(path)
+    if fmt not in _READERS:
+        raise ValueError(f"Cannot tell the feed format of '{path}'; pass one of: {', '.join(FEED_FORMATS)}")
+
+    source = os.path.abspath(path)
+    checkpoint, _ = FeedLoad.objects.get_or_create(source=source)
+    if not resume:
+        checkpoint.rows_done = 0
+        checkpoint.completed = False
+        checkpoint.save(update_fields=['rows_done', 'completed', 'updated_at'])
+
+    report = LoadReport(skipped=checkpoint.rows_done)
+    with open(path, encoding='utf-8', newline='') as handle:
+        records = islice(_READERS[fmt](handle), checkpoint.rows_done, None)
+        record_number = checkpoint.rows_done
+        while True:
+            batch = []
+            consumed = 0
+            for record in islice(records, batch_size):
+                consumed += 1
+                record_number += 1
+                try:
+                    batch.append(clean_record(record))
+                except ValueError as exc:
+                    report.rejected_count += 1
+                    if len(report.rejected) < MAX_REPORTED_REJECTS:
+                        report.rejected.append((record_number, str(exc)))
+            if not consumed:
+                break
+
+            with transaction.atomic():
+                created = bulk_create_properties(batch, batch_size=min(batch_size, 2000))
+                FeedLoad.objects.filter(pk=checkpoint.pk).update(
+                    rows_done=record_number, updated_at=timezone.now()
+                )
+            report.rows += consumed
+            report.created += len(created)
+            if progress is not None:
+                progress(report)
+
+    FeedLoad.objects.filter(pk=checkpoint.pk).update(completed=True, updated_at=timezone.now())
+    return report
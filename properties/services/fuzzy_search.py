@@ -0,0 +1,59 @@
+from typing import List, Tuple
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from geo.models import GeoBucket
+from properties.services.bucket_index import bucket_index
+
+# Matches pg_trgm's default word_similarity_threshold used by the %> operator
+SEARCH_SIMILARITY_THRESHOLD = 0.6
+SEARCH_BUCKET_LIMIT = 50
+
+
+def uses_pg_trgm(model) -> bool:
+    return connections[model.objects.db].vendor == 'postgresql'
+
+
+def search_buckets(query: str, limit: int = SEARCH_BUCKET_LIMIT) -> List[Tuple[int, float]]:
+    """
+    Find buckets whose name fuzzily matches the query
+
+    On PostgreSQL this is a ``%>`` word-similarity lookup served by the GIN
+    trigram indexes on ``normalized_name`` and ``name``; elsewhere the
+    in-process trigram index of bucket names is used.
+
+    Returns:
+        list: ``(bucket_id, score)`` pairs, best match first
+    """
+    query = query.lower().strip()
+    if not query:
+        return []
+
+    if uses_pg_trgm(GeoBucket):
+        score = Greatest(
+            TrigramWordSimilarity(query, 'normalized_name'),
+            TrigramWordSimilarity(query, 'name'),
+        )
+        return list(
+            GeoBucket.objects.filter(
+                Q(normalized_name__trigram_word_similar=query) |
+                Q(name__trigram_word_similar=query)
+            ).annotate(score=score).order_by('-score', 'id').values_list('id', 'score')[:limit]
+        )
+
+    bucket_index.refresh()
+    return bucket_index.search_names(query, SEARCH_SIMILARITY_THRESHOLD, limit)
+
+
+def order_by_bucket_rank(queryset, bucket_ids: List[int]):
+    """Restrict properties to the given buckets, ordered by the buckets' rank"""
+    rank = Case(
+        *[When(geo_bucket_id=bucket_id, then=Value(position)) for position, bucket_id in enumerate(bucket_ids)],
+        output_field=IntegerField()
+    )
+    return queryset.filter(geo_bucket_id__in=bucket_ids).annotate(
+        search_rank=rank
+    ).order_by('search_rank', '-created_at')
@@ -1,47 +1,159 @@
+from typing import Iterable, Optional, Tuple
 
 from django.contrib.gis.geos import Point
 from django.contrib.gis.measure import D
+
+from core.common.db_routing import primary
+from core.common.metrics import stage_timer
+from geo.geometry import haversine_meters
 from geo.models import GeoBucket
-from properties.services.location_matcher import normalize_location_name, similarity
+from properties.services.bucket_index import bucket_index, bucket_index_enabled
+from properties.services.bucket_locks import bucket_creation_lock
+from properties.services.location_matcher import SimilarityScorer, normalize_location_name
 
 BUCKET_RADIUS_METERS = 1000
+FUZZY_FACTOR = 1.5
+FUZZY_RADIUS_METERS = BUCKET_RADIUS_METERS * FUZZY_FACTOR
 SIMILARITY_THRESHOLD = 0.3
 
 
-def find_or_create_bucket_improved(location_name: str, lat: float, lng: float) -> GeoBucket:
-    normalized = normalize_location_name(location_name)
-    point = Point(lng, lat)
+def within_radius(bucket: GeoBucket, distance: float, factor: float = 1) -> bool:
+    """
+    Whether a point ``distance`` meters from the center is inside the bucket
+
+    Candidates may come from a wider search than the bucket itself (the
+    fuzzy pass searches FUZZY_FACTOR times further), so the distance is
+    always checked against the bucket radius, capped at BUCKET_RADIUS_METERS.
+    """
+    return distance <= min(bucket.radius_meters, BUCKET_RADIUS_METERS) * factor
+
+
+def match_bucket(
+        normalized: str,
+        candidates: Iterable[Tuple[float, GeoBucket]]
+) -> Optional[GeoBucket]:
+    """
+    Pick a bucket from pre-fetched candidates using the assignment rules
+
+    Args:
+        normalized: Normalized location name of the property
+        candidates: ``(distance_meters, bucket)`` pairs within FUZZY_RADIUS_METERS, newest first
+
+    Returns:
+        The newest exact-name bucket within its radius, otherwise the newest
+        bucket within FUZZY_FACTOR times its radius whose name similarity
+        reaches SIMILARITY_THRESHOLD. Radii never exceed BUCKET_RADIUS_METERS.
+    """
+    candidates = list(candidates)
+
+    for distance, bucket in candidates:
+        if bucket.normalized_name == normalized and within_radius(bucket, distance):
+            return bucket
+
+    scorer = SimilarityScorer(normalized)
+    for distance, bucket in candidates:
+        if (within_radius(bucket, distance, FUZZY_FACTOR)
+                and scorer.at_least(bucket.normalized_name, SIMILARITY_THRESHOLD)):
+            return bucket
+
+    return None
+
+
+def _lookup_index(normalized: str, lat: float, lng: float, timer) -> Optional[GeoBucket]:
+    timer.start('exact_match')
+    bucket = bucket_index.exact(normalized, lat, lng, BUCKET_RADIUS_METERS)
+    if bucket is not None:
+        return bucket
+
+    timer.start('candidate_fetch')
+    candidates = bucket_index.nearby(lat, lng, FUZZY_RADIUS_METERS)
+    timer.observe('candidates', len(candidates))
+
+    timer.start('similarity')
+    return match_bucket(normalized, candidates)
+
+
+def _match_from_index(normalized: str, lat: float, lng: float, timer) -> Optional[GeoBucket]:
+    # Stop handing out buckets a re-clustering in another process deleted;
+    # the epoch is read at most once per EPOCH_CHECK_INTERVAL
+    bucket_index.check_epoch()
+    bucket = _lookup_index(normalized, lat, lng, timer)
+    if bucket is None:
+        # Another worker may have created a matching bucket since our last sync
+        timer.start('index_refresh')
+        if bucket_index.refresh():
+            bucket = _lookup_index(normalized, lat, lng, timer)
+    return bucket
 
-    print(f"DEBUG: Location: {location_name}")
-    print(f"DEBUG: Normalized: {normalized}")
-    print(f"DEBUG: Point: {point}")
 
+def _distance(bucket: GeoBucket, point: Point) -> float:
+    return haversine_meters(point.y, point.x, bucket.center.y, bucket.center.x)
+
+
+def _match_from_database(normalized: str, point: Point, timer) -> Optional[GeoBucket]:
     # 1. Try exact match first
-    exact_match = GeoBucket.objects.filter(
+    timer.start('exact_match')
+    exact_matches = GeoBucket.objects.filter(
         normalized_name=normalized,
         center__distance_lte=(point, D(m=BUCKET_RADIUS_METERS))
-    ).first()
-
-    print(f"DEBUG: Exact matches found: {exact_match}")
-
-    # 2. Try fuzzy match
-    nearby_buckets = GeoBucket.objects.filter(
-        center__distance_lte=(point, D(m=BUCKET_RADIUS_METERS * 1.5))
     )
+    for bucket in exact_matches:
+        if within_radius(bucket, _distance(bucket, point)):
+            return bucket
 
-    print(f"DEBUG: Nearby buckets count: {nearby_buckets.count()}")
+    # 2. Try fuzzy match
+    timer.start('candidate_fetch')
+    nearby_buckets = list(GeoBucket.objects.filter(
+        center__distance_lte=(point, D(m=FUZZY_RADIUS_METERS))
+    ))
+    timer.observe('candidates', len(nearby_buckets))
 
+    timer.start('similarity')
+    scorer = SimilarityScorer(normalized)
     for bucket in nearby_buckets:
-        sim = similarity(bucket.normalized_name, normalized)
-        print(f"DEBUG: Comparing '{bucket.normalized_name}' with '{normalized}': {sim}")
-        if sim >= SIMILARITY_THRESHOLD:
-            print(f"DEBUG: Found match! Similarity: {sim}")
+        if (within_radius(bucket, _distance(bucket, point), FUZZY_FACTOR)
+                and scorer.at_least(bucket.normalized_name, SIMILARITY_THRESHOLD)):
             return bucket
 
-    print(f"DEBUG: Creating new bucket")
-    return GeoBucket.objects.create(
-        name=location_name,
-        normalized_name=normalized,
-        center=point,
-        radius_meters=BUCKET_RADIUS_METERS,
-    )
\ No newline at end of file
+    return None
+
+
+@primary
+def find_or_create_bucket_improved(location_name: str, lat: float, lng: float) -> GeoBucket:
+    timer = stage_timer('bucket_assignment')
+
+    timer.start('normalize')
+    normalized = normalize_location_name(location_name)
+    point = Point(lng, lat)
+
+    if bucket_index_enabled():
+        bucket = _match_from_index(normalized, lat, lng, timer)
+    else:
+        bucket = _match_from_database(normalized, point, timer)
+
+    if bucket is not None:
+        timer.finish('hit')
+        return bucket
+
+    # Miss: serialize creators in this area, then re-check against the database
+    # (a concurrent writer may have just committed a matching bucket)
+    timer.start('lock')
+    with bucket_creation_lock([(lat, lng)], FUZZY_RADIUS_METERS):
+        bucket = _match_from_database(normalized, point, timer)
+        if bucket is not None:
+            bucket_index.register(bucket)
+            timer.finish('contended_hit')
+            return bucket
+
+        timer.start('create')
+        bucket = GeoBucket.objects.create(
+            name=location_name,
+            normalized_name=normalized,
+            center=point,
+            radius_meters=BUCKET_RADIUS_METERS,
+            extent_meters=0,
+        )
+        bucket_index.register(bucket)
+
+    timer.finish('miss')
+    return bucket
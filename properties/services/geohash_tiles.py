@@ -0,0 +1,279 @@
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import reduce
+from operator import or_
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.gis.geos import Polygon
+from django.db.models import Max, Q
+
+from core.common.db_routing import use_primary
+from geo.geometry import METERS_PER_DEGREE, haversine_meters
+from geo.models import GeoBucket
+from properties.models import Property
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_DECODE = {char: index for index, char in enumerate(_BASE32)}
+
+MIN_TILE_PRECISION = 4   # ~39 x 20 km
+MAX_TILE_PRECISION = 7   # ~153 x 153 m
+TILE_CACHE_ROWS = 200_000
+# Most tiles one query may cover; wider circles are rejected, not enumerated
+MAX_QUERY_TILES = 1024
+# Slack for rounding in the bucket extent vs. tile distance comparison
+EXTENT_MARGIN = 1.01
+
+Bounds = Tuple[float, float, float, float]  # min_lat, min_lng, max_lat, max_lng
+TileRow = Tuple[int, float, float]          # property id, lat, lng
+TileStamp = Tuple[Tuple[int, datetime], ...]  # (bucket id, updated_at) of each bucket reaching a tile
+
+
+def encode(lat: float, lng: float, precision: int) -> str:
+    """Geohash of a point"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        span, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        mid = (span[0] + span[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            span[0] = mid
+        else:
+            span[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def bounds(geohash: str) -> Bounds:
+    """``(min_lat, min_lng, max_lat, max_lng)`` of a geohash cell"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            span = lng_range if even else lat_range
+            mid = (span[0] + span[1]) / 2
+            if value >> shift & 1:
+                span[0] = mid
+            else:
+                span[1] = mid
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def cell_degrees(precision: int) -> Tuple[float, float]:
+    """Height and width of a geohash cell in degrees"""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** (bits - bits // 2)
+
+
+def precision_for_radius(radius_meters: float) -> int:
+    """
+    Finest precision whose cells are at least half the radius tall
+
+    A circle then touches at most ~5x5 tiles, and every query with a similar
+    radius lands on the same tile set.
+    """
+    for precision in range(MAX_TILE_PRECISION, MIN_TILE_PRECISION, -1):
+        if cell_degrees(precision)[0] * METERS_PER_DEGREE >= radius_meters / 2:
+            return precision
+    return MIN_TILE_PRECISION
+
+
+def _distance_to_bounds(lat: float, lng: float, box: Bounds) -> float:
+    min_lat, min_lng, max_lat, max_lng = box
+    return haversine_meters(lat, lng, min(max(lat, min_lat), max_lat), min(max(lng, min_lng), max_lng))
+
+
+def _expand(box: Bounds, meters: float) -> Bounds:
+    min_lat, min_lng, max_lat, max_lng = box
+    d_lat = meters / METERS_PER_DEGREE
+    d_lng = d_lat / max(math.cos(math.radians(min(max(abs(min_lat), abs(max_lat)) + d_lat, 89.0))), 1e-6)
+    return (
+        max(min_lat - d_lat, -90.0), max(min_lng - d_lng, -180.0),
+        min(max_lat + d_lat, 90.0), min(max_lng + d_lng, 180.0),
+    )
+
+
+def tile_stamps(geohashes: List[str]) -> Dict[str, TileStamp]:
+    """
+    Version of each tile: the buckets whose extent reaches it
+
+    Every property write moves its bucket's ``updated_at`` and grows its
+    ``extent_meters`` to cover the new point, and re-clustering replaces
+    bucket ids, so a stamp changes exactly when a bucket that can hold rows
+    of the tile changes. Writes elsewhere leave the tile current. Read from
+    the database, so writes committed by other processes are seen.
+    """
+    boxes = {geohash: bounds(geohash) for geohash in geohashes}
+    area = (
+        min(box[0] for box in boxes.values()), min(box[1] for box in boxes.values()),
+        max(box[2] for box in boxes.values()), max(box[3] for box in boxes.values()),
+    )
+    max_extent = GeoBucket.objects.aggregate(max_extent=Max('extent_meters'))['max_extent'] or 0
+    min_lat, min_lng, max_lat, max_lng = _expand(area, max_extent * EXTENT_MARGIN)
+    search = Polygon.from_bbox((min_lng, min_lat, max_lng, max_lat))
+    search.srid = 4326
+
+    stamps = {geohash: [] for geohash in geohashes}
+    buckets = GeoBucket.objects.filter(center__intersects=search).order_by('id').values_list(
+        'id', 'center', 'extent_meters', 'updated_at'
+    )
+    for bucket_id, center, extent, updated_at in buckets:
+        for geohash, box in boxes.items():
+            if _distance_to_bounds(center.y, center.x, box) <= extent * EXTENT_MARGIN:
+                stamps[geohash].append((bucket_id, updated_at))
+    return {geohash: tuple(stamp) for geohash, stamp in stamps.items()}
+
+
+def _circle_extent(lat: float, radius_meters: float) -> Tuple[float, float]:
+    d_lat = radius_meters / METERS_PER_DEGREE
+    d_lng = d_lat / max(math.cos(math.radians(min(abs(lat) + d_lat, 89.0))), 1e-6)
+    return d_lat, min(d_lng, 180.0)
+
+
+def tile_count(lat: float, radius_meters: float, precision: int) -> int:
+    """Upper bound on how many tiles ``tiles_for_circle`` visits"""
+    if not (-90 <= lat <= 90 and 0 < radius_meters < math.inf):
+        raise ValueError("lat must be within -90..90 and the radius positive and finite")
+    d_lat, d_lng = _circle_extent(lat, radius_meters)
+    height, width = cell_degrees(precision)
+    return (math.ceil(2 * d_lat / height) + 1) * (math.ceil(2 * d_lng / width) + 1)
+
+
+def tiles_for_circle(lat: float, lng: float, radius_meters: float, precision: int) -> Iterator[str]:
+    """Yield the geohash of every tile intersecting the circle"""
+    d_lat, d_lng = _circle_extent(lat, radius_meters)
+    height, width = cell_degrees(precision)
+
+    for row in range(math.floor((max(lat - d_lat, -90.0) + 90) / height),
+                     math.floor((min(lat + d_lat, 90.0) + 90) / height) + 1):
+        cell_lat = min(-90 + (row + 0.5) * height, 90.0)
+        for col in range(math.floor((lng - d_lng + 180) / width),
+                         math.floor((lng + d_lng + 180) / width) + 1):
+            cell_lng = (col + 0.5) * width % 360.0 - 180
+            geohash = encode(cell_lat, cell_lng, precision)
+            if _distance_to_bounds(lat, lng, bounds(geohash)) <= radius_meters:
+                yield geohash
+
+
+class TileCache:
+    """
+    LRU of per-tile property rows, bounded by the total number of rows
+
+    Each entry holds the ``(id, lat, lng)`` of every property in one geohash
+    tile, stamped by ``tile_stamps`` so only writes to buckets reaching the
+    tile make it stale. Missing and stale tiles are loaded together in a
+    single query.
+    """
+
+    def __init__(self, max_rows: Optional[int] = None):
+        self.max_rows = max_rows
+        self._tiles: 'OrderedDict[str, Tuple[TileStamp, List[TileRow]]]' = OrderedDict()
+        self._rows = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_rows or getattr(settings, 'NEARBY_TILE_CACHE_ROWS', TILE_CACHE_ROWS)
+
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+    def _load(self, geohashes: List[str]) -> Dict[str, List[TileRow]]:
+        loaded = {geohash: [] for geohash in geohashes}
+        precision = len(geohashes[0])
+        boxes = []
+        for geohash in geohashes:
+            min_lat, min_lng, max_lat, max_lng = bounds(geohash)
+            box = Polygon.from_bbox((min_lng, min_lat, max_lng, max_lat))
+            box.srid = 4326
+            boxes.append(Q(location__intersects=box))
+
+        rows = Property.objects.filter(reduce(or_, boxes)).order_by().values_list('id', 'location')
+        for property_id, location in rows.iterator(chunk_size=2000):
+            # Points on a shared edge intersect both tiles; keep them in the one they encode to
+            tile = loaded.get(encode(location.y, location.x, precision))
+            if tile is not None:
+                tile.append((property_id, location.y, location.x))
+        return loaded
+
+    def get_many(self, geohashes: List[str]) -> Dict[str, List[TileRow]]:
+        if not geohashes:
+            return {}
+        # Stamps are read before the rows, so a write committed in between
+        # only makes the stored stamp older and the tile reloads next time.
+        # Both come from the primary: entries outlive the request, and stamps
+        # from replicas lagging by different amounts would never settle.
+        with use_primary():
+            stamps = tile_stamps(geohashes)
+        found, missing = {}, []
+        with self._lock:
+            for geohash in geohashes:
+                entry = self._tiles.get(geohash)
+                if entry is not None and entry[0] == stamps[geohash]:
+                    self._tiles.move_to_end(geohash)
+                    found[geohash] = entry[1]
+                else:
+                    missing.append(geohash)
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        if missing:
+            with use_primary():
+                loaded = self._load(missing)
+            with self._lock:
+                for geohash, rows in loaded.items():
+                    previous = self._tiles.pop(geohash, None)
+                    if previous is not None:
+                        self._rows -= len(previous[1])
+                    self._tiles[geohash] = (stamps[geohash], rows)
+                    self._rows += len(rows)
+                while self._rows > self.capacity:
+                    self._rows -= len(self._tiles.popitem(last=False)[1][1])
+            found.update(loaded)
+        return found
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tiles.clear()
+            self._rows = 0
+            self.hits = self.misses = 0
+
+
+tile_cache = TileCache()
+
+
+def nearby_from_tiles(lat: float, lng: float, radius_meters: float) -> List[Tuple[int, float]]:
+    """
+    ``(property_id, distance_meters)`` within the radius, nearest first
+
+    The circle is covered with geohash tiles sized from the radius; tile
+    contents come from ``tile_cache`` and only the final distance filter
+    depends on the exact query point. Raises ValueError for non-finite
+    input or circles needing more than MAX_QUERY_TILES tiles.
+    """
+    precision = precision_for_radius(radius_meters)
+    if tile_count(lat, radius_meters, precision) > MAX_QUERY_TILES:
+        raise ValueError(f"radius covers more than {MAX_QUERY_TILES} tiles")
+    tiles = tile_cache.get_many(list(tiles_for_circle(lat, lng, radius_meters, precision)))
+
+    matches = []
+    for rows in tiles.values():
+        for property_id, row_lat, row_lng in rows:
+            distance = haversine_meters(lat, lng, row_lat, row_lng)
+            if distance <= radius_meters:
+                matches.append((distance, property_id))
+    matches.sort()
+    return [(property_id, distance) for distance, property_id in matches]
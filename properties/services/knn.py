@@ -0,0 +1,182 @@
+import heapq
+import math
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+from django.contrib.gis.geos import Point
+from django.db import connections
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+from geo.geometry import EARTH_RADIUS_METERS
+from properties.models import Property
+
+KNN_MAX_RESULTS = 100
+_LEAF_SIZE = 8
+
+Vector = Tuple[float, float, float]
+
+
+def uses_postgis(model) -> bool:
+    return connections[model.objects.db].vendor == 'postgresql'
+
+
+def knn_distance(model, field: str, point: Point) -> RawSQL:
+    """
+    ``field <-> point`` for ORDER BY, so PostGIS walks the GIST index
+
+    Unlike ordering by ``Distance()`` (ST_Distance), the ``<->`` operator
+    lets the planner return the nearest rows straight from the index
+    without scoring every row in range.
+    """
+    quote_name = connections[model.objects.db].ops.quote_name
+    column = f'{quote_name(model._meta.db_table)}.{quote_name(model._meta.get_field(field).column)}'
+    return RawSQL(
+        f'{column} <-> ST_GeogFromText(%s)',
+        (f'SRID=4326;{point.wkt}',),
+        output_field=FloatField()
+    )
+
+
+def to_unit_vector(lat: float, lng: float) -> Vector:
+    phi = math.radians(lat)
+    lam = math.radians(lng)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+def chord_to_meters(chord: float) -> float:
+    return 2 * EARTH_RADIUS_METERS * math.asin(min(1.0, chord / 2))
+
+
+def meters_to_chord(meters: float) -> float:
+    return 2 * math.sin(min(math.pi, meters / EARTH_RADIUS_METERS) / 2)
+
+
+class KDTree:
+    """
+    Static 3-d tree over points on the unit sphere
+
+    Straight-line (chord) distance between unit vectors is monotonic in
+    great-circle distance, so Euclidean nearest neighbours are geographic
+    nearest neighbours. The tree is stored implicitly: each subrange of
+    ``points`` has its splitting node at the middle index.
+    """
+
+    def __init__(self, points: Sequence[Tuple[Vector, int]]):
+        self.points = list(points)
+        self._build(0, len(self.points), 0)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _build(self, lo: int, hi: int, axis: int) -> None:
+        if hi - lo <= _LEAF_SIZE:
+            return
+        self.points[lo:hi] = sorted(self.points[lo:hi], key=lambda point: point[0][axis])
+        mid = (lo + hi) // 2
+        self._build(lo, mid, (axis + 1) % 3)
+        self._build(mid + 1, hi, (axis + 1) % 3)
+
+    def nearest(self, target: Vector, k: int, max_chord: float = math.inf) -> List[Tuple[float, int]]:
+        """Return up to ``k`` ``(squared_chord, key)`` pairs, nearest first"""
+        heap: List[Tuple[float, int]] = []  # max-heap via negated distances
+        limit = max_chord * max_chord
+        tx, ty, tz = target
+
+        def consider(index):
+            (x, y, z), key = self.points[index]
+            d2 = (x - tx) ** 2 + (y - ty) ** 2 + (z - tz) ** 2
+            if d2 <= limit and (len(heap) < k or d2 < -heap[0][0]):
+                if len(heap) < k:
+                    heapq.heappush(heap, (-d2, key))
+                else:
+                    heapq.heapreplace(heap, (-d2, key))
+
+        def bound():
+            return limit if len(heap) < k else min(limit, -heap[0][0])
+
+        def search(lo, hi, axis):
+            if hi - lo <= _LEAF_SIZE:
+                for index in range(lo, hi):
+                    consider(index)
+                return
+            mid = (lo + hi) // 2
+            consider(mid)
+            diff = target[axis] - self.points[mid][0][axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            search(near[0], near[1], (axis + 1) % 3)
+            if diff * diff <= bound():
+                search(far[0], far[1], (axis + 1) % 3)
+
+        if k > 0 and self.points:
+            search(0, len(self.points), 0)
+        return sorted((-negated, key) for negated, key in heap)
+
+
+class PropertyPointIndex:
+    """
+    Per-process KD-tree of property locations for backends without KNN
+
+    Loaded lazily; properties created since the last sync are pulled with an
+    ``id > high-water mark`` query on each lookup, kept in a small linear
+    buffer and folded into a rebuilt tree once the buffer grows.
+    """
+    rebuild_ratio = 0.1
+    min_rebuild = 1000
+
+    def __init__(self):
+        self._tree: Optional[KDTree] = None
+        self._recent: List[Tuple[Vector, int]] = []
+        self._synced_id = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _points(queryset):
+        for property_id, location in queryset.values_list('id', 'location').iterator(chunk_size=5000):
+            yield to_unit_vector(location.y, location.x), property_id
+
+    def _sync(self) -> None:
+        with self._lock:
+            if self._tree is None:
+                points = list(self._points(Property.objects.order_by()))
+                self._tree = KDTree(points)
+                self._synced_id = max((key for _, key in points), default=0)
+                return
+
+            fresh = list(self._points(Property.objects.filter(id__gt=self._synced_id).order_by('id')))
+            if fresh:
+                self._recent.extend(fresh)
+                self._synced_id = fresh[-1][1]
+            if len(self._recent) > max(self.min_rebuild, self.rebuild_ratio * len(self._tree)):
+                self._tree = KDTree(self._tree.points + self._recent)
+                self._recent = []
+
+    def nearest(
+            self,
+            lat: float,
+            lng: float,
+            k: int,
+            max_distance_meters: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """Return up to ``k`` ``(property_id, distance_meters)`` pairs, nearest first"""
+        self._sync()
+        target = to_unit_vector(lat, lng)
+        max_chord = meters_to_chord(max_distance_meters) if max_distance_meters is not None else math.inf
+
+        candidates = self._tree.nearest(target, k, max_chord)
+        limit = max_chord * max_chord
+        for (x, y, z), key in self._recent:
+            d2 = (x - target[0]) ** 2 + (y - target[1]) ** 2 + (z - target[2]) ** 2
+            if d2 <= limit:
+                candidates.append((d2, key))
+
+        return [(key, chord_to_meters(math.sqrt(d2))) for d2, key in heapq.nsmallest(k, candidates)]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tree = None
+            self._recent = []
+            self._synced_id = 0
+
+
+property_point_index = PropertyPointIndex()
@@ -1,6 +1,10 @@
+import itertools
 import re
+import threading
+from collections import Counter
 from difflib import SequenceMatcher
-from typing import List, Optional, Set
+from functools import lru_cache
+from typing import Iterable, List, Optional, Set, Union
 
 # ===== CONFIGURABLE PARAMETERS =====
 COMMON_SUFFIXES: Set[str] = {
@@ -97,52 +101,33 @@ OBVIOUS_STOP_WORDS: Set[str] = {
 
 
 # ===== UTILITY FUNCTIONS =====
+_WHITESPACE_RE = re.compile(r'\s+')
+_PUNCTUATION_RE = re.compile(r'[^\w\s,]')
+_WORD_RE = re.compile(r'\w+')
+
+NORMALIZE_CACHE_SIZE = 65536
+FREQUENCY_THRESHOLD = 0.3
+
+
 def _clean_text(text: str) -> str:
     """Clean and normalize text"""
     text = text.lower().strip()
-    text = re.sub(r'\s+', ' ', text)
-    return re.sub(r'[^\w\s,]', '', text)
+    text = _WHITESPACE_RE.sub(' ', text)
+    return _PUNCTUATION_RE.sub('', text)
 
 
-def _calculate_word_frequencies(locations: List[str]) -> dict:
-    """Calculate word frequencies from known locations"""
-    word_freq = {}
+def _calculate_word_frequencies(locations: List[str], word_freq: Optional[dict] = None) -> dict:
+    """Calculate word frequencies from known locations, optionally adding to ``word_freq``"""
+    word_freq = {} if word_freq is None else word_freq
     for loc in locations:
-        for word in re.findall(r'\w+', loc.lower()):
+        for word in _WORD_RE.findall(loc.lower()):
             word_freq[word] = word_freq.get(word, 0) + 1
     return word_freq
 
 
-def _should_skip_word(
-        word: str,
-        part_index: int,
-        word_freq: dict,
-        total_locations: int,
-        remove_common_suffixes: bool,
-        frequency_threshold: float = 0.3
-) -> bool:
-    """Determine if a word should be skipped based on various criteria"""
-    # Skip common words across locations
-    if word_freq and word in word_freq:
-        frequency = word_freq[word] / total_locations
-        if frequency > frequency_threshold:
-            return True
-
-    # Skip common suffixes in non-first parts
-    if remove_common_suffixes and part_index > 0:
-        if word in COMMON_SUFFIXES:
-            return True
-
-    # Skip obvious stop words
-    if word in OBVIOUS_STOP_WORDS:
-        return True
-
-    return False
-
-
 def _get_fallback_name(name: str) -> str:
     """Get fallback name when no normalized parts are found"""
-    words = re.findall(r'\w+', name)
+    words = _WORD_RE.findall(name)
     if not words:
         return name
 
@@ -153,10 +138,165 @@ def _get_fallback_name(name: str) -> str:
         return words[0] if words else name
 
 
+# Bumped by the ``add_custom_*`` helpers; normalizers re-snapshot when it moves
+_vocabulary_version = 0
+_vocabulary_lock = threading.Lock()
+# Corpus versions are drawn from one sequence, so a version names one corpus state
+_corpus_versions = itertools.count(1)
+
+
+class LocationCorpus:
+    """
+    Known location names with incrementally maintained word frequencies
+
+    ``add`` and ``remove`` update the frequencies under a lock and bump
+    ``version``, so a normalizer can tell whether its memoized results are
+    current without comparing names.
+    """
+
+    def __init__(self, locations: Iterable[str] = ()):
+        self.lock = threading.RLock()
+        self._names: Counter = Counter()
+        self._total = 0
+        self.word_freq: dict = {}
+        self.version = next(_corpus_versions)
+        self.add(locations)
+
+    def __len__(self) -> int:
+        return self._total
+
+    def add(self, locations: Iterable[str]) -> None:
+        locations = list(locations)
+        if not locations:
+            return
+        with self.lock:
+            self._names.update(locations)
+            self._total += len(locations)
+            _calculate_word_frequencies(locations, self.word_freq)
+            self.version = next(_corpus_versions)
+
+    def remove(self, locations: Iterable[str]) -> None:
+        """Drop one occurrence of each name; names never added are ignored"""
+        with self.lock:
+            removed = 0
+            for location in locations:
+                count = self._names.get(location)
+                if not count:
+                    continue
+                if count == 1:
+                    del self._names[location]
+                else:
+                    self._names[location] = count - 1
+                for word in _WORD_RE.findall(location.lower()):
+                    self.word_freq[word] -= 1
+                    if not self.word_freq[word]:
+                        del self.word_freq[word]
+                removed += 1
+            if removed:
+                self._total -= removed
+                self.version = next(_corpus_versions)
+
+
+class LocationNormalizer:
+    """
+    Compiled, memoized implementation of ``normalize_location_name``
+
+    Suffix and stop-word sets are frozen snapshots of COMMON_SUFFIXES and
+    OBVIOUS_STOP_WORDS, taken again whenever the ``add_custom_*`` helpers
+    change them; call ``invalidate`` after editing the sets directly. Results
+    are memoized per (name, options, corpus version) in an LRU when
+    ``known_locations`` is a LocationCorpus; a plain list is counted afresh
+    on every call, as before.
+    """
+
+    def __init__(self, cache_size: int = NORMALIZE_CACHE_SIZE):
+        self._lock = threading.Lock()
+        self._normalize_cached = lru_cache(maxsize=cache_size)(self._normalize)
+        self._load_vocabulary()
+
+    def _load_vocabulary(self) -> None:
+        with _vocabulary_lock:
+            self._vocabulary_version = _vocabulary_version
+            self._suffixes = frozenset(COMMON_SUFFIXES)
+            self._stop_words = frozenset(OBVIOUS_STOP_WORDS)
+
+    def invalidate(self) -> None:
+        """Re-snapshot suffixes and stop words and drop memoized results"""
+        with self._lock:
+            self._load_vocabulary()
+            self._normalize_cached.cache_clear()
+
+    def cache_info(self):
+        return self._normalize_cached.cache_info()
+
+    def normalize(
+            self,
+            name: str,
+            known_locations: Union[LocationCorpus, List[str], None] = None,
+            remove_common_suffixes: bool = True
+    ) -> str:
+        if self._vocabulary_version != _vocabulary_version:
+            self.invalidate()
+
+        if not known_locations:
+            return self._normalize_cached(name, remove_common_suffixes, None, 0)
+        if not isinstance(known_locations, LocationCorpus):
+            return self._normalize(name, remove_common_suffixes, LocationCorpus(known_locations), 0)
+        # Held across the lookup, so a miss is computed from the state ``version`` names
+        with known_locations.lock:
+            return self._normalize_cached(name, remove_common_suffixes, known_locations, known_locations.version)
+
+    def _normalize(
+            self, name: str, remove_common_suffixes: bool, corpus: Optional[LocationCorpus], corpus_version: int
+    ) -> str:
+        # Clean input
+        cleaned_name = _clean_text(name)
+
+        # Split by commas for hierarchical parsing
+        parts = [p.strip() for p in cleaned_name.split(',') if p.strip()]
+        if not parts:
+            return _get_fallback_name(cleaned_name)
+
+        # Words that appear in too many known locations carry no signal
+        word_freq = corpus.word_freq if corpus is not None else {}
+        total_locations = len(corpus) if corpus is not None else 0
+        suffixes = self._suffixes
+        stop_words = self._stop_words
+
+        # Process each part
+        normalized_parts = []
+
+        for i, part in enumerate(parts):
+            skip_suffixes = remove_common_suffixes and i > 0
+            filtered_words = [
+                word for word in part.split()
+                if not (
+                    (word in word_freq and word_freq[word] / total_locations > FREQUENCY_THRESHOLD)
+                    or (skip_suffixes and word in suffixes)
+                    or word in stop_words
+                )
+            ]
+
+            if filtered_words:
+                normalized_parts.append(' '.join(filtered_words))
+
+        # Handle case where no normalized parts were found
+        if not normalized_parts:
+            return _get_fallback_name(cleaned_name)
+
+        # Return appropriate format
+        if len(normalized_parts) > 1:
+            return ', '.join(normalized_parts)
+        return normalized_parts[0]
+
+
+_normalizer = LocationNormalizer()
+
+
 # ===== MAIN FUNCTION =====
 def normalize_location_name(
         name: str,
-        known_locations: Optional[List[str]] = None,
+        known_locations: Union[LocationCorpus, List[str], None] = None,
         remove_common_suffixes: bool = True
 ) -> str:
     """
@@ -164,52 +304,11 @@ def normalize_location_name(
 
     Args:
         name: Location name to normalize
-        known_locations: List of other locations in the system for context
+        known_locations: Other locations in the system for context; pass a
+            LocationCorpus to memoize across calls
         remove_common_suffixes: Whether to remove common location suffixes
     """
-    # Clean input
-    cleaned_name = _clean_text(name)
-
-    # Split by commas for hierarchical parsing
-    parts = [p.strip() for p in cleaned_name.split(',') if p.strip()]
-    if not parts:
-        return _get_fallback_name(cleaned_name)
-
-    # Calculate word frequencies if we have known locations
-    word_freq = {}
-    total_locations = 0
-    if known_locations:
-        word_freq = _calculate_word_frequencies(known_locations)
-        total_locations = len(known_locations)
-
-    # Process each part
-    normalized_parts = []
-
-    for i, part in enumerate(parts):
-        words = part.split()
-        filtered_words = []
-
-        for word in words:
-            if not _should_skip_word(
-                    word=word,
-                    part_index=i,
-                    word_freq=word_freq,
-                    total_locations=total_locations,
-                    remove_common_suffixes=remove_common_suffixes
-            ):
-                filtered_words.append(word)
-
-        if filtered_words:
-            normalized_parts.append(' '.join(filtered_words))
-
-    # Handle case where no normalized parts were found
-    if not normalized_parts:
-        return _get_fallback_name(cleaned_name)
-
-    # Return appropriate format
-    if len(normalized_parts) > 1:
-        return ', '.join(normalized_parts)
-    return normalized_parts[0]
+    return _normalizer.normalize(name, known_locations, remove_common_suffixes)
 
 
 # ===== ALIASES AND HELPER FUNCTIONS =====
@@ -220,15 +319,77 @@ def similarity(a: str, b: str) -> float:
     return SequenceMatcher(None, a.lower(), b.lower()).ratio()
 
 
+@lru_cache(maxsize=65536)
+def _char_counts(text: str) -> Counter:
+    return Counter(text)
+
+
+class SimilarityScorer:
+    """
+    Score one query against many candidate names
+
+    Scores are exactly ``similarity(candidate, query)``: the query is set once
+    as SequenceMatcher's second sequence, whose junk/index tables difflib
+    caches across candidates. Candidates are first checked against a
+    character-multiset upper bound of ``ratio()`` (difflib's ``quick_ratio``,
+    from memoized per-name signatures), so names that cannot reach a threshold
+    never run the matching-blocks search.
+    """
+
+    def __init__(self, query: str):
+        self.query = query.lower()
+        self._query_counts = _char_counts(self.query)
+        self._matcher = SequenceMatcher(None)
+        self._matcher.set_seq2(self.query)
+
+    def upper_bound(self, candidate: str) -> float:
+        """Cheap upper bound of ``score(candidate)``"""
+        candidate = candidate.lower()
+        total = len(candidate) + len(self.query)
+        if not total:
+            return 1.0
+        query_counts = self._query_counts
+        shared = sum(
+            min(count, query_counts[char])
+            for char, count in _char_counts(candidate).items()
+            if char in query_counts
+        )
+        return 2.0 * shared / total
+
+    def score(self, candidate: str) -> float:
+        self._matcher.set_seq1(candidate.lower())
+        return self._matcher.ratio()
+
+    def scores(self, candidates: Iterable[str]) -> List[float]:
+        return [self.score(candidate) for candidate in candidates]
+
+    def at_least(self, candidate: str, threshold: float) -> bool:
+        return self.upper_bound(candidate) >= threshold and self.score(candidate) >= threshold
+
+    def first_match(self, candidates: Iterable[str], threshold: float) -> Optional[int]:
+        """Index of the first candidate scoring at least ``threshold``"""
+        for index, candidate in enumerate(candidates):
+            if self.at_least(candidate, threshold):
+                return index
+        return None
+
+
 # ===== CONFIGURATION UTILITIES =====
+def _bump_vocabulary(words: Set[str], new_words: Set[str]) -> None:
+    global _vocabulary_version
+    with _vocabulary_lock:
+        words.update(new_words)
+        _vocabulary_version += 1
+
+
 def add_custom_suffixes(new_suffixes: Set[str]) -> None:
     """Add custom suffixes to the common suffixes list"""
-    COMMON_SUFFIXES.update(new_suffixes)
+    _bump_vocabulary(COMMON_SUFFIXES, new_suffixes)
 
 
 def add_custom_stop_words(new_stop_words: Set[str]) -> None:
     """Add custom stop words to the obvious stop words list"""
-    OBVIOUS_STOP_WORDS.update(new_stop_words)
+    _bump_vocabulary(OBVIOUS_STOP_WORDS, new_stop_words)
 
 
 def get_all_suffixes() -> Set[str]:
@@ -0,0 +1,73 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Hashable, List, Set, Tuple
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """
+    Split text into pg_trgm-style trigrams
+
+    Each alphanumeric word is lowercased and padded with two leading spaces
+    and one trailing space, so ``trigrams('Ajah')`` is
+    ``{'  a', ' aj', 'aja', 'jah', 'ah '}``.
+    """
+    grams = set()
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class NgramIndex:
+    """
+    Inverted trigram index over short texts (bucket names)
+
+    Scores follow pg_trgm's ``word_similarity``: the share of the query's
+    trigrams found in the indexed text, so partial words ("ik" → "ikeja")
+    and typos ("sangotdo" → "sangotedo") both rank highly. Ties are broken
+    by whole-string trigram similarity.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[Hashable]] = defaultdict(set)
+        self._fields: Dict[Hashable, Tuple[FrozenSet[str], ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def add(self, key: Hashable, *texts: str) -> None:
+        """Index one or more texts under ``key``; the best-scoring text wins"""
+        fields = tuple(trigrams(text) for text in texts)
+        self._fields[key] = fields
+        for gram in frozenset().union(*fields):
+            self._postings[gram].add(key)
+
+    def search(self, query: str, threshold: float, limit: int) -> List[Tuple[Hashable, float]]:
+        """Return up to ``limit`` ``(key, score)`` pairs scoring at least ``threshold``"""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        # Prune with posting counts: a key needs this many shared trigrams to qualify
+        min_shared = max(1, math.ceil(threshold * len(query_grams) - 1e-9))
+        shared_counts = Counter()
+        for gram in query_grams:
+            shared_counts.update(self._postings.get(gram, ()))
+
+        scored = []
+        for key, shared in shared_counts.items():
+            if shared < min_shared:
+                continue
+            best = (0.0, 0.0)
+            for grams in self._fields[key]:
+                common = len(query_grams & grams)
+                score = (common / len(query_grams), common / len(query_grams | grams))
+                best = max(best, score)
+            if best[0] >= threshold:
+                scored.append((best, key))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [(key, round(score[0], 4)) for score, key in scored[:limit]]
@@ -0,0 +1,98 @@
+from decimal import Decimal
+from typing import Iterable, List, Optional, Sequence
+
+from django.conf import settings
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.geos import Point
+from django.db import connections
+from django.db.models import FloatField, Func, QuerySet
+from django.utils import timezone
+
+# Columns PropertySerializer returns, in its field order
+VALUE_FIELDS = (
+    'id', 'title', 'location_name', 'price', 'bedrooms', 'bathrooms', 'geo_bucket_id', 'created_at'
+)
+# Annotations kept in each values() row so keyset pagination can read its cursor
+ORDERING_ANNOTATIONS = ('distance', 'bucket_rank')
+
+
+def _ordering_columns(queryset: QuerySet) -> List[str]:
+    """Ordering annotations and the columns the queryset is ordered by, beyond VALUE_FIELDS"""
+    names = [name for name in ORDERING_ANNOTATIONS if name in queryset.query.annotations]
+    names += [
+        name.lstrip('-') for name in queryset.query.order_by
+        if isinstance(name, str) and name != '?' and '__' not in name
+    ]
+    return [name for name in dict.fromkeys(names) if name not in VALUE_FIELDS]
+PRICE_PLACES = Decimal('0.01')
+
+
+def _coordinate(function: str) -> Func:
+    return Func('location', template=f'{function}(%(expressions)s::geometry)', output_field=FloatField())
+
+
+def property_values(queryset: QuerySet, point: Optional[Point] = None) -> QuerySet:
+    """
+    ``queryset`` as ``values()`` dicts for ``property_rows``
+
+    Coordinates are selected with ST_Y/ST_X on PostGIS, so no geometry is
+    parsed in Python. With ``point``, the ``distance`` to it is selected too
+    (reusing the queryset's own ``distance`` annotation when it has one).
+    Ordering annotations and ordering columns (search rank, ``?ordering=``)
+    stay in the rows for keyset cursors.
+    """
+    if point is not None and 'distance' not in queryset.query.annotations:
+        queryset = queryset.annotate(distance=Distance('location', point))
+    fields = [*VALUE_FIELDS, *_ordering_columns(queryset)]
+    if connections[queryset.db].vendor == 'postgresql':
+        return queryset.values(*fields, lat=_coordinate('ST_Y'), lng=_coordinate('ST_X'))
+    return queryset.values(*fields, 'location')
+
+
+def property_rows(values: Iterable[dict]) -> List[dict]:
+    """
+    Response rows for ``property_values`` dicts, without a serializer
+
+    Shared fields are rendered exactly as PropertySerializer renders them
+    (price as a 2-place string, ``created_at`` as ISO 8601 in the current
+    time zone with ``Z`` for UTC), followed by ``lat``/``lng`` and, for
+    distance queries, ``distance_meters``.
+    """
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+    rows = []
+    for value in values:
+        created_at = value['created_at']
+        if tz is not None:
+            created_at = created_at.astimezone(tz)
+        created_at = created_at.isoformat()
+        if created_at.endswith('+00:00'):
+            created_at = created_at[:-6] + 'Z'
+
+        if 'location' in value:
+            lat, lng = value['location'].y, value['location'].x
+        else:
+            lat, lng = value['lat'], value['lng']
+
+        row = {
+            'id': value['id'],
+            'title': value['title'],
+            'location_name': value['location_name'],
+            'price': f"{value['price'].quantize(PRICE_PLACES):f}",
+            'bedrooms': value['bedrooms'],
+            'bathrooms': value['bathrooms'],
+            'geo_bucket': value['geo_bucket_id'],
+            'created_at': created_at,
+            'lat': lat,
+            'lng': lng,
+        }
+        distance = value.get('distance')
+        if distance is not None:
+            row['distance_meters'] = distance.m
+        rows.append(row)
+    return rows
+
+
+def property_rows_by_id(queryset: QuerySet, ids: Sequence[int], point: Optional[Point] = None) -> List[dict]:
+    """``property_rows`` for ``ids``, in that order; ids no longer in ``queryset`` are skipped"""
+    by_id = {value['id']: value for value in property_values(queryset.filter(id__in=ids), point)}
+    return property_rows(by_id[property_id] for property_id in ids if property_id in by_id)
@@ -0,0 +1,103 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+from django.contrib.gis.geos import Point
+from django.contrib.gis.measure import D
+from django.db.models import Case, IntegerField, Max, Q, Value, When
+
+from geo.geometry import haversine_meters
+from geo.models import GeoBucket
+from properties.services.bucket_index import bucket_index, bucket_index_enabled
+
+# Slack for the spherical distance used here vs. the spheroid used by PostGIS
+SPHERE_MARGIN = 0.005
+# Most candidate buckets filtered by id; wider searches filter on the radius
+MAX_BUCKET_FILTER = 500
+# Nearest buckets ranked individually; farther ones share the last rank
+MAX_RANKED_BUCKETS = MAX_BUCKET_FILTER
+
+
+def validate_circle(lat: float, lng: float, radius_meters: Optional[float] = None) -> None:
+    """Raise ValueError unless the point is a WGS84 coordinate and the radius a finite positive distance"""
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("lat must be within -90..90 and lng within -180..180")
+    if radius_meters is not None and not (radius_meters > 0 and math.isfinite(radius_meters)):
+        raise ValueError("radius must be a positive number of meters")
+
+
+def bucket_extent(bucket: GeoBucket) -> float:
+    """Furthest a property assigned to this bucket can be from its center"""
+    return bucket.extent_meters
+
+
+def _candidate_buckets(lat: float, lng: float, radius_meters: float) -> List[Tuple[float, GeoBucket]]:
+    if bucket_index_enabled():
+        bucket_index.refresh()
+        return bucket_index.nearby(lat, lng, radius_meters + bucket_index.max_extent_meters())
+
+    max_extent = GeoBucket.objects.aggregate(max_extent=Max('extent_meters'))['max_extent'] or 0
+    buckets = GeoBucket.objects.filter(
+        center__distance_lte=(Point(lng, lat, srid=4326), D(m=radius_meters + max_extent))
+    ).only('id', 'center', 'extent_meters')
+    return [(haversine_meters(lat, lng, bucket.center.y, bucket.center.x), bucket) for bucket in buckets]
+
+
+def classify_buckets(lat: float, lng: float, radius_meters: float) -> Tuple[List[int], List[int], Dict[int, float]]:
+    """
+    Split buckets touching the search circle into fully-inside and edge buckets
+
+    Returns:
+        tuple: ``(inside_ids, edge_ids, center_distances)``; every property of an
+        inside bucket lies within the circle, edge buckets need exact filtering
+    """
+    inside, edge, distances = [], [], {}
+    for distance, bucket in _candidate_buckets(lat, lng, radius_meters):
+        extent = bucket_extent(bucket)
+        if distance + extent <= radius_meters * (1 - SPHERE_MARGIN):
+            inside.append(bucket.pk)
+        elif distance - extent <= radius_meters * (1 + SPHERE_MARGIN):
+            edge.append(bucket.pk)
+        else:
+            continue
+        distances[bucket.pk] = distance
+    return inside, edge, distances
+
+
+def bucket_first_radius_search(queryset, lat: float, lng: float, radius_meters: float):
+    """
+    Two-phase radius search over Property using the bucket table
+
+    Phase one finds the buckets whose extent intersects the circle (in-process
+    index, or one small spatial query on GeoBucket). Phase two restricts the
+    property scan to those ``geo_bucket_id``s through the geo_bucket index.
+    Properties of buckets fully inside the circle are accepted as-is. Only
+    edge buckets get an exact ``distance_lte`` filter. Past
+    ``MAX_BUCKET_FILTER`` candidate buckets the id lists would cost more than
+    they save (and could pass SQLite's bound-parameter limit), so the circle
+    is filtered directly on the property location index instead; the rows
+    are the same either way.
+
+    Results are grouped by bucket, nearest bucket center first, then newest
+    first. ``bucket_rank`` is each bucket's position in the center distances
+    phase one already computed, as a CASE over at most
+    ``MAX_RANKED_BUCKETS`` bucket ids, so no distance is computed per
+    property and no join is added. Buckets past that share one rank.
+    """
+    inside, edge, distances = classify_buckets(lat, lng, radius_meters)
+    if not distances:
+        return queryset.none()
+
+    point = Point(lng, lat, srid=4326)
+    if len(distances) > MAX_BUCKET_FILTER:
+        condition = Q(location__distance_lte=(point, radius_meters))
+    else:
+        condition = Q(geo_bucket_id__in=inside) | Q(
+            geo_bucket_id__in=edge, location__distance_lte=(point, radius_meters)
+        )
+    ranked = sorted(distances, key=lambda bucket_id: (distances[bucket_id], bucket_id))[:MAX_RANKED_BUCKETS]
+    bucket_rank = Case(
+        *[When(geo_bucket_id=bucket_id, then=Value(rank)) for rank, bucket_id in enumerate(ranked)],
+        default=Value(len(ranked)),
+        output_field=IntegerField(),
+    )
+    return queryset.filter(condition).annotate(bucket_rank=bucket_rank).order_by('bucket_rank', '-created_at', '-id')
@@ -0,0 +1,299 @@
+from array import array
+from collections import Counter, defaultdict
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+from django.contrib.gis.geos import Point
+from django.db import connections, router, transaction
+from django.db.models import Max
+
+from geo.aggregates import rebuild_bucket_aggregates
+from geo.geometry import haversine_meters
+from geo.models import GeoBucket
+from properties.models import Property
+from properties.services.bucket_grid import BucketGrid
+from properties.services.bucket_index import bucket_index
+from properties.services.geo_bucket import BUCKET_RADIUS_METERS, SIMILARITY_THRESHOLD
+from properties.services.location_matcher import SimilarityScorer, normalize_location_name
+
+# Points with the same normalized name inside one micro cell are clustered as
+# a single weighted point; this is what keeps 1M properties tractable
+MICRO_CELL_METERS = 100
+LOAD_CHUNK_SIZE = 5000
+UPDATE_CHUNK_SIZE = 2000
+# Properties repointed per UPDATE statement on PostgreSQL
+REASSIGN_CHUNK_SIZE = 50_000
+
+
+class ClusterPlan:
+    """
+    Result of ``plan_clusters``: a new bucket for every property loaded
+
+    ``point_cluster[i]`` is the cluster of ``property_ids[i]``; clusters are
+    described by ``centers``, ``names`` and ``normalized_names``.
+    """
+
+    def __init__(self):
+        self.property_ids = array('q')
+        self.point_cluster = array('l')
+        self.centers: List[Tuple[float, float]] = []
+        self.names: List[str] = []
+        self.normalized_names: List[str] = []
+        self.old_bucket_count = 0
+        self.max_bucket_id = 0
+        self.elapsed = 0.0
+
+    def __len__(self) -> int:
+        return len(self.centers)
+
+
+class _Points:
+    """Column arrays of every property point, loaded with a server-side cursor"""
+
+    def __init__(self, chunk_size: int):
+        self.ids = array('q')
+        self.lats = array('d')
+        self.lngs = array('d')
+        self.raw_names = array('l')         # index into raw_name_list
+        self.raw_name_list: List[str] = []
+        self.normalized: List[str] = []     # per raw name
+        old_buckets = set()
+
+        raw_index: Dict[str, int] = {}
+        rows = Property.objects.order_by('id').values_list('id', 'location_name', 'location', 'geo_bucket_id')
+        for property_id, location_name, location, bucket_id in rows.iterator(chunk_size=chunk_size):
+            name_id = raw_index.get(location_name)
+            if name_id is None:
+                name_id = raw_index[location_name] = len(self.raw_name_list)
+                self.raw_name_list.append(location_name)
+                self.normalized.append(normalize_location_name(location_name))
+            self.ids.append(property_id)
+            self.lats.append(location.y)
+            self.lngs.append(location.x)
+            self.raw_names.append(name_id)
+            old_buckets.add(bucket_id)
+        self.old_bucket_count = len(old_buckets)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class _NameCompatibility:
+    """Memoized ``seed name ~ candidate name`` checks with the assignment similarity rule"""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._scorers: Dict[str, SimilarityScorer] = {}
+        self._results: Dict[Tuple[str, str], bool] = {}
+
+    def __call__(self, seed: str, candidate: str) -> bool:
+        if seed == candidate:
+            return True
+        key = (seed, candidate)
+        result = self._results.get(key)
+        if result is None:
+            scorer = self._scorers.get(seed)
+            if scorer is None:
+                scorer = self._scorers[seed] = SimilarityScorer(seed)
+            result = self._results[key] = scorer.at_least(candidate, self.threshold)
+        return result
+
+
+def plan_clusters(
+        radius_meters: float = BUCKET_RADIUS_METERS,
+        name_similarity: float = SIMILARITY_THRESHOLD,
+        chunk_size: int = LOAD_CHUNK_SIZE,
+) -> ClusterPlan:
+    """
+    Cluster every property point from scratch, independent of arrival order
+
+    1. Points are loaded into arrays and collapsed into weighted micro-points
+       (same normalized name, same ``MICRO_CELL_METERS`` cell).
+    2. Each micro-point's density is the weight of the name-compatible
+       micro-points within ``radius_meters`` (a DBSCAN-style neighbourhood
+       count, found through a grid with ``radius_meters`` cells).
+    3. Micro-points are visited densest first; each unassigned one seeds a
+       cluster and absorbs the unassigned, name-compatible micro-points within
+       ``radius_meters`` of it. Seeding from density peaks rather than chaining
+       like DBSCAN keeps clusters bounded in size in a dense city.
+
+    Cluster centers are property-weighted centroids; ``apply_plan`` leaves
+    the final centers, radii and extents to ``rebuild_bucket_aggregates``.
+    """
+    started = perf_counter()
+    plan = ClusterPlan()
+    plan.max_bucket_id = GeoBucket.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    points = _Points(chunk_size)
+    plan.old_bucket_count = points.old_bucket_count
+    plan.property_ids = points.ids
+
+    # 1. Micro-points
+    micro_grid = BucketGrid(cell_meters=MICRO_CELL_METERS)
+    micro_index: Dict[tuple, int] = {}
+    point_micro = array('l')
+    weights, sum_lats, sum_lngs, micro_names = array('l'), array('d'), array('d'), []
+    micro_raw_names: List[Counter] = []
+    for index in range(len(points)):
+        lat, lng, raw = points.lats[index], points.lngs[index], points.raw_names[index]
+        normalized = points.normalized[raw]
+        key = (normalized, micro_grid.cell_of(lat, lng))
+        micro = micro_index.get(key)
+        if micro is None:
+            micro = micro_index[key] = len(weights)
+            weights.append(0)
+            sum_lats.append(0.0)
+            sum_lngs.append(0.0)
+            micro_names.append(normalized)
+            micro_raw_names.append(Counter())
+        weights[micro] += 1
+        sum_lats[micro] += lat
+        sum_lngs[micro] += lng
+        micro_raw_names[micro][raw] += 1
+        point_micro.append(micro)
+
+    micro_count = len(weights)
+    micro_lats = [sum_lats[m] / weights[m] for m in range(micro_count)]
+    micro_lngs = [sum_lngs[m] / weights[m] for m in range(micro_count)]
+
+    grid = BucketGrid(cell_meters=radius_meters)
+    cells: Dict[tuple, List[int]] = defaultdict(list)
+    for micro in range(micro_count):
+        cells[grid.cell_of(micro_lats[micro], micro_lngs[micro])].append(micro)
+
+    compatible = _NameCompatibility(name_similarity)
+
+    def neighbours(micro) -> array:
+        lat, lng, name = micro_lats[micro], micro_lngs[micro], micro_names[micro]
+        found = array('l')
+        for cell in grid.cells_within(lat, lng, radius_meters):
+            for other in cells.get(cell, ()):
+                if (compatible(name, micro_names[other])
+                        and haversine_meters(lat, lng, micro_lats[other], micro_lngs[other]) <= radius_meters):
+                    found.append(other)
+        return found
+
+    # 2. Density; the neighbour sets are kept for seeding
+    micro_neighbours = [neighbours(micro) for micro in range(micro_count)]
+    density = [sum(weights[other] for other in micro_neighbours[micro]) for micro in range(micro_count)]
+
+    # 3. Seed from density peaks; ties broken by name and position, never by id
+    micro_cluster = array('l', [-1]) * micro_count
+    order = sorted(range(micro_count), key=lambda m: (-density[m], micro_names[m], micro_lats[m], micro_lngs[m]))
+    cluster_count = 0
+    for seed in order:
+        if micro_cluster[seed] != -1:
+            continue
+        micro_cluster[seed] = cluster_count
+        for other in micro_neighbours[seed]:
+            if micro_cluster[other] == -1:
+                micro_cluster[other] = cluster_count
+        cluster_count += 1
+
+    # Centers and names
+    cluster_weight = [0] * cluster_count
+    cluster_lat = [0.0] * cluster_count
+    cluster_lng = [0.0] * cluster_count
+    cluster_raw_names = [Counter() for _ in range(cluster_count)]
+    for micro in range(micro_count):
+        cluster = micro_cluster[micro]
+        cluster_weight[cluster] += weights[micro]
+        cluster_lat[cluster] += sum_lats[micro]
+        cluster_lng[cluster] += sum_lngs[micro]
+        cluster_raw_names[cluster].update(micro_raw_names[micro])
+
+    for cluster in range(cluster_count):
+        plan.centers.append((cluster_lat[cluster] / cluster_weight[cluster],
+                             cluster_lng[cluster] / cluster_weight[cluster]))
+        # Most common spelling; ties go to the alphabetically first name
+        raw = min(cluster_raw_names[cluster].items(), key=lambda item: (-item[1], points.raw_name_list[item[0]]))[0]
+        plan.names.append(points.raw_name_list[raw])
+        plan.normalized_names.append(points.normalized[raw])
+
+    for index in range(len(points)):
+        plan.point_cluster.append(micro_cluster[point_micro[index]])
+
+    plan.elapsed = perf_counter() - started
+    return plan
+
+
+def _lock_tables(alias: str) -> None:
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return  # SQLite serializes writers on the open transaction already
+    tables = ', '.join(connection.ops.quote_name(model._meta.db_table) for model in (Property, GeoBucket))
+    with connection.cursor() as cursor:
+        # Blocks concurrent writes, not reads, until commit
+        cursor.execute(f'LOCK TABLE {tables} IN SHARE ROW EXCLUSIVE MODE')
+
+
+def _reassign(alias: str, property_ids: array, bucket_ids: array) -> None:
+    """
+    Set ``geo_bucket_id`` of each property to the bucket at the same position
+
+    PostgreSQL joins the UPDATE to ``unnest``-ed id arrays,
+    ``REASSIGN_CHUNK_SIZE`` properties per statement; elsewhere the pairs go
+    to a temporary table in one ``executemany`` and a single UPDATE reads it.
+    """
+    connection = connections[alias]
+    table = connection.ops.quote_name(Property._meta.db_table)
+    column = connection.ops.quote_name(Property._meta.get_field('geo_bucket').column)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for start in range(0, len(property_ids), REASSIGN_CHUNK_SIZE):
+                end = start + REASSIGN_CHUNK_SIZE
+                cursor.execute(
+                    f'UPDATE {table} AS p SET {column} = v.bucket_id '
+                    f'FROM unnest(%s::bigint[], %s::bigint[]) AS v(id, bucket_id) WHERE p.id = v.id',
+                    [property_ids[start:end].tolist(), bucket_ids[start:end].tolist()],
+                )
+            return
+
+        cursor.execute('CREATE TEMP TABLE recluster_assignment (id INTEGER PRIMARY KEY, bucket_id INTEGER NOT NULL)')
+        try:
+            cursor.executemany('INSERT INTO recluster_assignment VALUES (%s, %s)', zip(property_ids, bucket_ids))
+            cursor.execute(
+                f'UPDATE {table} SET {column} = '
+                f'(SELECT bucket_id FROM recluster_assignment WHERE recluster_assignment.id = {table}.id) '
+                f'WHERE id IN (SELECT id FROM recluster_assignment)'
+            )
+        finally:
+            cursor.execute('DROP TABLE recluster_assignment')
+
+
+def apply_plan(plan: ClusterPlan, batch_size: int = UPDATE_CHUNK_SIZE) -> int:
+    """
+    Swap in the planned buckets in one transaction
+
+    Creates the new buckets, repoints every planned property, deletes old
+    buckets left empty and rebuilds the bucket aggregates, which also sets
+    each bucket's final center, radius and extent. Properties and
+    buckets created after the plan was loaded are left as they are.
+    Returns the number of buckets deleted.
+    """
+    alias = router.db_for_write(GeoBucket)
+    with transaction.atomic(using=alias):
+        _lock_tables(alias)
+
+        buckets = [
+            GeoBucket(
+                name=name,
+                normalized_name=normalized,
+                center=Point(lng, lat, srid=4326),
+                radius_meters=BUCKET_RADIUS_METERS,
+                extent_meters=0,
+            )
+            for (lat, lng), name, normalized in zip(plan.centers, plan.names, plan.normalized_names)
+        ]
+        GeoBucket.objects.bulk_create(buckets, batch_size=batch_size)
+
+        bucket_ids = array('q', [bucket.pk for bucket in buckets])
+        _reassign(alias, plan.property_ids, array('q', (bucket_ids[cluster] for cluster in plan.point_cluster)))
+
+        _, deleted = GeoBucket.objects.filter(
+            id__lte=plan.max_bucket_id, properties__isnull=True
+        ).delete()
+        rebuild_bucket_aggregates(batch_size=batch_size)
+        transaction.on_commit(bucket_index.reset, using=alias)
+
+    return deleted.get(GeoBucket._meta.label, 0)
+
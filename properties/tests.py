@@ -1,3 +1,269 @@
-from django.test import TestCase
+import base64
+import io
+import json
 
-# Create your tests here.
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.common.query_budget import assert_query_budget, get_query_budget
+from geo.aggregates import rebuild_bucket_aggregates
+from geo.models import GeoBucket
+from properties.models import Property
+from properties.services.feed_loader import _geojson_records, clean_record
+from properties.services.geo_bucket import match_bucket
+from properties.services.geohash_tiles import TileCache, precision_for_radius, tiles_for_circle
+from properties.services.location_matcher import LocationCorpus, normalize_location_name
+from properties.views import PropertyViewSet
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class PropertyQueryBudgetTests(TestCase):
+    """
+    Each budgeted PropertyViewSet action stays within ``query_budgets``
+
+    The root conftest resets the per-process indexes and the response cache
+    before every test, so budgets are measured from a cold process.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for index, (name, lat, lng) in enumerate([('Sangotedo', 6.4698, 3.6285), ('Ikeja GRA', 6.6018, 3.3515)]):
+            bucket = GeoBucket.objects.create(
+                name=name, normalized_name=name.lower(), center=Point(lng, lat, srid=4326), radius_meters=1000
+            )
+            Property.objects.bulk_create([
+                Property(
+                    title=f'{name} listing {number}', location_name=name,
+                    location=Point(lng + number * 0.0001, lat, srid=4326),
+                    price=1_000_000 * (number + 1), bedrooms=number % 5 + 1, bathrooms=1, geo_bucket=bucket,
+                )
+                for number in range(25)
+            ])
+        rebuild_bucket_aggregates()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def assert_within_budget(self, action, path, params=None):
+        with assert_query_budget(get_query_budget(PropertyViewSet, action)):
+            response = self.client.get(path, params or {})
+        self.assertEqual(response.status_code, 200, response.content[:200])
+        return response.json()
+
+    def test_list(self):
+        data = self.assert_within_budget('list', '/api/properties/')
+        self.assertEqual(data['count'], 50)
+        self.assertEqual(len(data['results']), 20)
+
+    def test_list_cursor(self):
+        data = self.assert_within_budget('list', '/api/properties/', {'pagination': 'cursor'})
+        self.assertIsNotNone(data['next'])
+
+    def test_list_search(self):
+        data = self.assert_within_budget('list', '/api/properties/', {'search': 'sangotedo'})
+        self.assertEqual(data['count'], 25)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True, ALLOWED_HOSTS=['api.example.com', 'maps.example.com'])
+    def test_cached_links_follow_host(self):
+        for host in ['api.example.com', 'maps.example.com']:
+            data = self.client.get('/api/properties/', HTTP_HOST=host).json()
+            self.assertTrue(data['next'].startswith(f'http://{host}/'))
+
+    def test_nearby(self):
+        data = self.assert_within_budget(
+            'nearby_properties', '/api/properties/nearby/', {'lat': 6.4698, 'lng': 3.6285, 'radius': 2000}
+        )
+        self.assertEqual(data['count'], 25)
+        distances = [row['distance_meters'] for row in data['results']['results']]
+        self.assertEqual(distances, sorted(distances))
+
+    def test_invalid_parameters(self):
+        for params in [
+            {'lat': 6.4698, 'lng': 3.6285, 'k': 5, 'radius': 'abc'},
+            {'lat': 6.4698, 'lng': 3.6285, 'radius': -10},
+            {'lat': 6.4698, 'lng': 3.6285, 'radius': 'nan'},
+            {'lat': 6.4698, 'lng': 3.6285, 'radius': 'inf'},
+            {'lat': 'nan', 'lng': 3.6285},
+            {'lat': 6.4698, 'lng': 200},
+        ]:
+            for path in ['/api/properties/nearby/', '/api/async/properties/nearby/']:
+                with self.subTest(path=path, params=params):
+                    self.assertEqual(self.client.get(path, params).status_code, 400)
+
+    def test_tiles_radius_cap(self):
+        response = self.client.get(
+            '/api/properties/nearby/', {'lat': 6.4698, 'lng': 3.6285, 'radius': 2e7, 'strategy': 'tiles'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_nearest(self):
+        data = self.assert_within_budget(
+            'nearby_properties', '/api/properties/nearby/', {'lat': 6.4698, 'lng': 3.6285, 'k': 10}
+        )
+        self.assertEqual(len(data['results']), 10)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class KeysetCursorTests(TestCase):
+    """Tampered keyset cursors are rejected with 404 instead of failing the query"""
+
+    @staticmethod
+    def cursor(payload):
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+    def test_cursor_keeps_applied_ordering(self):
+        bucket = GeoBucket.objects.create(
+            name='Yaba', normalized_name='yaba', center=Point(3.38, 6.515, srid=4326), radius_meters=1000
+        )
+        for number in range(5):
+            Property.objects.create(
+                title=f'Yaba listing {number}', location_name='Yaba', location=Point(3.38, 6.515, srid=4326),
+                price=1_000_000, bedrooms=1, bathrooms=1, geo_bucket=bucket,
+            )
+        client = APIClient()
+        params = {'ordering': 'created_at', 'pagination': 'cursor', 'page_size': 2}
+        seen = []
+        data = client.get('/api/properties/', params).json()
+        while True:
+            seen += [row['created_at'] for row in data['results']]
+            if not data['next']:
+                break
+            data = client.get(data['next']).json()
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen, sorted(seen))
+
+    def test_invalid_cursors(self):
+        client = APIClient()
+        for cursor in [
+            'not base64!',
+            self.cursor({'dt': 1}),
+            self.cursor([['dt', '2025-01-01T00:00:00+00:00']]),
+            self.cursor([['dt', 5], ['raw', 1]]),
+            self.cursor([['dt', '2025-01-01T00:00:00+00:00'], ['raw', {'id': 1}]]),
+            self.cursor([['dt', '2025-01-01T00:00:00+00:00'], ['raw', 'abc']]),
+            self.cursor([['dt', '2025-01-01T00:00:00+00:00'], 'raw']),
+            self.cursor([['dec', 'NaN'], ['raw', 1]]),
+        ]:
+            with self.subTest(cursor=cursor):
+                response = client.get('/api/properties/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class MatchBucketTests(SimpleTestCase):
+    """Name matches never reach past the bucket radius"""
+
+    @staticmethod
+    def bucket(name, radius=1000):
+        return GeoBucket(name=name, normalized_name=name, center=Point(3.6285, 6.4698, srid=4326), radius_meters=radius)
+
+    def test_exact_name_within_radius(self):
+        bucket = self.bucket('sangotedo')
+        self.assertIs(match_bucket('sangotedo', [(900, bucket)]), bucket)
+
+    def test_exact_name_outside_radius(self):
+        self.assertIsNone(match_bucket('sangotedo', [(1200, self.bucket('sangotedo'))]))
+
+    def test_fuzzy_name_within_fuzzy_radius(self):
+        bucket = self.bucket('sangotedo')
+        self.assertIs(match_bucket('sangotedo ajah', [(1200, bucket)]), bucket)
+
+    def test_tightened_radius(self):
+        self.assertIsNone(match_bucket('sangotedo', [(600, self.bucket('sangotedo', radius=500))]))
+
+
+class LocationCorpusTests(SimpleTestCase):
+    """Memoized normalization follows every corpus edit, including same-size ones"""
+
+    def test_same_size_edit(self):
+        names = ['sangotedo court a', 'sangotedo court b', 'ikoyi', 'yaba']
+        corpus = LocationCorpus(names)
+        self.assertEqual(normalize_location_name('sangotedo court', corpus), 'sangotedo')
+        corpus.remove(['sangotedo court b'])
+        corpus.add(['ajah'])
+        self.assertEqual(len(corpus), 4)
+        self.assertEqual(normalize_location_name('sangotedo court', corpus), 'sangotedo court')
+        self.assertEqual(
+            normalize_location_name('sangotedo court', ['sangotedo court a', 'ikoyi', 'yaba', 'ajah']),
+            'sangotedo court'
+        )
+
+
+class CleanRecordTests(SimpleTestCase):
+    """Bad feed values are reported as ValueError, never other exceptions"""
+
+    def test_invalid_numbers(self):
+        for field, value in [
+            ('price', 'NaN'), ('price', 'sNaN'), ('price', 'Infinity'), ('price', '-inf'), ('price', 'abc'),
+            ('price', '1e30'), ('bedrooms', float('inf')), ('bathrooms', 'two'),
+        ]:
+            record = {'title': 'Duplex', 'location_name': 'Sangotedo', 'lat': 6.4698, 'lng': 3.6285, field: value}
+            with self.subTest(field=field, value=value), self.assertRaises(ValueError):
+                clean_record(record)
+
+    def test_serializer_rules(self):
+        for field, value in [('title', ''), ('title', '  '), ('title', 'x' * 256), ('location_name', None)]:
+            record = {'title': 'Duplex', 'location_name': 'Sangotedo', 'lat': 6.4698, 'lng': 3.6285, field: value}
+            with self.subTest(field=field, value=value), self.assertRaises(ValueError):
+                clean_record(record)
+
+    def test_valid_record(self):
+        row = clean_record({
+            'title': 'Duplex', 'location_name': ' Sangotedo ', 'lat': '6.4698', 'lng': 3.6285,
+            'price': '1500000.50', 'bedrooms': '',
+        })
+        self.assertEqual(row['location_name'], 'Sangotedo')
+        self.assertEqual(str(row['price']), '1500000.50')
+        self.assertNotIn('bedrooms', row)
+
+    def test_bad_geojson_features(self):
+        handle = io.StringIO(json.dumps({'features': [None, 3, {'geometry': None, 'properties': []}]}))
+        for record in _geojson_records(handle):
+            with self.assertRaises(ValueError):
+                clean_record(record)
+
+
+class TileCacheTests(TestCase):
+    """Tiles are bounded by rows and go stale only with the buckets reaching them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.buckets = {}
+        for name, lat, lng in [('Sangotedo', 6.4698, 3.6285), ('Ikeja GRA', 6.6018, 3.3515)]:
+            bucket = GeoBucket.objects.create(
+                name=name, normalized_name=name.lower(), center=Point(lng, lat, srid=4326), radius_meters=1000
+            )
+            cls.buckets[name] = bucket
+            Property.objects.bulk_create([
+                Property(
+                    title=f'{name} listing {number}', location_name=name,
+                    location=Point(lng + number * 0.0001, lat, srid=4326),
+                    price=1_000_000, bedrooms=1, bathrooms=1, geo_bucket=bucket,
+                )
+                for number in range(25)
+            ])
+        rebuild_bucket_aggregates()
+
+    @staticmethod
+    def tiles(lat, lng, radius=1000):
+        return list(tiles_for_circle(lat, lng, radius, precision_for_radius(radius)))
+
+    def test_unrelated_write_keeps_tiles(self):
+        cache = TileCache()
+        tiles = self.tiles(6.4698, 3.6285)
+        self.assertEqual(sum(len(rows) for rows in cache.get_many(tiles).values()), 25)
+
+        GeoBucket.objects.filter(pk=self.buckets['Ikeja GRA'].pk).update(updated_at=timezone.now())
+        cache.get_many(tiles)
+        self.assertEqual(cache.misses, len(tiles))
+
+        GeoBucket.objects.filter(pk=self.buckets['Sangotedo'].pk).update(updated_at=timezone.now())
+        cache.get_many(tiles)
+        self.assertGreater(cache.misses, len(tiles))
+
+    def test_bounded_by_rows(self):
+        cache = TileCache(max_rows=30)
+        cache.get_many(self.tiles(6.4698, 3.6285))
+        cache.get_many(self.tiles(6.6018, 3.3515))
+        self.assertLessEqual(cache.rows, 30)
@@ -1,5 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import PropertyViewSet
 
 router = DefaultRouter()
@@ -7,4 +8,6 @@ router.register(r'properties', PropertyViewSet, basename='property')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('async/properties/nearby/', async_views.nearby_properties, name='async-property-nearby'),
+    path('async/properties/search/', async_views.search_properties, name='async-property-search'),
 ]
\ No newline at end of file
@@ -8,16 +8,24 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from core.common.pagination import CustomBucketPagination
+from core.common.response_cache import cached_response
 from .filters import PropertiesFilter
 from .models import Property
-from .schemas import PARAMETERS
-from .serializers import PropertySerializer, PropertySearchSerializer
+from .schemas import PARAMETERS, BULK_PARAMETERS, EXPORT_PARAMETERS
+from .serializers import PropertySerializer, PropertySearchSerializer, PropertyBulkSerializer
+from .services.export import EXPORT_FORMATS, export_response
+from .services.geohash_tiles import nearby_from_tiles
+from .services.knn import KNN_MAX_RESULTS, knn_distance, property_point_index, uses_postgis
 from .services.location_matcher import normalize_location_name
+from .services.property_rows import property_rows, property_rows_by_id, property_values
+from .services.radius_search import bucket_first_radius_search, validate_circle
 from geo.models import GeoBucket
 
 
 @extend_schema_view(
-  nearby_properties=PARAMETERS
+  nearby_properties=PARAMETERS,
+  bulk_ingest=BULK_PARAMETERS,
+  export=EXPORT_PARAMETERS
 )
 class PropertyViewSet(viewsets.ModelViewSet):
     """
@@ -32,43 +40,163 @@ class PropertyViewSet(viewsets.ModelViewSet):
     ordering_fields = ["created_at", "updated_at"]
     http_method_names = ['get', 'post']
 
+    # Maximum SQL queries per action; enforced by properties/tests.py
+    query_budgets = {
+        # bucket ranking for ?search= (one trigram query on PostgreSQL; the
+        # bucket index's epoch read plus its load or sync elsewhere), count, page
+        'list': 4,
+        'nearby_properties': 2,
+    }
+
+    def get_keyset_ordering(self):
+        """Unique ordering used when a client requests cursor pagination"""
+        if self.action == 'nearby_properties':
+            if self.request.query_params.get('strategy') == 'buckets':
+                return ('bucket_rank', '-created_at', '-id')
+            return ('distance', 'id')
+        if self.action == 'similar_properties':
+            return ('price', 'id')
+        return ('-created_at', '-id')
+
+    @cached_response()
+    def list(self, request, *args, **kwargs):
+        """Property list, including ``?search=`` fuzzy location search"""
+        queryset = property_values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(property_rows(page))
+        return Response(property_rows(queryset))
 
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_ingest(self, request):
+        """
+        Create many properties with batched geo-bucket assignment
+        POST /api/properties/bulk/
+        """
+        serializer = PropertyBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = serializer.save()
+
+        response_status = status.HTTP_201_CREATED if result['created'] else status.HTTP_400_BAD_REQUEST
+        return Response(result, status=response_status)
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Stream every property as NDJSON, CSV or GeoJSON
+        GET /api/properties/export/?output=ndjson
+        """
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"output must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return export_response('properties', output)
 
     @action(detail=False, methods=['get'], url_path='nearby')
+    @cached_response()
     def nearby_properties(self, request):
         """
         Find properties near a given location (radius search)
         GET /api/properties/nearby/?lat=6.4698&lng=3.6285&radius=5000
+        GET /api/properties/nearby/?lat=6.4698&lng=3.6285&k=20  (k nearest)
+        GET /api/properties/nearby/?lat=6.4698&lng=3.6285&strategy=buckets  (bucket-first)
+        GET /api/properties/nearby/?lat=6.4698&lng=3.6285&strategy=tiles  (geohash tiles)
         """
         try:
             lat = float(request.query_params.get('lat'))
             lng = float(request.query_params.get('lng'))
-            radius = float(request.query_params.get('radius', 5000))  # Default 5km
+            radius = request.query_params.get('radius')
+            radius = float(radius) if radius is not None else None
+            k = request.query_params.get('k')
+            k = int(k) if k is not None else None
+            validate_circle(lat, lng, radius)
         except (TypeError, ValueError):
             return Response(
-                {"error": "Invalid lat, lng, or radius parameters"},
+                {"error": "Invalid lat, lng, radius or k parameters"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
         point = Point(lng, lat, srid=4326)
 
-        queryset = self.get_queryset().filter(
-            location__distance_lte=(point, radius)
-        ).annotate(
-            distance=Distance('location', point)
-        ).order_by('distance')
-
+        if k is not None:
+            return self._nearest_properties(point, lat, lng, k, radius)
+        if radius is None:
+            radius = 5000  # Default 5km
+
+        strategy = request.query_params.get('strategy')
+        if strategy == 'tiles':
+            return self._nearby_from_tiles(point, lat, lng, radius, request)
+        if strategy == 'buckets':
+            queryset = bucket_first_radius_search(self.get_queryset(), lat, lng, radius)
+        else:
+            queryset = self.get_queryset().filter(
+                location__distance_lte=(point, radius)
+            ).annotate(
+                distance=Distance('location', point)
+            ).order_by('distance')
+
+        queryset = property_values(queryset, point)
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response({
                 'center': {'lat': lat, 'lng': lng},
                 'radius_meters': radius,
-                'results': serializer.data
+                'results': property_rows(page)
             })
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return Response(property_rows(queryset))
+
+    def _nearby_from_tiles(self, point, lat, lng, radius, request):
+        """
+        Tile mode: the circle is served from cached per-geohash-tile rows and
+        only the final distance filter is specific to this query point, so
+        panning a map mostly reuses tiles from earlier requests.
+        """
+        if self.paginator.wants_keyset(request):
+            return Response(
+                {"error": "Cursor pagination is not supported with strategy=tiles"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            ids = [property_id for property_id, _ in nearby_from_tiles(lat, lng, radius)]
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        page_ids = self.paginate_queryset(ids)
+        return self.get_paginated_response({
+            'center': {'lat': lat, 'lng': lng},
+            'radius_meters': radius,
+            'results': property_rows_by_id(self.get_queryset(), page_ids, point)
+        })
+
+    def _nearest_properties(self, point, lat, lng, k, radius):
+        """
+        k-nearest-neighbour mode: cost depends on k, not on how many
+        properties fall inside the radius. The radius (None unless the
+        client passed one) is only applied when given.
+        """
+        k = max(1, min(k, KNN_MAX_RESULTS))
+
+        if uses_postgis(Property):
+            queryset = self.get_queryset()
+            if radius is not None:
+                queryset = queryset.filter(location__distance_lte=(point, radius))
+            queryset = queryset.annotate(
+                knn_distance=knn_distance(Property, 'location', point)
+            ).order_by('knn_distance')
+            results = property_rows(property_values(queryset, point)[:k])
+        else:
+            nearest = property_point_index.nearest(lat, lng, k, max_distance_meters=radius)
+            results = property_rows_by_id(self.get_queryset(), [property_id for property_id, _ in nearest], point)
+
+        return Response({
+            'center': {'lat': lat, 'lng': lng},
+            'k': k,
+            'radius_meters': radius,
+            'results': results
+        })
 
     @action(detail=True, methods=['get'], url_path='similar')
     def similar_properties(self, request, pk=None):
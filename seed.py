@@ -14,6 +14,7 @@ django.setup()
 
 from django.contrib.gis.geos import Point
 from django.utils import timezone
+from geo.aggregates import rebuild_bucket_aggregates
 from geo.models import GeoBucket
 from properties.models import Property
 
@@ -216,6 +217,11 @@ def main():
     buckets = create_geo_buckets()
     create_properties(buckets)
 
+    # Rows above bypass record_properties; build the aggregates and bucket
+    # geometry that the bucket list, detail and stats endpoints read
+    print("\nRebuilding bucket aggregates...")
+    rebuild_bucket_aggregates()
+
     # Verify
     verify_data()
 
@@ -13,6 +13,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 django.setup()
 
 from django.contrib.auth.models import User
+from geo.aggregates import rebuild_bucket_aggregates
 from geo.models import GeoBucket
 from properties.models import Property
 
@@ -161,5 +162,16 @@ def sample_properties(db, sample_geo_buckets):
         created_at=datetime.now() - timedelta(days=3)
     )
     properties.append(prop5)
-    
-    return properties
\ No newline at end of file
+
+    # The rows above bypass record_properties; build the aggregates the
+    # bucket list, detail and stats endpoints read
+    rebuild_bucket_aggregates()
+
+    return properties
+
+
+@pytest.fixture
+def query_budget():
+    """Context manager failing the test when an endpoint exceeds its query budget"""
+    from core.common.query_budget import assert_query_budget
+    return assert_query_budget